@@ -0,0 +1,26 @@
+from django.contrib import admin, messages
+
+from .models import ApiClient
+
+
+@admin.register(ApiClient)
+class ApiClientAdmin(admin.ModelAdmin):
+    list_display = (
+        "name",
+        "key_prefix",
+        "is_active",
+        "rate_limit",
+        "can_view_contacts",
+        "created_at",
+    )
+    list_filter = ("is_active", "can_view_contacts")
+    search_fields = ("name", "key_prefix")
+    readonly_fields = ("key_prefix",)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            key = obj.generate_key()
+            messages.warning(
+                request, f"API key for {obj.name}: {key} (it won't be shown again)"
+            )
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,141 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import JsonResponse
+
+from core import ratelimit
+
+from .models import ApiClient, hash_key
+
+# deactivating a client takes effect within this many seconds
+CLIENT_CACHE_TIMEOUT = 60
+
+RATE_LIMIT_WINDOW = 60
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def error_response(message, status, headers=None):
+    return JsonResponse({"error": message}, status=status, headers=headers)
+
+
+def get_api_key(request):
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header.removeprefix("Bearer ").strip()
+    return request.headers.get("X-Api-Key", "").strip()
+
+
+def authenticate(request):
+    key = get_api_key(request)
+    if not key:
+        return None
+
+    key_hash = hash_key(key)
+    cache_key = f"api:client:{key_hash}"
+    client = cache.get(cache_key)
+    if client is None:
+        client = ApiClient.objects.filter(key_hash=key_hash, is_active=True).first()
+        # unknown keys are remembered too, so guessing doesn't hit the database
+        cache.set(cache_key, client or False, CLIENT_CACHE_TIMEOUT)
+    return client or None
+
+
+def hit_rate_limit(client):
+    """
+    Count a request against the client's fixed one minute window. Returns
+    ``(allowed, remaining, seconds_until_reset)``.
+    """
+    return ratelimit.hit_rate_limit(
+        f"api:rate:{client.pk}", client.rate_limit, RATE_LIMIT_WINDOW
+    )
+
+
+def admit(request):
+    """
+    Authenticate and rate limit an API request. Returns the error response
+    to send instead of running the view (or None), and the rate limit
+    headers for the view's response.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return (
+            error_response("Method not allowed", 405, headers={"Allow": "GET, HEAD"}),
+            {},
+        )
+
+    client = authenticate(request)
+    if client is None:
+        return (
+            error_response(
+                "A valid API key is required",
+                401,
+                headers={"WWW-Authenticate": 'Bearer realm="api"'},
+            ),
+            {},
+        )
+
+    allowed, remaining, reset = hit_rate_limit(client)
+    rate_headers = {
+        "X-RateLimit-Limit": str(client.rate_limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+    }
+    if not allowed:
+        return (
+            error_response(
+                "Rate limit exceeded",
+                429,
+                headers={**rate_headers, "Retry-After": str(reset)},
+            ),
+            rate_headers,
+        )
+
+    request.api_client = client
+    return None, rate_headers
+
+
+def api_endpoint(view):
+    """
+    Read-only API view: requires an API key (``Authorization: Bearer <key>``
+    or ``X-Api-Key``), applies the client's rate limit and turns ApiError
+    into a JSON error response. Works on async views too.
+    """
+
+    def finish(response, rate_headers):
+        for header, value in rate_headers.items():
+            response[header] = value
+        return response
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            refused, rate_headers = await sync_to_async(admit)(request)
+            if refused is not None:
+                return refused
+            try:
+                response = await view(request, *args, **kwargs)
+            except ApiError as e:
+                response = error_response(e.message, e.status)
+            return finish(response, rate_headers)
+
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        refused, rate_headers = admit(request)
+        if refused is not None:
+            return refused
+        try:
+            response = view(request, *args, **kwargs)
+        except ApiError as e:
+            response = error_response(e.message, e.status)
+        return finish(response, rate_headers)
+
+    return wrapper
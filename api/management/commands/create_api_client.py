@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from api.models import ApiClient
+
+
+class Command(BaseCommand):
+    help = "Register a partner organisation and print its API key"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Name of the partner organisation")
+        parser.add_argument(
+            "--rate-limit",
+            type=int,
+            default=60,
+            help="Requests allowed per minute",
+        )
+        parser.add_argument(
+            "--contacts",
+            action="store_true",
+            help="Allow the client to read reporter contacts",
+        )
+
+    def handle(self, *args, **options):
+        client = ApiClient(
+            name=options["name"],
+            rate_limit=options["rate_limit"],
+            can_view_contacts=options["contacts"],
+        )
+        key = client.generate_key()
+        client.save()
+        self.stdout.write(self.style.SUCCESS(f"Created API client {client}"))
+        # only the hash is stored, there's no way to show the key again
+        self.stdout.write(f"Key: {key}")
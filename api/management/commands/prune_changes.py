@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.feed import prune_changes
+
+
+class Command(BaseCommand):
+    help = "Delete old entries from the partner change feed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CHANGE_FEED_RETENTION,
+            help="Keep changes from the last this many days",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} old changes"))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:00
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def number_existing_changes(apps, schema_editor):
+    # keep the ids clients already hold as their place in the feed
+    Change = apps.get_model("api", "Change")
+    Change.objects.update(sequence=F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_change"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="change",
+            name="sequence",
+            field=models.BigIntegerField(editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing_changes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="change",
+            index=models.Index(
+                condition=models.Q(("sequence__isnull", True)),
+                fields=["id"],
+                name="api_change_unnumbered",
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+import hashlib
+import secrets
+
+from django.db import models
+from django.utils import timezone
+
+from core.models import TimestampedModel
+
+
+def hash_key(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ApiClient(TimestampedModel):
+    """
+    A partner organisation allowed to use the API. Only a hash of the key
+    is stored, the key itself is shown once when the client is created
+    (``manage.py create_api_client``).
+    """
+
+    name = models.CharField(max_length=255)
+    key_prefix = models.CharField(max_length=8, editable=False)
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    is_active = models.BooleanField(default=True)
+    # requests per minute
+    rate_limit = models.PositiveIntegerField(default=60)
+    # contacts are personal data, only shared with partners that need them
+    can_view_contacts = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.name} ({self.key_prefix}...)"
+
+    def generate_key(self):
+        key = secrets.token_urlsafe(32)
+        self.key_prefix = key[:8]
+        self.key_hash = hash_key(key)
+        return key
+
+
+class ChangeAction(models.TextChoices):
+    CREATED = "created", "Created"
+    UPDATED = "updated", "Updated"
+    STATUS_CHANGED = "status_changed", "Status changed"
+    DELETED = "deleted", "Deleted"
+
+
+class Change(models.Model):
+    """
+    Append-only log of changes to the API resources, written from signals
+    (see api.signals).
+    """
+
+    # api resource name, see api.resources.RESOURCES
+    resource = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=20, choices=ChangeAction.choices)
+    # status transitions as {"from": ..., "to": ...}
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # the feed's position, only handed out once the change has committed
+    # (see api.feed.number_changes)
+    sequence = models.BigIntegerField(null=True, unique=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(sequence__isnull=True),
+                name="api_change_unnumbered",
+            ),
+        ]
+
+    def __str__(self):
+        return f"#{self.sequence} {self.resource} {self.object_id} {self.action}"
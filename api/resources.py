@@ -0,0 +1,277 @@
+import datetime
+
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.geography import resolve_region
+from core.models import (
+    MissingPerson,
+    MissingPersonContact,
+    MissingPersonPhoto,
+    PhotoStatus,
+)
+
+from .auth import ApiError
+
+MAX_IDS = 500
+
+
+class Field:
+    """
+    An API field read from ``path`` (a ``.values()`` lookup) and optionally
+    passed through ``format(value, request)``. Fields without a path are
+    filled in by the resource after the rows are fetched.
+    """
+
+    def __init__(self, path=None, format=None):
+        self.path = path
+        self.format = format
+
+
+def media_url(name, request):
+    return request.build_absolute_uri(default_storage.url(name)) if name else None
+
+
+def rendition_urls(renditions, request):
+    return {
+        rendition: {
+            key: media_url(value, request) if key in ("webp", "jpeg") else value
+            for key, value in entry.items()
+        }
+        for rendition, entry in (renditions or {}).items()
+    }
+
+
+def full_rendition_url(renditions, request):
+    # the original upload keeps its EXIF (camera, often GPS), partners only
+    # get the re-encoded copies
+    entry = (renditions or {}).get("full", {})
+    return media_url(entry.get("jpeg"), request)
+
+
+def person_url(slug, request):
+    return request.build_absolute_uri(
+        reverse("core:missing_person_detail", args=[slug])
+    )
+
+
+class Resource:
+    """
+    A read-only collection exposed by the API. ``owners`` is the
+    MissingPerson m2m the rows are attached through, used to fill the
+    ``missing_persons`` field with one extra query per page.
+    """
+
+    def __init__(self, name, model, fields, default_fields, owners=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.default_fields = default_fields
+        self.owners = owners
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def allowed(self, client):
+        return True
+
+    def filter(self, queryset, params):
+        updated_since = params.get("updated_since")
+        if updated_since:
+            since = parse_datetime(updated_since)
+            if since is None:
+                raise ApiError("updated_since must be an ISO 8601 date and time")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, datetime.timezone.utc)
+            # >= so a sync that resumes from the newest updated_at it has
+            # seen can't miss rows sharing that timestamp
+            queryset = queryset.filter(updated_at__gte=since)
+
+        ids = params.get("ids")
+        if ids:
+            # what a change feed client asks for after reading a batch
+            try:
+                ids = {int(pk) for pk in ids.split(",")}
+            except ValueError:
+                raise ApiError("ids must be a comma separated list of ids")
+            if len(ids) > MAX_IDS:
+                raise ApiError(f"At most {MAX_IDS} ids can be requested at once")
+            queryset = queryset.filter(id__in=ids)
+
+        person = params.get("missing_person")
+        if person and self.owners:
+            queryset = queryset.filter(missingperson__slug=person)
+        return queryset
+
+    def select_fields(self, value):
+        """
+        Parse a comma separated ``fields`` parameter.
+        """
+        if not value:
+            return list(self.default_fields)
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(
+                f"Unknown fields: {', '.join(unknown)}. "
+                f"Available: {', '.join(self.fields)}"
+            )
+        return names
+
+    def values(self, queryset, field_names, extra_paths=()):
+        paths = {self.fields[name].path for name in field_names}
+        paths.discard(None)
+        paths.update(extra_paths)
+        return queryset.values(*sorted(paths))
+
+    def serialize(self, rows, field_names, request):
+        """
+        Turn ``.values()`` rows into API dicts holding only ``field_names``.
+        """
+        owners = {}
+        if "missing_persons" in field_names and self.owners:
+            owners = self.owner_map([row["id"] for row in rows])
+
+        results = []
+        for row in rows:
+            item = {}
+            for name in field_names:
+                field = self.fields[name]
+                if field.path is None:
+                    item[name] = owners.get(row["id"], [])
+                    continue
+                value = row[field.path]
+                item[name] = field.format(value, request) if field.format else value
+            results.append(item)
+        return results
+
+    def owner_map(self, ids):
+        through, column = self.owners
+        owners = {}
+        rows = through.objects.filter(**{f"{column}__in": ids}).values_list(
+            column, "missingperson_id"
+        )
+        for pk, person_id in rows:
+            owners.setdefault(pk, []).append(person_id)
+        return owners
+
+
+class MissingPersonResource(Resource):
+    def filter(self, queryset, params):
+        queryset = super().filter(queryset, params)
+        if params.get("status"):
+            queryset = queryset.filter(status=params["status"])
+        if params.get("county"):
+            region = resolve_region(params["county"])
+            if region.county_id is None:
+                raise ApiError(f"Unknown county {params['county']!r}")
+            queryset = queryset.filter(region_county_id=region.county_id)
+        return queryset
+
+
+class PhotoResource(Resource):
+    def get_queryset(self):
+        # photos still being processed don't have a usable file yet
+        return self.model.objects.filter(status=PhotoStatus.READY)
+
+
+class ContactResource(Resource):
+    def allowed(self, client):
+        return client.can_view_contacts
+
+
+missing_persons = MissingPersonResource(
+    "missing-persons",
+    MissingPerson,
+    fields={
+        "id": Field("id"),
+        "slug": Field("slug"),
+        "url": Field("slug", person_url),
+        "name": Field("name"),
+        "gender": Field("gender"),
+        "age": Field("age"),
+        "status": Field("status"),
+        "last_seen_location": Field("last_seen_location"),
+        "description": Field("description"),
+        "county": Field("county"),
+        "sub_county": Field("sub_county"),
+        "ward": Field("ward"),
+        "date_found": Field("date_found"),
+        "photo_count": Field("photo_count"),
+        "primary_photo": Field("primary_photo__renditions", full_rendition_url),
+        "created_at": Field("created_at"),
+        "updated_at": Field("updated_at"),
+    },
+    default_fields=[
+        "id",
+        "slug",
+        "url",
+        "name",
+        "gender",
+        "age",
+        "status",
+        "last_seen_location",
+        "county",
+        "sub_county",
+        "ward",
+        "primary_photo",
+        "created_at",
+        "updated_at",
+    ],
+)
+
+photos = PhotoResource(
+    "photos",
+    MissingPersonPhoto,
+    fields={
+        "id": Field("id"),
+        "url": Field("renditions", full_rendition_url),
+        "renditions": Field("renditions", rendition_urls),
+        "description": Field("description"),
+        "alternative_text": Field("alternative_text"),
+        "is_primary": Field("is_primary"),
+        "missing_persons": Field(),
+        "created_at": Field("created_at"),
+        "updated_at": Field("updated_at"),
+    },
+    default_fields=[
+        "id",
+        "url",
+        "renditions",
+        "description",
+        "alternative_text",
+        "is_primary",
+        "missing_persons",
+        "updated_at",
+    ],
+    owners=(MissingPerson.photos.through, "missingpersonphoto_id"),
+)
+
+contacts = ContactResource(
+    "contacts",
+    MissingPersonContact,
+    fields={
+        "id": Field("id"),
+        "name": Field("name"),
+        "phone_number": Field("phone_number"),
+        "email": Field("email"),
+        "missing_persons": Field(),
+        "created_at": Field("created_at"),
+        "updated_at": Field("updated_at"),
+    },
+    default_fields=[
+        "id",
+        "name",
+        "phone_number",
+        "email",
+        "missing_persons",
+        "updated_at",
+    ],
+    owners=(MissingPerson.contacts.through, "missingpersoncontact_id"),
+)
+
+RESOURCES = {
+    resource.name: resource for resource in (missing_persons, photos, contacts)
+}
@@ -0,0 +1,104 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import MissingPerson, MissingPersonContact, MissingPersonPhoto
+from core.signals import cases_imported, remember_previous
+
+from .models import Change, ChangeAction
+
+# model -> api resource name
+RESOURCE_NAMES = {
+    MissingPerson: "missing-persons",
+    MissingPersonPhoto: "photos",
+    MissingPersonContact: "contacts",
+}
+
+
+def log_changes(model, object_ids, action=ChangeAction.UPDATED):
+    # written in the caller's transaction so the log and the data it
+    # describes commit (or roll back) together
+    Change.objects.bulk_create(
+        Change(resource=RESOURCE_NAMES[model], object_id=pk, action=action)
+        for pk in object_ids
+    )
+
+
+remember_previous("status")
+
+
+@receiver(post_save, sender=MissingPerson)
+def log_person_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_values", None)
+    previous_status = previous["status"] if previous is not None else None
+    if created:
+        Change.objects.create(
+            resource="missing-persons",
+            object_id=instance.pk,
+            action=ChangeAction.CREATED,
+        )
+    elif previous_status is not None and previous_status != instance.status:
+        Change.objects.create(
+            resource="missing-persons",
+            object_id=instance.pk,
+            action=ChangeAction.STATUS_CHANGED,
+            data={"from": previous_status, "to": instance.status},
+        )
+    else:
+        log_changes(MissingPerson, [instance.pk])
+
+
+@receiver(post_save, sender=MissingPersonPhoto)
+def log_photo_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = ChangeAction.CREATED if created else ChangeAction.UPDATED
+    log_changes(MissingPersonPhoto, [instance.pk], action)
+    if not created:
+        # a photo becoming ready moves its owners' primary photo and count
+        log_changes(
+            MissingPerson, instance.missingperson_set.values_list("pk", flat=True)
+        )
+
+
+@receiver(post_save, sender=MissingPersonContact)
+def log_contact_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = ChangeAction.CREATED if created else ChangeAction.UPDATED
+    log_changes(MissingPersonContact, [instance.pk], action)
+
+
+@receiver(post_delete, sender=MissingPerson)
+@receiver(post_delete, sender=MissingPersonPhoto)
+@receiver(post_delete, sender=MissingPersonContact)
+def log_deleted(sender, instance, **kwargs):
+    log_changes(sender, [instance.pk], ChangeAction.DELETED)
+
+
+@receiver(m2m_changed, sender=MissingPerson.photos.through)
+@receiver(m2m_changed, sender=MissingPerson.contacts.through)
+def log_membership_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # photo and contact rows list the persons they belong to, persons show
+    # a photo count, so both sides changed
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        log_changes(type(instance), [instance.pk])
+        if pk_set:
+            log_changes(MissingPerson, pk_set)
+    else:
+        log_changes(MissingPerson, [instance.pk])
+        if pk_set:
+            log_changes(model, pk_set)
+
+
+@receiver(cases_imported)
+def log_imported(sender, persons, contacts, **kwargs):
+    log_changes(MissingPerson, [person.pk for person in persons], ChangeAction.CREATED)
+    log_changes(
+        MissingPersonContact,
+        [contact.pk for contact in contacts],
+        ChangeAction.CREATED,
+    )
@@ -0,0 +1,178 @@
+import csv
+import io
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import MissingPerson, MissingPersonPhoto, PhotoStatus
+from .feed import latest_sequence, number_changes, read_changes
+from .models import ApiClient, Change
+
+
+def add_change(object_id, **fields):
+    return Change.objects.create(
+        resource="persons", object_id=object_id, action="updated", **fields
+    )
+
+
+class ChangeFeedTests(TestCase):
+    def feed(self, since=0):
+        return read_changes(since, 100, ["persons"])
+
+    def test_numbers_in_id_order(self):
+        for object_id in range(3):
+            add_change(object_id)
+        changes = self.feed()
+        self.assertEqual([change["object_id"] for change in changes], [0, 1, 2])
+        sequences = [change["sequence"] for change in changes]
+        self.assertEqual(sequences, sorted(sequences))
+
+    def test_late_commit_numbered_after_seen_changes(self):
+        first = add_change(1)
+        add_change(2, id=first.id + 10)
+        seen = latest_sequence()
+
+        # a slow transaction committing the id it was handed earlier
+        add_change(3, id=first.id + 5)
+        changes = self.feed(since=seen)
+        self.assertEqual([change["object_id"] for change in changes], [3])
+        self.assertGreater(changes[0]["sequence"], seen)
+
+    def test_numbers_are_kept(self):
+        change = add_change(1)
+        number_changes()
+        change.refresh_from_db()
+        sequence = change.sequence
+        add_change(2)
+        number_changes()
+        change.refresh_from_db()
+        self.assertEqual(change.sequence, sequence)
+        self.assertGreater(latest_sequence(), sequence)
+
+
+def create_person(**fields):
+    return MissingPerson.objects.create(
+        **{"name": "Jane Wanjiru", "gender": "F", "age": 30, **fields}
+    )
+
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        # clients and rate limits are cached
+        cache.clear()
+        self.api_client = ApiClient(name="Red Cross")
+        self.key = self.api_client.generate_key()
+        self.api_client.save()
+
+    def get(self, url, params=None, **headers):
+        headers.setdefault("Authorization", f"Bearer {self.key}")
+        return self.client.get(url, params, headers=headers)
+
+
+class PhotoResourceTests(ApiTestCase):
+    def test_urls_point_at_renditions(self):
+        photo = MissingPersonPhoto.objects.create(
+            photo="missing_persons/original.jpg",
+            status=PhotoStatus.READY,
+            renditions={
+                "full": {
+                    "width": 1600,
+                    "height": 1200,
+                    "jpeg": "missing_persons/original_full.jpg",
+                    "webp": "missing_persons/original_full.webp",
+                }
+            },
+        )
+        person = create_person()
+        person.photos.add(photo)
+        MissingPerson.objects.filter(pk=person.pk).update(primary_photo=photo)
+
+        body = self.get(reverse("api:list", args=["photos"])).json()
+        url = body["results"][0]["url"]
+        self.assertTrue(url.endswith("/missing_persons/original_full.jpg"), url)
+
+        body = self.get(reverse("api:list", args=["missing-persons"])).json()
+        self.assertEqual(body["results"][0]["primary_photo"], url)
+
+
+class ApiAuthTests(ApiTestCase):
+    def test_requires_key(self):
+        response = self.client.get(reverse("api:index"))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_rejects_unknown_and_inactive_keys(self):
+        self.assertEqual(
+            self.get(reverse("api:index"), Authorization="Bearer nope").status_code,
+            401,
+        )
+        ApiClient.objects.filter(pk=self.api_client.pk).update(is_active=False)
+        cache.clear()
+        self.assertEqual(self.get(reverse("api:index")).status_code, 401)
+
+    def test_accepts_either_header(self):
+        response = self.get(reverse("api:index"), Authorization="", X_Api_Key=self.key)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("contacts", response.json())
+
+    def test_rate_limit(self):
+        ApiClient.objects.filter(pk=self.api_client.pk).update(rate_limit=2)
+        cache.clear()
+        url = reverse("api:index")
+        self.assertEqual(self.get(url)["X-RateLimit-Remaining"], "1")
+        self.assertEqual(self.get(url).status_code, 200)
+        response = self.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+
+    def test_contacts_need_permission(self):
+        url = reverse("api:list", args=["contacts"])
+        self.assertEqual(self.get(url).status_code, 403)
+        ApiClient.objects.filter(pk=self.api_client.pk).update(can_view_contacts=True)
+        cache.clear()
+        self.assertEqual(self.get(url).status_code, 200)
+
+    def test_read_only(self):
+        response = self.client.post(
+            reverse("api:index"), headers={"Authorization": f"Bearer {self.key}"}
+        )
+        self.assertEqual(response.status_code, 405)
+
+
+class ExportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.persons = [create_person(name=name) for name in ("Wanjiku", "Otieno")]
+        self.url = reverse("api:export", args=["missing-persons"])
+
+    def content(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response = self.get(self.url, {"fields": "id,name"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn(".ndjson", response["Content-Disposition"])
+        self.assertEqual(int(response["X-Change-Sequence"]), latest_sequence())
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(
+            rows, [{"id": person.id, "name": person.name} for person in self.persons]
+        )
+
+    def test_csv(self):
+        response = self.get(self.url, {"format": "csv", "fields": "id,name,created_at"})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(self.content(response))))
+        self.assertEqual(rows[0], ["id", "name", "created_at"])
+        self.assertEqual(
+            [row[:2] for row in rows[1:]],
+            [[str(person.id), person.name] for person in self.persons],
+        )
+        self.assertEqual(rows[1][2], self.persons[0].created_at.isoformat())
+
+    def test_unknown_format(self):
+        response = self.get(self.url, {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("format", response.json()["error"])
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.urls import path
+
+from . import views
+
+app_name = "api"
+
+# long-polls on the event loop under ASGI instead of holding a worker
+changes = views.achanges if settings.ASYNC_VIEWS else views.changes
+
+# bump the prefix in knmpdb/urls.py for breaking changes and keep serving
+# the old version alongside until partners have moved over
+urlpatterns = [
+    path("", views.index, name="index"),
+    path("changes/", changes, name="changes"),
+    path("<str:name>/export/", views.resource_export, name="export"),
+    path(
+        "missing-persons/<slug:slug>/",
+        views.missing_person_detail,
+        name="missing_person_detail",
+    ),
+    path("<str:name>/", views.resource_list, name="list"),
+]
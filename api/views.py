@@ -0,0 +1,275 @@
+import asyncio
+import csv
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from core.pagination import CursorPaginator, get_page_size
+
+from .auth import ApiError, api_endpoint
+from .feed import FeedGone, latest_sequence, read_changes
+from .resources import RESOURCES, missing_persons
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# rows fetched per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+DEFAULT_FEED_LIMIT = 100
+MAX_FEED_LIMIT = 1000
+
+# seconds between checks while a feed request is waiting for changes
+FEED_POLL_INTERVAL = 1
+
+# oldest change first, so a partner can follow with ``updated_since``
+SYNC_ORDERING = ("updated_at", "id")
+
+
+def get_resource(request, name):
+    resource = RESOURCES.get(name)
+    if resource is None:
+        raise Http404
+    if not resource.allowed(request.api_client):
+        raise ApiError(f"This API key can't read {name}", status=403)
+    return resource
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params["cursor"] = cursor
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+
+@api_endpoint
+def index(request):
+    urls = {
+        name: request.build_absolute_uri(f"{request.path}{name}/")
+        for name, resource in RESOURCES.items()
+        if resource.allowed(request.api_client)
+    }
+    urls["changes"] = request.build_absolute_uri(f"{request.path}changes/")
+    return JsonResponse(urls)
+
+
+@api_endpoint
+def resource_list(request, name):
+    """
+    A page of a resource. Supports ``fields``, ``updated_since``,
+    ``page_size`` and the ``cursor`` from a previous page's ``next``.
+    """
+    resource = get_resource(request, name)
+    field_names = resource.select_fields(request.GET.get("fields"))
+    queryset = resource.filter(resource.get_queryset(), request.GET)
+    rows = resource.values(queryset, field_names, extra_paths=SYNC_ORDERING)
+
+    page_size = get_page_size(
+        request.GET.get("page_size"), DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+    )
+    page = CursorPaginator(rows, page_size, SYNC_ORDERING).page(
+        request.GET.get("cursor")
+    )
+    return JsonResponse(
+        {
+            "results": resource.serialize(page.object_list, field_names, request),
+            "next": page_url(request, page.next_cursor),
+            "previous": page_url(request, page.previous_cursor),
+        }
+    )
+
+
+@api_endpoint
+def missing_person_detail(request, slug):
+    field_names = missing_persons.select_fields(request.GET.get("fields"))
+    queryset = missing_persons.get_queryset().filter(slug=slug)
+    rows = list(missing_persons.values(queryset, field_names, extra_paths=["id"]))
+    if not rows:
+        raise ApiError("Not found", status=404)
+    return JsonResponse(missing_persons.serialize(rows, field_names, request)[0])
+
+
+class Echo:
+    # csv.writer wants a file, this one hands each line straight back
+    def write(self, value):
+        return value
+
+
+def export_rows(resource, queryset, field_names, request):
+    """
+    Serialized rows of ``queryset`` fetched ``EXPORT_CHUNK_SIZE`` at a
+    time with ``iterator()``, so memory use doesn't grow with the table.
+    """
+    rows = resource.values(queryset, field_names, extra_paths=["id"]).order_by("id")
+    chunk = []
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield from resource.serialize(chunk, field_names, request)
+            chunk = []
+    yield from resource.serialize(chunk, field_names, request)
+
+
+def ndjson_lines(items):
+    for item in items:
+        yield json.dumps(item, cls=DjangoJSONEncoder) + "\n"
+
+
+def csv_lines(items, field_names):
+    writer = csv.writer(Echo())
+    yield writer.writerow(field_names)
+    for item in items:
+        row = []
+        for name in field_names:
+            value = item[name]
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, cls=DjangoJSONEncoder)
+            elif hasattr(value, "isoformat"):
+                value = value.isoformat()
+            row.append(value)
+        yield writer.writerow(row)
+
+
+@api_endpoint
+def resource_export(request, name):
+    """
+    The whole resource (after ``fields``/``updated_since`` filtering) as a
+    streamed ``format=ndjson`` (default) or ``format=csv`` download.
+    """
+    resource = get_resource(request, name)
+    export_format = request.GET.get("format", "ndjson")
+    if export_format not in ("ndjson", "csv"):
+        raise ApiError("format must be ndjson or csv")
+
+    field_names = resource.select_fields(request.GET.get("fields"))
+    queryset = resource.filter(resource.get_queryset(), request.GET)
+    # read before the export query, so following the feed from here may
+    # repeat a change already in the export but can't miss one
+    sequence = latest_sequence()
+    items = export_rows(resource, queryset, field_names, request)
+
+    if export_format == "csv":
+        response = StreamingHttpResponse(
+            csv_lines(items, field_names), content_type="text/csv"
+        )
+    else:
+        response = StreamingHttpResponse(
+            ndjson_lines(items), content_type="application/x-ndjson"
+        )
+    filename = f"{name}-{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["X-Change-Sequence"] = str(sequence)
+    return response
+
+
+def get_int(params, name, default, maximum):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ApiError(f"{name} must be a number")
+    if value < 0:
+        raise ApiError(f"{name} can't be negative")
+    return min(value, maximum)
+
+
+def changes_params(request):
+    since = get_int(request.GET, "since", 0, 2**63 - 1)
+    limit = get_int(request.GET, "limit", DEFAULT_FEED_LIMIT, MAX_FEED_LIMIT) or 1
+    wait = get_int(request.GET, "wait", 0, settings.CHANGE_FEED_MAX_WAIT)
+
+    allowed = [
+        name
+        for name, resource in RESOURCES.items()
+        if resource.allowed(request.api_client)
+    ]
+    resources = allowed
+    if request.GET.get("resources"):
+        resources = [name.strip() for name in request.GET["resources"].split(",")]
+        unknown = [name for name in resources if name not in allowed]
+        if unknown:
+            raise ApiError(f"Unknown resources: {', '.join(unknown)}")
+    return since, limit, wait, resources
+
+
+def feed_rows(since, limit, resources):
+    try:
+        return read_changes(since, limit, resources)
+    except FeedGone:
+        raise ApiError(
+            "Changes after this sequence have been pruned, start again "
+            "from a full export",
+            status=410,
+        )
+
+
+def changes_response(rows, since, limit):
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "sequence": row["sequence"],
+                    "resource": row["resource"],
+                    "id": row["object_id"],
+                    "action": row["action"],
+                    "data": row["data"],
+                    "changed_at": row["created_at"],
+                }
+                for row in rows
+            ],
+            "next_since": rows[-1]["sequence"] if rows else since,
+            "has_more": len(rows) == limit,
+        }
+    )
+
+
+@api_endpoint
+def changes(request):
+    """
+    Changes after sequence number ``since``, oldest first. Clients keep the
+    ``next_since`` of each response and fetch the changed rows with the list
+    endpoints' ``ids`` filter, starting from the ``X-Change-Sequence`` of a
+    full export. With ``wait`` (seconds, up to CHANGE_FEED_MAX_WAIT) the
+    request is held open until something changes. ``resources`` narrows the
+    feed to some resources.
+
+    A waiting request holds its worker the whole time, which is why
+    CHANGE_FEED_MAX_WAIT stays short unless the async version below is
+    served (ASYNC_VIEWS).
+    """
+    since, limit, wait, resources = changes_params(request)
+
+    deadline = time.monotonic() + wait
+    while True:
+        rows = feed_rows(since, limit, resources)
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            break
+        time.sleep(min(FEED_POLL_INTERVAL, remaining))
+
+    return changes_response(rows, since, limit)
+
+
+@api_endpoint
+async def achanges(request):
+    """
+    changes() for ASGI: a waiting request sleeps on the event loop rather
+    than holding a worker, so clients can wait longer.
+    """
+    since, limit, wait, resources = changes_params(request)
+
+    deadline = time.monotonic() + wait
+    while True:
+        rows = await sync_to_async(feed_rows)(since, limit, resources)
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            break
+        await asyncio.sleep(min(FEED_POLL_INTERVAL, remaining))
+
+    return changes_response(rows, since, limit)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from console.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily case rollup tables from the missing persons table"
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup rows"))
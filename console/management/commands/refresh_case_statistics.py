@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from console.models import CaseStatisticsSnapshot
+from console.stats import refresh_case_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the dashboard statistics tables. "
+        "Run periodically (e.g. from cron every few minutes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=100,
+            help="Number of old snapshots to keep (default: 100)",
+        )
+
+    def handle(self, *args, **options):
+        snapshot = refresh_case_statistics()
+
+        stale = CaseStatisticsSnapshot.objects.order_by("-refreshed_at").values_list(
+            "pk", flat=True
+        )[max(options["keep"], 1) :]
+        CaseStatisticsSnapshot.objects.filter(pk__in=list(stale)).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Case statistics refreshed at {snapshot.refreshed_at}")
+        )
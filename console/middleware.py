@@ -0,0 +1,106 @@
+import logging
+import random
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .profiling import Profile, current_profile, query_budget, recorder
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfilingMiddleware:
+    """
+    Measures a random ``REQUEST_PROFILING_RATE`` share of requests: query
+    count and time, template rendering time and the slowest statements,
+    totalled per view on the console's Performance page. Requests that
+    aren't sampled only pay for a random() call. Streamed responses are
+    measured up to the point the view returns.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        profile = Profile()
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                wrap_connections(stack, profile)
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        recorder.add(*self.finish(request, response, profile))
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        profile = Profile()
+        token = current_profile.set(profile)
+        try:
+            # under ASGI the ORM runs in a thread per request, wrap the
+            # connections of that thread
+            stack = ExitStack()
+            await sync_to_async(wrap_connections)(stack, profile)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            current_profile.reset(token)
+        # may write the totals out
+        await sync_to_async(recorder.add)(*self.finish(request, response, profile))
+        return response
+
+    def sampled(self):
+        rate = settings.REQUEST_PROFILING_RATE
+        return rate > 0 and random.random() < rate
+
+    def finish(self, request, response, profile):
+        """
+        Log and add Server-Timing for a profiled request, returns the
+        arguments for ``recorder.add``.
+        """
+        total_ms = profile.elapsed_ms()
+
+        match = request.resolver_match
+        # by URL name, not path, so /person/<slug>/ is one row
+        view = match.view_name if match else "unresolved"
+        budget = query_budget(view)
+        over_budget = budget is not None and profile.queries > budget
+        if over_budget:
+            logger.warning(
+                "%s ran %d queries, over its budget of %d (%s)",
+                view,
+                profile.queries,
+                budget,
+                request.get_full_path(),
+            )
+
+        if settings.REQUEST_PROFILING_SERVER_TIMING:
+            timing = profile.server_timing(total_ms)
+            if response.has_header("Server-Timing"):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response["Server-Timing"] = timing
+
+        return view, profile, total_ms, over_budget
+
+
+def wrap_connections(stack, profile):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(profile))
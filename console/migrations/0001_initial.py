@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="CaseStatisticsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("median_age", models.FloatField(blank=True, null=True)),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "get_latest_by": "refreshed_at",
+            },
+        ),
+        migrations.CreateModel(
+            name="CaseStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("county", models.CharField(blank=True, max_length=100)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("missing", "Missing"),
+                            ("found_pending", "Found - Pending Confirmation"),
+                            ("found_confirmed", "Found - Confirmed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("gender", models.CharField(blank=True, max_length=1)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("county", "status", "gender"),
+                        name="unique_case_statistic_group",
+                    )
+                ],
+            },
+        ),
+    ]
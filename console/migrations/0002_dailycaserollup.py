@@ -0,0 +1,92 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:42
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from console.rollups import age_bucket_expression
+
+
+def build_rollups(apps, schema_editor):
+    MissingPerson = apps.get_model("core", "MissingPerson")
+    DailyCaseRollup = apps.get_model("console", "DailyCaseRollup")
+    groups = (
+        MissingPerson.objects.order_by()
+        .annotate(
+            date=TruncDate("created_at", tzinfo=timezone.get_current_timezone()),
+            age_bucket=age_bucket_expression(),
+        )
+        .values(
+            "date", "county", "sub_county", "ward", "gender", "age_bucket", "status"
+        )
+        .annotate(count=Count("id"))
+    )
+    DailyCaseRollup.objects.bulk_create(
+        (DailyCaseRollup(**group) for group in groups), batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_name_phonetic_trigram"),
+        ("console", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCaseRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("county", models.CharField(blank=True, max_length=100)),
+                ("sub_county", models.CharField(blank=True, max_length=100)),
+                ("ward", models.CharField(blank=True, max_length=100)),
+                ("gender", models.CharField(blank=True, max_length=1)),
+                ("age_bucket", models.CharField(max_length=10)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("missing", "Missing"),
+                            ("found_pending", "Found - Pending Confirmation"),
+                            ("found_confirmed", "Found - Confirmed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["county", "date"], name="console_dai_county_f575dc_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "date",
+                            "county",
+                            "sub_county",
+                            "ward",
+                            "gender",
+                            "age_bucket",
+                            "status",
+                        ),
+                        name="unique_daily_case_rollup",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("console", "0002_dailycaserollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ViewPerformance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField()),
+                ("view", models.CharField(max_length=200)),
+                ("requests", models.PositiveIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("queries", models.PositiveIntegerField(default=0)),
+                ("max_queries", models.PositiveIntegerField(default=0)),
+                ("sql_ms", models.FloatField(default=0)),
+                ("template_ms", models.FloatField(default=0)),
+                ("budget_violations", models.PositiveIntegerField(default=0)),
+                ("slowest_queries", models.JSONField(default=list)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("hour", "view"), name="unique_view_performance_hour"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:19
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from console.rollups import age_bucket_expression
+
+
+def clear_rollups(apps, schema_editor):
+    # the old rows would collide under the coarser unique constraint
+    apps.get_model("console", "DailyCaseRollup").objects.all().delete()
+
+
+def build_rollups(apps, schema_editor):
+    MissingPerson = apps.get_model("core", "MissingPerson")
+    cases = MissingPerson.objects.order_by().annotate(
+        date=TruncDate("created_at", tzinfo=timezone.get_current_timezone()),
+        age_bucket=age_bucket_expression(),
+    )
+    for name, fields in (
+        ("DailyCaseRollup", ("date", "county", "gender", "age_bucket", "status")),
+        ("SubCountyCaseRollup", ("date", "county", "sub_county", "status")),
+    ):
+        model = apps.get_model("console", name)
+        groups = cases.values(*fields).annotate(count=Count("id"))
+        model.objects.bulk_create(
+            (model(**group) for group in groups), batch_size=5000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("console", "0003_viewperformance"),
+        ("core", "0012_missing_person_changed_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubCountyCaseRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("county", models.CharField(blank=True, max_length=100)),
+                ("sub_county", models.CharField(blank=True, max_length=100)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("missing", "Missing"),
+                            ("found_pending", "Found - Pending Confirmation"),
+                            ("found_confirmed", "Found - Confirmed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(clear_rollups, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="dailycaserollup",
+            name="unique_daily_case_rollup",
+        ),
+        migrations.RemoveField(
+            model_name="dailycaserollup",
+            name="sub_county",
+        ),
+        migrations.RemoveField(
+            model_name="dailycaserollup",
+            name="ward",
+        ),
+        migrations.AddIndex(
+            model_name="dailycaserollup",
+            index=models.Index(fields=["date"], name="console_dai_date_008b99_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailycaserollup",
+            constraint=models.UniqueConstraint(
+                fields=("date", "county", "gender", "age_bucket", "status"),
+                name="unique_daily_case_rollup",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="subcountycaserollup",
+            index=models.Index(
+                fields=["county", "date"], name="console_sub_county_1efbf6_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="subcountycaserollup",
+            constraint=models.UniqueConstraint(
+                fields=("date", "county", "sub_county", "status"),
+                name="unique_sub_county_case_rollup",
+            ),
+        ),
+        migrations.RunPython(build_rollups, clear_rollups),
+    ]
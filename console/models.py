@@ -1,2 +1,133 @@
+from django.db import models
+from core.models import Status
 
-# Create your models here.
+
+class CaseStatistic(models.Model):
+    """
+    Case counts grouped by county, status and gender. Rebuilt in one
+    GROUP BY by ``manage.py refresh_case_statistics`` so the dashboard
+    never has to aggregate the missing persons table itself.
+    """
+
+    county = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices)
+    gender = models.CharField(max_length=1, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["county", "status", "gender"],
+                name="unique_case_statistic_group",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.county or 'Unknown'} / {self.status} / {self.gender}: {self.count}"
+        )
+
+
+class CaseStatisticsSnapshot(models.Model):
+    """
+    Figures that can't be summed from ``CaseStatistic`` rows (like the
+    median age), plus when the statistics were last refreshed.
+    """
+
+    median_age = models.FloatField(null=True, blank=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        get_latest_by = "refreshed_at"
+
+    def __str__(self):
+        return f"Statistics as of {self.refreshed_at}"
+
+
+class DailyCaseRollup(models.Model):
+    """
+    Number of cases reported on ``date`` for each combination of county,
+    gender, age bucket and current status, behind the analytics trend and
+    county charts. Kept up to date incrementally from ``MissingPerson``
+    save/delete signals (see console.rollups) and rebuilt from scratch by
+    ``manage.py rebuild_case_rollups``.
+    """
+
+    date = models.DateField()
+    county = models.CharField(max_length=100, blank=True)
+    gender = models.CharField(max_length=1, blank=True)
+    age_bucket = models.CharField(max_length=10)
+    status = models.CharField(max_length=20, choices=Status.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "county", "gender", "age_bucket", "status"],
+                name="unique_daily_case_rollup",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+            models.Index(fields=["county", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.county or 'Unknown'}: {self.count}"
+
+
+class SubCountyCaseRollup(models.Model):
+    """
+    Cases reported on ``date`` per sub county and current status, for the
+    analytics drill-down into a county. Maintained like ``DailyCaseRollup``.
+    """
+
+    date = models.DateField()
+    county = models.CharField(max_length=100, blank=True)
+    sub_county = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "county", "sub_county", "status"],
+                name="unique_sub_county_case_rollup",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["county", "date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.sub_county or 'Unknown'}: {self.count}"
+
+
+class ViewPerformance(models.Model):
+    """
+    Timings and query counts of the sampled requests to one view (by URL
+    name) during one hour, recorded by ``console.profiling``.
+    """
+
+    hour = models.DateTimeField()
+    view = models.CharField(max_length=200)
+    requests = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    queries = models.PositiveIntegerField(default=0)
+    max_queries = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+    template_ms = models.FloatField(default=0)
+    budget_violations = models.PositiveIntegerField(default=0)
+    # [{"sql": ..., "ms": ...}], slowest first
+    slowest_queries = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "view"], name="unique_view_performance_hour"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.view}: {self.requests} requests"
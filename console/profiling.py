@@ -0,0 +1,209 @@
+import datetime
+import heapq
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils import timezone
+
+from .models import ViewPerformance
+
+logger = logging.getLogger(__name__)
+
+# slowest statements kept per request and per view and hour
+SLOWEST_KEPT = 5
+# long IN (...) lists make for enormous statements, the start is enough
+SQL_MAX_LENGTH = 1000
+
+# the Profile of the request being measured, if it is
+current_profile = ContextVar("current_profile", default=None)
+
+
+class Profile:
+    """
+    What one request spent on SQL and template rendering. Installed with
+    ``connection.execute_wrapper``, so it is called around every statement.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        # min-heap of (ms, sql), the slowest SLOWEST_KEPT statements
+        self.slowest = []
+        self.rendering = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, (time.perf_counter() - start) * 1000)
+
+    def record_query(self, sql, ms):
+        self.queries += 1
+        self.sql_ms += ms
+        entry = (ms, sql[:SQL_MAX_LENGTH])
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, entry)
+        elif ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+        if ms >= settings.SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1fms): %s", ms, sql[:SQL_MAX_LENGTH])
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        return (
+            f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries", '
+            f"tpl;dur={self.template_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = current_profile.get()
+        # included templates are rendered inside their parent's time
+        if profile is None or profile.rendering:
+            return super().render(context, request)
+        profile.rendering += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_ms += (time.perf_counter() - start) * 1000
+            profile.rendering -= 1
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing renders of requests that are
+    being profiled.
+    """
+
+    def from_string(self, template_code):
+        return ProfiledTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return ProfiledTemplate(super().get_template(template_name).template, self)
+
+
+def query_budget(view):
+    return settings.QUERY_BUDGETS.get(view, settings.DEFAULT_QUERY_BUDGET)
+
+
+def merge_slowest(*lists):
+    """
+    The ``SLOWEST_KEPT`` slowest of several ``[{"sql", "ms"}]`` lists, each
+    statement listed once with its slowest time.
+    """
+    slowest = {}
+    for entries in lists:
+        for entry in entries:
+            if entry["ms"] > slowest.get(entry["sql"], -1):
+                slowest[entry["sql"]] = entry["ms"]
+    return [
+        {"sql": sql, "ms": round(ms, 2)}
+        for sql, ms in heapq.nlargest(
+            SLOWEST_KEPT, slowest.items(), key=lambda item: item[1]
+        )
+    ]
+
+
+class Recorder:
+    """
+    Per view and hour totals of the profiled requests, kept in memory and
+    added to the ``ViewPerformance`` rows every
+    ``REQUEST_PROFILING_FLUSH_INTERVAL`` seconds, so the table is written a
+    handful of times a minute per process rather than on every request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.flushed_at = time.monotonic()
+        self.pruned_at = None
+
+    def add(self, view, profile, total_ms, over_budget):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        with self.lock:
+            totals = self.pending.get((hour, view))
+            if totals is None:
+                totals = self.pending[(hour, view)] = {
+                    "requests": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "sql_ms": 0.0,
+                    "template_ms": 0.0,
+                    "budget_violations": 0,
+                    "slowest_queries": [],
+                }
+            totals["requests"] += 1
+            totals["total_ms"] += total_ms
+            totals["max_ms"] = max(totals["max_ms"], total_ms)
+            totals["queries"] += profile.queries
+            totals["max_queries"] = max(totals["max_queries"], profile.queries)
+            totals["sql_ms"] += profile.sql_ms
+            totals["template_ms"] += profile.template_ms
+            totals["budget_violations"] += over_budget
+            totals["slowest_queries"] = merge_slowest(
+                totals["slowest_queries"],
+                [{"sql": sql, "ms": ms} for ms, sql in profile.slowest],
+            )
+            due = (
+                time.monotonic() - self.flushed_at
+                >= settings.REQUEST_PROFILING_FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        try:
+            for (hour, view), totals in pending.items():
+                save_totals(hour, view, totals)
+            if self.pruned_at is None or time.monotonic() - self.pruned_at >= 3600:
+                self.pruned_at = time.monotonic()
+                prune_view_performance(settings.REQUEST_PROFILING_RETENTION)
+        except DatabaseError:
+            # losing a minute of samples beats failing the request
+            logger.exception("Couldn't save request profiles")
+
+
+@transaction.atomic
+def save_totals(hour, view, totals):
+    row, _ = ViewPerformance.objects.select_for_update().get_or_create(
+        hour=hour, view=view
+    )
+    for field in (
+        "requests",
+        "total_ms",
+        "queries",
+        "sql_ms",
+        "template_ms",
+        "budget_violations",
+    ):
+        setattr(row, field, getattr(row, field) + totals[field])
+    row.max_ms = max(row.max_ms, totals["max_ms"])
+    row.max_queries = max(row.max_queries, totals["max_queries"])
+    row.slowest_queries = merge_slowest(row.slowest_queries, totals["slowest_queries"])
+    row.save()
+
+
+def prune_view_performance(days):
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    deleted, _ = ViewPerformance.objects.filter(hour__lt=cutoff).delete()
+    return deleted
+
+
+recorder = Recorder()
@@ -0,0 +1,130 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import MissingPerson
+from .models import DailyCaseRollup, SubCountyCaseRollup
+
+# (label, lowest age, highest age) - highest is None for the open ended bucket
+AGE_BUCKETS = (
+    ("0-4", 0, 4),
+    ("5-12", 5, 12),
+    ("13-17", 13, 17),
+    ("18-25", 18, 25),
+    ("26-35", 26, 35),
+    ("36-50", 36, 50),
+    ("51-65", 51, 65),
+    ("66+", 66, None),
+)
+UNKNOWN_AGE = "unknown"
+
+# the rollup tables and the dimensions each one counts cases by
+ROLLUPS = (
+    (DailyCaseRollup, ("date", "county", "gender", "age_bucket", "status")),
+    (SubCountyCaseRollup, ("date", "county", "sub_county", "status")),
+)
+
+# MissingPerson fields the rollup dimensions are derived from
+TRACKED_FIELDS = (
+    "created_at",
+    "county",
+    "sub_county",
+    "gender",
+    "age",
+    "status",
+)
+
+
+def age_bucket(age):
+    if age is None:
+        return UNKNOWN_AGE
+    for label, low, high in AGE_BUCKETS:
+        if age >= low and (high is None or age <= high):
+            return label
+    return UNKNOWN_AGE
+
+
+def age_bucket_expression():
+    """
+    Database side equivalent of ``age_bucket``, for rebuilding in one query.
+    """
+    whens = []
+    for label, low, high in AGE_BUCKETS:
+        condition = Q(age__gte=low) if high is None else Q(age__range=(low, high))
+        whens.append(When(condition, then=Value(label)))
+    return Case(*whens, default=Value(UNKNOWN_AGE), output_field=CharField())
+
+
+def rollup_keys(values):
+    """
+    The rollup rows a missing person counts towards, as ``(model, key)``
+    pairs, given a mapping of ``TRACKED_FIELDS``.
+    """
+    dimensions = {
+        "date": timezone.localdate(values["created_at"]),
+        "county": values["county"],
+        "sub_county": values["sub_county"],
+        "gender": values["gender"],
+        "age_bucket": age_bucket(values["age"]),
+        "status": values["status"],
+    }
+    return [
+        (model, {field: dimensions[field] for field in fields})
+        for model, fields in ROLLUPS
+    ]
+
+
+def bump(model, key, delta):
+    """
+    Add ``delta`` to the ``model`` rollup row for ``key``, creating it if
+    needed.
+    """
+    updated = model.objects.filter(**key).update(count=F("count") + delta)
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, count=delta)
+    except IntegrityError:
+        # another request created the row in the meantime
+        model.objects.filter(**key).update(count=F("count") + delta)
+
+
+def move(old_keys, new_keys):
+    """
+    Account for a case changing from ``old_keys`` to ``new_keys`` (either
+    may be None for a created or deleted case), both from ``rollup_keys``.
+    """
+    old_keys, new_keys = dict(old_keys or ()), dict(new_keys or ())
+    for model, _ in ROLLUPS:
+        old_key, new_key = old_keys.get(model), new_keys.get(model)
+        if old_key == new_key:
+            continue
+        if old_key is not None:
+            bump(model, old_key, -1)
+        if new_key is not None:
+            bump(model, new_key, 1)
+
+
+@transaction.atomic
+def rebuild_rollups():
+    """
+    Recompute every rollup row from ``MissingPerson``, one GROUP BY per
+    table, repairing any drift from missed signals (bulk updates, raw
+    SQL...). Returns the number of rows written.
+    """
+    cases = MissingPerson.objects.order_by().annotate(
+        date=TruncDate("created_at", tzinfo=timezone.get_current_timezone()),
+        age_bucket=age_bucket_expression(),
+    )
+    rows = 0
+    for model, fields in ROLLUPS:
+        groups = cases.values(*fields).annotate(count=Count("id"))
+        model.objects.all().delete()
+        rows += len(
+            model.objects.bulk_create(
+                (model(**group) for group in groups), batch_size=5000
+            )
+        )
+    return rows
@@ -0,0 +1,38 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import MissingPerson
+from core.signals import cases_imported, remember_previous
+from .rollups import TRACKED_FIELDS, bump, move, rollup_keys
+
+remember_previous(*TRACKED_FIELDS)
+
+
+@receiver(post_save, sender=MissingPerson)
+def update_rollups(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_values", None)
+    current = {field: getattr(instance, field) for field in TRACKED_FIELDS}
+    previous_keys = rollup_keys(previous) if previous is not None else None
+    move(previous_keys, rollup_keys(current))
+
+
+@receiver(post_delete, sender=MissingPerson)
+def remove_from_rollups(sender, instance, **kwargs):
+    current = {field: getattr(instance, field) for field in TRACKED_FIELDS}
+    move(rollup_keys(current), None)
+
+
+@receiver(cases_imported)
+def add_imported_to_rollups(sender, persons, **kwargs):
+    # one update per distinct rollup row rather than one per case
+    counts = Counter()
+    for person in persons:
+        values = {field: getattr(person, field) for field in TRACKED_FIELDS}
+        for model, key in rollup_keys(values):
+            counts[model, tuple(key.items())] += 1
+    for (model, key), count in counts.items():
+        bump(model, dict(key), count)
@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Aggregate, Count, FloatField, Q
+from django.utils import timezone
+
+from core.models import MissingPerson, Status
+from .models import CaseStatistic, CaseStatisticsSnapshot
+
+
+class PercentileCont(Aggregate):
+    """
+    PostgreSQL ``percentile_cont(fraction) WITHIN GROUP (ORDER BY expr)``.
+    """
+
+    function = "percentile_cont"
+    template = "%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=percentile, **extra)
+
+
+def median_age(queryset):
+    """
+    Median age computed in the database: ``percentile_cont`` on PostgreSQL,
+    otherwise one or two ``ORDER BY age LIMIT 1 OFFSET n/2`` lookups.
+    """
+    ages = queryset.filter(age__isnull=False)
+    if connection.vendor == "postgresql":
+        return ages.aggregate(median=PercentileCont("age", 0.5))["median"]
+
+    n = ages.count()
+    if not n:
+        return None
+    ordered = ages.order_by("age").values_list("age", flat=True)
+    if n % 2 == 1:
+        return ordered[n // 2]
+    return sum(ordered[n // 2 - 1 : n // 2 + 1]) / 2
+
+
+@transaction.atomic
+def refresh_case_statistics():
+    """
+    Rebuild the ``CaseStatistic`` table and take a new snapshot.
+    """
+    groups = (
+        MissingPerson.objects.order_by()
+        .values("county", "status", "gender")
+        .annotate(count=Count("id"))
+    )
+    CaseStatistic.objects.all().delete()
+    CaseStatistic.objects.bulk_create(CaseStatistic(**group) for group in groups)
+    return CaseStatisticsSnapshot.objects.create(
+        median_age=median_age(MissingPerson.objects.all()),
+        refreshed_at=timezone.now(),
+    )
+
+
+def summarize(rows):
+    """
+    Fold ``(county, status, gender, count)`` rows into the dashboard figures.
+    """
+    total = still_missing = 0
+    counties = {}
+    genders = {}
+    for county, status, gender, count in rows:
+        total += count
+        if status == Status.MISSING:
+            still_missing += count
+        counties[county] = counties.get(county, 0) + count
+        genders[gender] = genders.get(gender, 0) + count
+
+    county_with_most_missing = None
+    if counties:
+        county = max(counties, key=counties.get)
+        county_with_most_missing = {"county": county, "count": counties[county]}
+
+    return {
+        "total_missing": total,
+        "still_missing": still_missing,
+        "resolved_cases": total - still_missing,
+        "county_with_most_missing": county_with_most_missing,
+        "gender_counts": genders,
+    }
+
+
+def live_case_statistics():
+    """
+    Dashboard figures straight from ``MissingPerson``: one conditional
+    aggregation for the totals plus a GROUP BY for the top county.
+    Used until ``refresh_case_statistics`` has run at least once, and when
+    it hasn't run for ``CASE_STATISTICS_MAX_AGE`` minutes.
+    """
+    queryset = MissingPerson.objects.order_by()
+    aggregates = {
+        "total_missing": Count("id"),
+        "still_missing": Count("id", filter=Q(status=Status.MISSING)),
+        "male": Count("id", filter=Q(gender="M")),
+        "female": Count("id", filter=Q(gender="F")),
+    }
+    if connection.vendor == "postgresql":
+        aggregates["median_age"] = PercentileCont("age", 0.5)
+    totals = queryset.aggregate(**aggregates)
+
+    county_with_most_missing = (
+        queryset.values("county").annotate(count=Count("id")).order_by("-count").first()
+    )
+    return {
+        "total_missing": totals["total_missing"],
+        "still_missing": totals["still_missing"],
+        "resolved_cases": totals["total_missing"] - totals["still_missing"],
+        "county_with_most_missing": county_with_most_missing,
+        "gender_counts": {"M": totals["male"], "F": totals["female"]},
+        "median_age": (
+            totals["median_age"]
+            if "median_age" in totals
+            else median_age(MissingPerson.objects.all())
+        ),
+        "refreshed_at": None,
+    }
+
+
+def case_statistics():
+    """
+    Dashboard figures from the statistics tables: two small queries no
+    matter how many reports exist. Falls back to ``live_case_statistics``
+    rather than show a stale snapshot when the refresh has stopped running.
+    """
+    snapshot = CaseStatisticsSnapshot.objects.order_by("-refreshed_at").first()
+    max_age = timedelta(minutes=settings.CASE_STATISTICS_MAX_AGE)
+    if snapshot is None or snapshot.refreshed_at < timezone.now() - max_age:
+        return live_case_statistics()
+
+    rows = CaseStatistic.objects.values_list("county", "status", "gender", "count")
+    stats = summarize(rows)
+    stats["median_age"] = snapshot.median_age
+    stats["refreshed_at"] = snapshot.refreshed_at
+    return stats
@@ -1,3 +1,184 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import MissingPerson, Status
+from core.signals import cases_imported
+from .models import CaseStatisticsSnapshot, DailyCaseRollup, SubCountyCaseRollup
+from .rollups import rebuild_rollups
+from .stats import case_statistics, refresh_case_statistics
+from .views import CASES_TABLE_COLUMNS
+
+
+def create_person(**fields):
+    return MissingPerson.objects.create(
+        **{
+            "name": "Jane Wanjiru",
+            "gender": "F",
+            "age": 30,
+            "county": "NAIROBI",
+            "sub_county": "WESTLANDS",
+            "last_seen_location": "Nairobi",
+            **fields,
+        }
+    )
+
+
+def counts(model, *fields):
+    return {
+        tuple(row[field] for field in fields): row["count"]
+        for row in model.objects.filter(count__gt=0).values(*fields, "count")
+    }
+
+
+class RollupTests(TestCase):
+    def assertRollups(self, by_county, by_sub_county):
+        self.assertEqual(
+            counts(DailyCaseRollup, "county", "age_bucket", "status"), by_county
+        )
+        self.assertEqual(
+            counts(SubCountyCaseRollup, "sub_county", "status"), by_sub_county
+        )
+
+    def test_counts_created_cases(self):
+        create_person()
+        create_person(age=8, sub_county="KIBRA")
+        self.assertRollups(
+            {
+                ("NAIROBI", "26-35", Status.MISSING): 1,
+                ("NAIROBI", "5-12", Status.MISSING): 1,
+            },
+            {("WESTLANDS", Status.MISSING): 1, ("KIBRA", Status.MISSING): 1},
+        )
+        # the county table doesn't split by sub county
+        self.assertEqual(DailyCaseRollup.objects.count(), 2)
+
+    def test_moves_case_on_save(self):
+        person = create_person()
+        person = MissingPerson.objects.get(pk=person.pk)
+        person.status = Status.FOUND_PENDING
+        person.sub_county = "KIBRA"
+        person.save()
+        self.assertRollups(
+            {("NAIROBI", "26-35", Status.FOUND_PENDING): 1},
+            {("KIBRA", Status.FOUND_PENDING): 1},
+        )
+
+    def test_unrelated_save_leaves_rollups(self):
+        person = create_person()
+        person = MissingPerson.objects.get(pk=person.pk)
+        person.description = "Seen in Thika"
+        person.save()
+        self.assertEqual(DailyCaseRollup.objects.get().count, 1)
+
+    def test_removes_case_on_delete(self):
+        create_person()
+        create_person().delete()
+        self.assertRollups(
+            {("NAIROBI", "26-35", Status.MISSING): 1},
+            {("WESTLANDS", Status.MISSING): 1},
+        )
+
+    def test_counts_imported_cases(self):
+        persons = MissingPerson.objects.bulk_create(
+            [
+                MissingPerson(
+                    name=f"Case {i}", gender="M", county="Kisumu", sub_county="Nyando"
+                )
+                for i in range(3)
+            ]
+        )
+        cases_imported.send(sender=MissingPerson, persons=persons, contacts=[])
+        self.assertRollups(
+            {("Kisumu", "unknown", Status.MISSING): 3},
+            {("Nyando", Status.MISSING): 3},
+        )
+
+    def test_rebuild_matches_signals(self):
+        create_person()
+        create_person(age=70, county="MOMBASA", sub_county="NYALI")
+        expected = (
+            counts(DailyCaseRollup, "county", "age_bucket", "status"),
+            counts(SubCountyCaseRollup, "sub_county", "status"),
+        )
+        DailyCaseRollup.objects.update(count=0)
+        self.assertEqual(rebuild_rollups(), 4)
+        self.assertRollups(*expected)
+
+
+class CasesTableTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        staff = User.objects.create_user("staff", is_staff=True)
+        self.client.force_login(staff)
+        for name in ("Wanjiku Kamau", "Otieno Odhiambo", "Akinyi Otieno"):
+            create_person(name=name)
+
+    def get(self, **params):
+        response = self.client.get(reverse("console:cases_data"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_response_shape(self):
+        body = self.get(draw="3", start="0", length="2")
+        self.assertEqual(body["draw"], 3)
+        self.assertEqual((body["recordsTotal"], body["recordsFiltered"]), (3, 3))
+        self.assertEqual(len(body["data"]), 2)
+        row = body["data"][0]
+        self.assertEqual(
+            set(row),
+            {"id", "slug", *CASES_TABLE_COLUMNS, "edit_url", "detail_url"},
+        )
+        self.assertEqual(
+            row["edit_url"], reverse("console:edit_report", args=[row["slug"]])
+        )
+
+    def test_search_filters_count(self):
+        body = self.get(**{"search[value]": "Otieno"})
+        self.assertEqual((body["recordsTotal"], body["recordsFiltered"]), (3, 2))
+        self.assertEqual(len(body["data"]), 2)
+
+    def test_pages_and_orders(self):
+        params = {"order[0][column]": "0", "order[0][dir]": "asc", "length": "2"}
+        first = self.get(**params, start="0")["data"]
+        last = self.get(**params, start="2")["data"]
+        names = [row["name"] for row in first + last]
+        self.assertEqual(names, sorted(names))
+        self.assertEqual(len(last), 1)
+
+    def test_staff_only(self):
+        self.client.logout()
+        response = self.client.get(reverse("console:cases_data"))
+        self.assertEqual(response.status_code, 302)
+
+
+class CaseStatisticsTests(TestCase):
+    def test_live_until_first_refresh(self):
+        create_person()
+        stats = case_statistics()
+        self.assertEqual(stats["total_missing"], 1)
+        self.assertIsNone(stats["refreshed_at"])
+
+    def test_serves_snapshot(self):
+        create_person()
+        snapshot = refresh_case_statistics()
+        create_person()
+        stats = case_statistics()
+        self.assertEqual(stats["total_missing"], 1)
+        self.assertEqual(stats["refreshed_at"], snapshot.refreshed_at)
 
-# Create your tests here.
+    def test_live_once_snapshot_is_stale(self):
+        create_person()
+        refresh_case_statistics()
+        create_person()
+        CaseStatisticsSnapshot.objects.update(
+            refreshed_at=timezone.now() - timedelta(minutes=61)
+        )
+        with self.settings(CASE_STATISTICS_MAX_AGE=60):
+            stats = case_statistics()
+        self.assertEqual(stats["total_missing"], 2)
+        self.assertIsNone(stats["refreshed_at"])
@@ -1,10 +1,21 @@
 from django.urls import path
-from .views import dashboard, edit_missing_persons_report
+from .views import (
+    analytics,
+    dashboard,
+    dashboard_cases_data,
+    edit_missing_persons_report,
+    import_cases_view,
+    performance,
+)
 
 
 app_name = "console"
 
 urlpatterns = [
     path("", dashboard, name="dashboard"),
+    path("cases-data/", dashboard_cases_data, name="cases_data"),
+    path("analytics/", analytics, name="analytics"),
+    path("import/", import_cases_view, name="import_cases"),
+    path("performance/", performance, name="performance"),
     path("edit-report/<slug:slug>/", edit_missing_persons_report, name="edit_report"),
 ]
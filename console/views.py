@@ -1,42 +1,41 @@
-from django.http import HttpRequest
-from core.models import MissingPerson
+import hashlib
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.contrib import messages
+from django.http import HttpRequest, JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.timezone import localtime
+from core.database import connection_stats
+from core.imports import import_cases, read_rows
+from core.models import MissingPerson, Status
+from core.pagination import get_page_size
+from core.routers import read_from_replica
+from core.search import search_missing_persons
 from django.shortcuts import get_object_or_404, render
-from django.db import models
 from typing import Dict, Any, List
 from django.contrib.admin.views.decorators import staff_member_required
+from .models import DailyCaseRollup, SubCountyCaseRollup, ViewPerformance
+from .profiling import merge_slowest, query_budget, recorder
+from .rollups import AGE_BUCKETS, UNKNOWN_AGE
+from .stats import case_statistics
 
 
-def get_gender_stats(missing_persons) -> List[Dict[str, Any]]:
-
-    most_missing_gender = (
-        missing_persons.values("gender")
-        .annotate(count=models.Count("gender"))
-        .order_by("-count")
-    )
-    most_missing = most_missing_gender.first()
-    other_missing_gender = most_missing_gender.last()
+def get_gender_stats(gender_counts: Dict[str, int]) -> List[Dict[str, Any]]:
+    total = sum(gender_counts.values())
 
     gender_stats = [
         {
-            "gender": most_missing["gender"],
-            "count": most_missing["count"],
-            "percentage": (
-                round((most_missing["count"] / missing_persons.count()) * 100, 2)
-                if missing_persons.count() > 0
-                else 0
-            ),
-        },
-        {
-            "gender": other_missing_gender["gender"],
-            "count": other_missing_gender["count"],
-            "percentage": (
-                round(
-                    (other_missing_gender["count"] / missing_persons.count()) * 100, 2
-                )
-                if missing_persons.count() > 0
-                else 0
-            ),
-        },
+            "gender": gender,
+            "count": count,
+            "percentage": round((count / total) * 100, 2) if total > 0 else 0,
+        }
+        for gender, count in sorted(
+            gender_counts.items(), key=lambda item: item[1], reverse=True
+        )
     ]
 
     return gender_stats
@@ -44,47 +43,106 @@ def get_gender_stats(missing_persons) -> List[Dict[str, Any]]:
 
 # only accessible by admin users
 @staff_member_required
+@read_from_replica
 def dashboard(request: HttpRequest):
-    # missing persons
-    missing_persons = MissingPerson.objects.all().order_by("-created_at")
-    # simple statistics
-    still_missing = missing_persons.filter(status="missing").count()
-    resolved_cases = missing_persons.exclude(status="missing").count()
-    # county with most missing persons
-    county_with_most_missing = (
-        missing_persons.values("county")
-        .annotate(count=models.Count("id"))
-        .order_by("-count")
-        .first()
-    )
-    # gender stats
-
-    gender_stats = get_gender_stats(missing_persons)
-
-    # median age of missing persons
-    ages = list(missing_persons.exclude(age__isnull=True).values_list("age", flat=True))
-    median_age = None
-    if ages:
-        ages.sort()
-        n = len(ages)
-        if n % 2 == 1:
-            median_age = ages[n // 2]
-        else:
-            median_age = (ages[n // 2 - 1] + ages[n // 2]) / 2
+    # figures come from the statistics tables (see console.stats), so this
+    # is a couple of small queries however many reports there are
+    stats = case_statistics()
 
     context = {
-        "total_missing": missing_persons.count(),
-        "still_missing": still_missing,
-        "resolved_cases": resolved_cases,
-        "county_with_most_missing": county_with_most_missing,
-        "median_age": median_age,
-        "page_items": missing_persons,  # Pass all items for DataTables to handle
-        "gender_stats": gender_stats,
+        "total_missing": stats["total_missing"],
+        "still_missing": stats["still_missing"],
+        "resolved_cases": stats["resolved_cases"],
+        "county_with_most_missing": stats["county_with_most_missing"],
+        "median_age": stats["median_age"],
+        "gender_stats": get_gender_stats(stats["gender_counts"]),
+        "stats_refreshed_at": stats["refreshed_at"],
     }
 
     return render(request, "console/dashboard.html", context)
 
 
+# columns of the dashboard cases table, in the order DataTables sends them
+CASES_TABLE_COLUMNS = ["name", "gender", "age", "county", "status", "created_at"]
+
+# seconds the table's row counts are reused while staff page through it
+CASES_COUNT_CACHE_TIMEOUT = 30
+
+
+def cached_count(queryset, search_value=""):
+    # exact, the pager is built from it, an estimate leaves pages missing or
+    # empty at the end
+    digest = hashlib.md5(search_value.encode()).hexdigest()
+    cache_key = f"console:cases:count:{digest}"
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, CASES_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+# only accessible by admin users
+@staff_member_required
+@read_from_replica
+def dashboard_cases_data(request: HttpRequest):
+    """
+    Server-side data source for the dashboard cases table, speaking the
+    DataTables protocol (draw / start / length / search / order) so only
+    the rows on screen ever leave the database.
+    """
+    try:
+        draw = int(request.GET.get("draw", 0))
+        start = max(int(request.GET.get("start", 0)), 0)
+    except ValueError:
+        draw, start = 0, 0
+    length = get_page_size(request.GET.get("length"), default=25, maximum=100)
+    search_value = request.GET.get("search[value]", "").strip()
+
+    cases = MissingPerson.objects.all()
+    records_total = records_filtered = cached_count(cases)
+    if search_value:
+        cases = search_missing_persons(cases, search_value)
+        records_filtered = cached_count(cases, search_value)
+
+    ordering = []
+    for i in range(len(CASES_TABLE_COLUMNS)):
+        column = request.GET.get(f"order[{i}][column]")
+        if column is None:
+            break
+        try:
+            field = CASES_TABLE_COLUMNS[int(column)]
+        except (ValueError, IndexError):
+            continue
+        direction = "-" if request.GET.get(f"order[{i}][dir]") == "desc" else ""
+        ordering.append(f"{direction}{field}")
+    ordering += ["-created_at", "-id"]
+
+    rows = cases.order_by(*ordering).values("id", "slug", *CASES_TABLE_COLUMNS)[
+        start : start + length
+    ]
+
+    data = [
+        {
+            **row,
+            "created_at": localtime(row["created_at"]).strftime("%b %d, %Y"),
+            "edit_url": reverse("console:edit_report", args=[row["slug"]]),
+            "detail_url": reverse(
+                "core:missing_person_detail", kwargs={"slug": row["slug"]}
+            ),
+        }
+        for row in rows
+    ]
+
+    return JsonResponse(
+        {
+            "draw": draw,
+            "recordsTotal": records_total,
+            "recordsFiltered": records_filtered,
+            "data": data,
+        }
+    )
+
+
 # only accessible by admin users
 @staff_member_required
 def edit_missing_persons_report(request: HttpRequest, slug: str):
@@ -92,3 +150,200 @@ def edit_missing_persons_report(request: HttpRequest, slug: str):
     return render(
         request, "console/edit_report.html", {"missing_person": missing_person}
     )
+
+
+# only accessible by admin users
+@staff_member_required
+@read_from_replica
+def analytics(request: HttpRequest):
+    """
+    Case trends and breakdowns, read only from the daily rollup tables.
+    """
+    county = request.GET.get("county", "")
+    granularity = "month" if request.GET.get("granularity") == "month" else "day"
+    try:
+        since = date.fromisoformat(request.GET.get("since", ""))
+    except ValueError:
+        since = None
+    try:
+        until = date.fromisoformat(request.GET.get("until", ""))
+    except ValueError:
+        until = None
+
+    def in_range(rollups):
+        if since:
+            rollups = rollups.filter(date__gte=since)
+        if until:
+            rollups = rollups.filter(date__lte=until)
+        if county:
+            rollups = rollups.filter(county=county)
+        return rollups
+
+    rollups = in_range(DailyCaseRollup.objects.order_by())
+
+    total = Sum("count")
+    still_missing = Sum("count", filter=Q(status=Status.MISSING))
+
+    period = TruncMonth("date") if granularity == "month" else F("date")
+    trend = (
+        rollups.annotate(period=period)
+        .values("period")
+        .annotate(total=total, missing=still_missing)
+        .order_by("period")
+    )
+
+    # drill down a level when a county is selected, the county table doesn't
+    # keep sub counties
+    if county:
+        regions = in_range(SubCountyCaseRollup.objects.order_by())
+        region_field = "sub_county"
+    else:
+        regions = rollups
+        region_field = "county"
+    by_region = (
+        regions.values(region=F(region_field))
+        .annotate(total=total, missing=still_missing)
+        .order_by("-total")
+    )
+    by_gender = rollups.values("gender").annotate(total=total).order_by("gender")
+    by_status = rollups.values("status").annotate(total=total).order_by("status")
+    by_age = {
+        row["age_bucket"]: row["total"]
+        for row in rollups.values("age_bucket").annotate(total=total)
+    }
+
+    age_labels = [label for label, _, _ in AGE_BUCKETS] + [UNKNOWN_AGE]
+    chart_data = {
+        "trend": {
+            "labels": [row["period"].isoformat() for row in trend],
+            "total": [row["total"] for row in trend],
+            "missing": [row["missing"] or 0 for row in trend],
+        },
+        "age": {
+            "labels": age_labels,
+            "total": [by_age.get(label, 0) for label in age_labels],
+        },
+    }
+
+    context = {
+        "county": county,
+        "counties": DailyCaseRollup.objects.order_by("county")
+        .values_list("county", flat=True)
+        .distinct(),
+        "granularity": granularity,
+        "since": since,
+        "until": until,
+        "region_label": "Sub County" if county else "County",
+        "by_region": by_region,
+        "by_gender": by_gender,
+        "by_status": [
+            {**row, "label": Status(row["status"]).label} for row in by_status
+        ],
+        "chart_data": chart_data,
+    }
+    return render(request, "console/analytics.html", context)
+
+
+# errors listed on the import page, the command prints them all
+MAX_IMPORT_ERRORS_SHOWN = 200
+
+
+# only accessible by admin users
+@staff_member_required
+def import_cases_view(request: HttpRequest):
+    """
+    Upload a CSV or JSON file of cases (see core.imports for the columns).
+    Very large files are better run through ``manage.py import_cases``.
+    """
+    result = None
+    if request.method == "POST":
+        upload = request.FILES.get("file")
+        if upload is None:
+            messages.error(request, "Choose a CSV or JSON file to import.")
+        else:
+            try:
+                result = import_cases(
+                    read_rows(upload, upload.name),
+                    dry_run=request.POST.get("dry_run") == "on",
+                )
+            except ValueError as e:
+                messages.error(request, str(e))
+
+    return render(
+        request,
+        "console/import_cases.html",
+        {
+            "result": result,
+            "errors": result.errors[:MAX_IMPORT_ERRORS_SHOWN] if result else [],
+            "dry_run": request.POST.get("dry_run") == "on",
+        },
+    )
+
+
+# hours the performance page can look back over
+PERFORMANCE_PERIODS = {1: "Last hour", 24: "Last 24 hours", 24 * 7: "Last 7 days"}
+
+
+# only accessible by admin users
+@staff_member_required
+def performance(request: HttpRequest):
+    """
+    Per view timings and query counts of the sampled requests (see
+    console.profiling), slowest in total first.
+    """
+    try:
+        hours = int(request.GET.get("hours", 24))
+    except ValueError:
+        hours = 24
+    if hours not in PERFORMANCE_PERIODS:
+        hours = 24
+
+    # this process's latest samples would otherwise wait for the next flush
+    recorder.flush()
+    rows = ViewPerformance.objects.filter(
+        hour__gte=timezone.now() - timedelta(hours=hours)
+    )
+    slowest = {}
+    for view, queries in rows.values_list("view", "slowest_queries"):
+        slowest[view] = merge_slowest(slowest.get(view, []), queries)
+
+    views = []
+    for row in (
+        rows.values("view")
+        .annotate(
+            requests=Sum("requests"),
+            total_ms=Sum("total_ms"),
+            max_ms=Max("max_ms"),
+            queries=Sum("queries"),
+            max_queries=Max("max_queries"),
+            sql_ms=Sum("sql_ms"),
+            template_ms=Sum("template_ms"),
+            budget_violations=Sum("budget_violations"),
+        )
+        .order_by("-total_ms")
+    ):
+        requests = row["requests"] or 1
+        views.append(
+            {
+                **row,
+                "average_ms": row["total_ms"] / requests,
+                "average_queries": row["queries"] / requests,
+                "average_sql_ms": row["sql_ms"] / requests,
+                "average_template_ms": row["template_ms"] / requests,
+                "budget": query_budget(row["view"]),
+                "slowest_queries": slowest.get(row["view"], []),
+            }
+        )
+
+    return render(
+        request,
+        "console/performance.html",
+        {
+            "views": views,
+            "hours": hours,
+            "periods": PERFORMANCE_PERIODS,
+            "sample_rate": settings.REQUEST_PROFILING_RATE * 100,
+            "slow_query_ms": settings.SLOW_QUERY_MS,
+            "connections": connection_stats(),
+        },
+    )
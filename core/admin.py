@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import MissingPerson, MissingPersonPhoto, MissingPersonContact
+from .fuzzy import fuzzy_search_contacts
+from .models import (
+    Constituency,
+    County,
+    Job,
+    MissingPerson,
+    MissingPersonContact,
+    MissingPersonPhoto,
+    Ward,
+)
 
 
 # Inline: show photos inside MissingPerson admin
@@ -31,7 +40,7 @@ class MissingPersonAdmin(admin.ModelAdmin):
     )
     list_filter = (
         "status",
-        "county",
+        "region_county",
         "gender",
         "created_at",
     )
@@ -44,7 +53,8 @@ class MissingPersonAdmin(admin.ModelAdmin):
 
 @admin.register(MissingPersonPhoto)
 class MissingPersonPhotoAdmin(admin.ModelAdmin):
-    list_display = ("id", "description", "created_at")
+    list_display = ("id", "description", "status", "created_at")
+    list_filter = ("status",)
     search_fields = ("description",)
     ordering = ("-created_at",)
 
@@ -54,3 +64,44 @@ class MissingPersonContactAdmin(admin.ModelAdmin):
     list_display = ("name", "phone_number", "email", "created_at")
     search_fields = ("name", "phone_number", "email")
     ordering = ("-created_at",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # also surface contacts whose name is spelled differently, to spot duplicates
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            similar = fuzzy_search_contacts(queryset, search_term).values("pk")
+            results |= queryset.filter(pk__in=similar)
+        return results, may_have_duplicates
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_after", "updated_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("locked_at", "last_error")
+    ordering = ("-created_at",)
+
+
+@admin.register(County)
+class CountyAdmin(admin.ModelAdmin):
+    list_display = ("code", "name")
+    search_fields = ("name",)
+    ordering = ("code",)
+
+
+@admin.register(Constituency)
+class ConstituencyAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "county")
+    list_filter = ("county",)
+    search_fields = ("name",)
+    ordering = ("code",)
+
+
+@admin.register(Ward)
+class WardAdmin(admin.ModelAdmin):
+    list_display = ("code", "name", "constituency")
+    search_fields = ("name", "constituency__name")
+    list_select_related = ("constituency",)
+    ordering = ("code",)
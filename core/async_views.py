@@ -0,0 +1,116 @@
+import datetime
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from . import views
+from .cache import cache_anonymous_page, listing_page_key, person_page_key
+from .geography import alocation_index
+from .models import MissingPerson
+from .pagination import approximate_count
+from .routers import read_from_replica
+
+# Async versions of the public read views in core.views, routed in their
+# place when ASYNC_VIEWS is on (the default under ASGI, see knmpdb/asgi.py).
+# Queries go through the async ORM; rendering, which also reads the session
+# and user, runs in the request's ORM thread in one go.
+
+
+def condition(etag_func=None, last_modified_func=None):
+    """
+    ``django.views.decorators.http.condition`` for async views. Django's
+    calls the validator functions on the event loop, where they can't
+    query, so here they run in the ORM thread.
+    """
+
+    def validators(request, *args, **kwargs):
+        last_modified = None
+        if last_modified_func:
+            if dt := last_modified_func(request, *args, **kwargs):
+                if not timezone.is_aware(dt):
+                    dt = timezone.make_aware(dt, datetime.timezone.utc)
+                last_modified = int(dt.timestamp())
+        etag = etag_func(request, *args, **kwargs) if etag_func else None
+        return (quote_etag(etag) if etag is not None else None), last_modified
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(validators)(
+                request, *args, **kwargs
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if last_modified and not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault("ETag", etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+@read_from_replica
+@cache_anonymous_page(listing_page_key)
+async def web_index(request):
+    latest_missing_persons = [person async for person in views.latest_missing_persons()]
+    return await sync_to_async(render)(
+        request,
+        "core/index.html",
+        {"latest_missing_persons": latest_missing_persons},
+    )
+
+
+@require_GET
+async def location_counties(request, version):
+    index = await alocation_index()
+    return views._location_response(request, index, version, index["counties"])
+
+
+@require_GET
+async def location_constituencies(request, version, code):
+    index = await alocation_index()
+    body = index["constituencies"].get(code)
+    return views._location_response(request, index, version, body)
+
+
+@require_GET
+async def location_wards(request, version, code):
+    index = await alocation_index()
+    body = index["wards"].get(code)
+    return views._location_response(request, index, version, body)
+
+
+@read_from_replica
+@condition(etag_func=views.missing_persons_etag)
+@cache_anonymous_page(listing_page_key)
+async def all_missing_persons(request):
+    # names are resolved against the geography lookups, loaded on first use
+    paginator = await sync_to_async(views.missing_persons_paginator)(request.GET)
+    missing_persons = await paginator.apage(request.GET.get("cursor"))
+    approximate_total = await sync_to_async(approximate_count)(paginator.queryset)
+    return await sync_to_async(views.render_missing_persons)(
+        request, missing_persons, approximate_total
+    )
+
+
+@read_from_replica
+@condition(
+    etag_func=views.missing_person_etag,
+    last_modified_func=views.missing_person_last_modified,
+)
+@cache_anonymous_page(person_page_key)
+async def missing_person_detail(request, slug):
+    missing_person = await aget_object_or_404(MissingPerson, slug=slug)
+    return await sync_to_async(views.render_missing_person)(request, missing_person)
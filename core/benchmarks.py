@@ -0,0 +1,285 @@
+import json
+import statistics
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import MissingPerson, Status
+from .pagination import CursorPaginator
+from .seeding import seed_cases
+
+# (name, function building the URL from the dataset's samples, needs staff)
+Scenario = namedtuple("Scenario", ["name", "url", "staff"])
+
+
+def listing(**params):
+    def url(samples):
+        query = {
+            name: value.format(**samples) if isinstance(value, str) else value
+            for name, value in params.items()
+        }
+        return f"{reverse('core:all_missing_persons')}?{urlencode(query)}"
+
+    return url
+
+
+SCENARIOS = [
+    Scenario("web_index", lambda s: reverse("core:web_index"), False),
+    Scenario("listing", listing(), False),
+    Scenario("listing_search", listing(q="{name}"), False),
+    Scenario("listing_fuzzy_search", listing(q="{name}", fuzzy=1), False),
+    Scenario("listing_gender", listing(gender="F"), False),
+    Scenario("listing_age_range", listing(age_min=18, age_max=35), False),
+    Scenario("listing_county", listing(county="{county}", gender="M"), False),
+    Scenario("listing_deep_page", listing(cursor="{deep_cursor}"), False),
+    Scenario(
+        "missing_person_detail",
+        lambda s: reverse("core:missing_person_detail", args=[s["slug"]]),
+        False,
+    ),
+    Scenario("dashboard", lambda s: reverse("console:dashboard"), True),
+    Scenario(
+        "dashboard_cases_deep_page",
+        lambda s: f"{reverse('console:cases_data')}?"
+        + urlencode(
+            {
+                "draw": 1,
+                "start": s["deep_offset"],
+                "length": 25,
+                "order[0][column]": 5,
+                "order[0][dir]": "desc",
+            }
+        ),
+        True,
+    ),
+]
+
+# a regression has to be this much slower (as a fraction) and by at least
+# this many milliseconds, timings of a few ms are mostly noise
+DEFAULT_THRESHOLD = 0.25
+MIN_TIME_DIFFERENCE_MS = 5.0
+
+# SQLite calls the progress handler every this many virtual machine steps
+VM_STEP_INTERVAL = 10
+
+
+def prepare_dataset(size, seed):
+    """
+    Top the database up to ``size`` cases with ``seed_cases``.
+    """
+    missing = size - MissingPerson.objects.count()
+    if missing > 0:
+        for _ in seed_cases(missing, seed=seed):
+            pass
+
+
+def dataset_samples():
+    """
+    Values the scenario URLs are built from: a typical name, county and
+    slug from the middle of the data, and a cursor/offset ~90% of the way
+    through the listing.
+    """
+    missing = MissingPerson.objects.filter(status=Status.MISSING)
+    total = missing.count()
+    middle = MissingPerson.objects.order_by("id")[MissingPerson.objects.count() // 2]
+    ordering = ("-created_at", "-id")
+    deep_offset = max(int(total * 0.9) - 1, 0)
+    deep_row = missing.order_by(*ordering)[deep_offset]
+    return {
+        "name": middle.name.split()[-1],
+        "county": middle.county,
+        "slug": middle.slug,
+        "deep_offset": deep_offset,
+        "deep_cursor": CursorPaginator(missing, 12, ordering).encode_cursor(
+            deep_row, "next"
+        ),
+    }
+
+
+@contextmanager
+def count_work():
+    """
+    How much work the database did, as a dict filled in on exit. SQLite
+    can't say how many rows it read, its virtual machine step count is
+    the closest equivalent; PostgreSQL plans are re-run with EXPLAIN
+    ANALYZE for real row counts (see rows_scanned).
+    """
+    work = {}
+    if connection.vendor == "sqlite":
+        connection.ensure_connection()
+        steps = [0]
+
+        def progress():
+            steps[0] += 1
+            return 0  # carry on
+
+        connection.connection.set_progress_handler(progress, VM_STEP_INTERVAL)
+        try:
+            yield work
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+        work["vm_steps"] = steps[0] * VM_STEP_INTERVAL
+    else:
+        yield work
+
+
+def plan_rows(plan):
+    rows = 0
+    if "Scan" in plan.get("Node Type", ""):
+        rows += (
+            plan.get("Actual Rows", 0)
+            + plan.get("Rows Removed by Filter", 0)
+            + plan.get("Rows Removed by Index Recheck", 0)
+        ) * plan.get("Actual Loops", 1)
+    for child in plan.get("Plans", ()):
+        rows += plan_rows(child)
+    return rows
+
+
+def rows_scanned(queries):
+    """
+    Rows read by table and index scans over the captured SELECTs, from
+    EXPLAIN ANALYZE. PostgreSQL only.
+    """
+    if connection.vendor != "postgresql":
+        return None
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            total += plan_rows(plan[0]["Plan"])
+    return total
+
+
+def run_scenario(client, url, repeat, warmup):
+    """
+    Time ``repeat`` cold requests (the page cache is cleared before each)
+    of ``url`` after ``warmup`` untimed ones, then count the queries and
+    database work of one more.
+    """
+    for _ in range(warmup):
+        cache.clear()
+        client.get(url)
+
+    timings = []
+    for _ in range(repeat):
+        cache.clear()
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} answered {response.status_code}")
+
+    # measured separately, counting slows the requests down
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries, count_work() as work:
+        client.get(url)
+
+    result = {
+        "url": url,
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+        "queries": len(queries),
+        **work,
+    }
+    scanned = rows_scanned(queries.captured_queries)
+    if scanned is not None:
+        result["rows_scanned"] = scanned
+    return result
+
+
+def run_benchmarks(sizes, repeat=5, warmup=1, seed=0, scenarios=None, log=None):
+    """
+    Seed each dataset size in turn (smallest first, each one building on
+    the last) and run the scenarios against it. Results are keyed by
+    ``"<size>/<scenario>"``.
+    """
+    selected = [
+        scenario
+        for scenario in SCENARIOS
+        if scenarios is None or scenario.name in scenarios
+    ]
+    staff, _ = get_user_model().objects.get_or_create(
+        username="benchmark", defaults={"is_staff": True}
+    )
+    anonymous, signed_in = Client(), Client()
+    signed_in.force_login(staff)
+
+    results = {}
+    for size in sorted(sizes):
+        prepare_dataset(size, seed)
+        samples = dataset_samples()
+        for scenario in selected:
+            client = signed_in if scenario.staff else anonymous
+            result = run_scenario(client, scenario.url(samples), repeat, warmup)
+            results[f"{size}/{scenario.name}"] = {
+                "size": size,
+                "scenario": scenario.name,
+                **result,
+            }
+            if log:
+                log(size, scenario.name, result)
+
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "vendor": connection.vendor,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of ``results`` against ``baseline`` as a list of messages:
+    more queries, or timings / database work more than ``threshold``
+    (a fraction) above the baseline.
+    """
+    regressions = []
+    for key, current in results["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+
+        if current["queries"] > previous["queries"]:
+            regressions.append(
+                f"{key}: {current['queries']} queries, was {previous['queries']}"
+            )
+
+        slower = current["median_ms"] - previous["median_ms"]
+        if (
+            current["median_ms"] > previous["median_ms"] * (1 + threshold)
+            and slower >= MIN_TIME_DIFFERENCE_MS
+        ):
+            regressions.append(
+                f"{key}: {current['median_ms']}ms median, "
+                f"was {previous['median_ms']}ms"
+            )
+
+        for metric in ("rows_scanned", "vm_steps"):
+            if metric not in current or metric not in previous:
+                continue
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{key}: {current[metric]} {metric.replace('_', ' ')}, "
+                    f"was {previous[metric]}"
+                )
+    return regressions
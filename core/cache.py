@@ -0,0 +1,145 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+
+from .routers import used_replica
+
+# page keys embed a version number, bumping it drops every page cached
+# under the old one without having to know their keys
+LISTINGS_VERSION_KEY = "core:version:listings"
+
+
+def page_cache_timeout():
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 0)
+
+
+def person_version_key(slug):
+    return f"core:version:person:{slug}"
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # add() so concurrent first requests settle on one value
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def _url_digest(request):
+    # the host is part of the key since templates build absolute share links
+    return hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+
+def listing_page_key(request, *args, **kwargs):
+    version = get_version(LISTINGS_VERSION_KEY)
+    return f"core:page:listing:{version}:{_url_digest(request)}"
+
+
+def person_page_key(request, slug):
+    version = get_version(person_version_key(slug))
+    return f"core:page:person:{slug}:{version}:{_url_digest(request)}"
+
+
+def invalidate_person_pages(slugs):
+    """
+    Drop the cached detail pages of ``slugs``, and every listing since
+    their cards show the same data, once the current transaction commits.
+    """
+    keys = [LISTINGS_VERSION_KEY, *(person_version_key(slug) for slug in slugs)]
+    transaction.on_commit(
+        lambda: cache.set_many({key: time.time_ns() for key in keys}, None)
+    )
+
+
+def replica_may_be_behind():
+    """
+    Whether this request read from the replica soon enough after the last
+    change (page versions are the time of the change) that it may not have
+    had it yet. Such a page is served but not cached.
+    """
+    if not used_replica():
+        return False
+    changed_at = get_version(LISTINGS_VERSION_KEY)
+    return time.time_ns() - changed_at < settings.REPLICA_MAX_LAG * 1e9
+
+
+def cacheable_page_key(request, key_func, *args, **kwargs):
+    """
+    The cache key for this request's page, or None when it shouldn't come
+    from the cache.
+    """
+    if (
+        not page_cache_timeout()
+        or request.method != "GET"
+        or request.user.is_authenticated
+        or get_messages(request)
+    ):
+        return None
+    return key_func(request, *args, **kwargs)
+
+
+def should_cache(request, response):
+    # pages holding a CSRF token or setting cookies are per visitor
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        and not replica_may_be_behind()
+    )
+
+
+def cache_anonymous_page(key_func):
+    """
+    Serve GET requests from anonymous visitors out of the cache, keyed by
+    ``key_func(request, *args, **kwargs)``. Signed in users always get a
+    freshly rendered page since it shows their account menu and messages.
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                # the session, user and page versions are read synchronously
+                key = await sync_to_async(cacheable_page_key)(
+                    request, key_func, *args, **kwargs
+                )
+                if key is None:
+                    return await view(request, *args, **kwargs)
+
+                response = await cache.aget(key)
+                if response is not None:
+                    return response
+
+                response = await view(request, *args, **kwargs)
+                if await sync_to_async(should_cache)(request, response):
+                    await cache.aset(key, response, page_cache_timeout())
+                return response
+
+            return wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = cacheable_page_key(request, key_func, *args, **kwargs)
+            if key is None:
+                return view(request, *args, **kwargs)
+
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+            if should_cache(request, response):
+                cache.set(key, response, page_cache_timeout())
+            return response
+
+        return wrapper
+
+    return decorator
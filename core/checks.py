@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_page_cache(app_configs, **kwargs):
+    # a save in the job worker or a management command bumps the page
+    # versions in its own process only, web workers would keep serving the
+    # old pages until they expire
+    if settings.PAGE_CACHE_TIMEOUT and isinstance(caches["default"], LocMemCache):
+        return [
+            Error(
+                "PAGE_CACHE_TIMEOUT is set but the cache is per process.",
+                hint="Set CACHE_URL to a shared cache (redis://, db:// or "
+                "file://) or PAGE_CACHE_TIMEOUT=0.",
+                id="core.E001",
+            )
+        ]
+    return []
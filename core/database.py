@@ -0,0 +1,75 @@
+import threading
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# connections this process has opened, per database alias; with persistent
+# connections or a pool it should stop growing once the workers are warm
+opened = {}
+opened_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    with opened_lock:
+        opened[connection.alias] = opened.get(connection.alias, 0) + 1
+
+
+def connection_pool(connection):
+    # None unless DB_POOL is set (PostgreSQL only)
+    return getattr(connection, "pool", None)
+
+
+def prewarm_connections(timeout=30):
+    """
+    Open every pool up to its minimum size, or this thread's persistent
+    connection, so a fresh worker's first requests don't pay for it.
+    Connections that are closed after every request are left alone.
+    """
+    for connection in connections.all():
+        pool = connection_pool(connection)
+        if pool is not None:
+            pool.open(wait=True, timeout=timeout)
+        elif connection.settings_dict["CONN_MAX_AGE"] != 0:
+            connection.ensure_connection()
+
+
+def connection_stats():
+    """
+    Per database alias: how connections are managed, how many this process
+    opened, and for pools their size and how long requests waited for a
+    connection (averaged over every request since the pool opened).
+    """
+    stats = []
+    for connection in connections.all():
+        pool = connection_pool(connection)
+        entry = {
+            "alias": connection.alias,
+            "vendor": connection.vendor,
+            "opened": opened.get(connection.alias, 0),
+            "max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "pool": None,
+        }
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            requests = pool_stats.get("requests_num", 0)
+            # Django reports every checkout from a pool as a new connection
+            entry["opened"] = pool_stats.get("connections_num", 0)
+            entry["pool"] = {
+                "min_size": pool.min_size,
+                "max_size": pool.max_size,
+                "size": pool_stats.get("pool_size", 0),
+                "available": pool_stats.get("pool_available", 0),
+                "waiting": pool_stats.get("requests_waiting", 0),
+                "requests": requests,
+                "queued": pool_stats.get("requests_queued", 0),
+                "average_wait_ms": (
+                    pool_stats.get("requests_wait_ms", 0) / requests if requests else 0
+                ),
+                "timeouts": pool_stats.get("requests_errors", 0),
+                "connections_lost": pool_stats.get("connections_lost", 0),
+            }
+        stats.append(entry)
+    return stats
@@ -86,12 +86,17 @@ class ContactInfoForm(forms.ModelForm):
         return phone
 
 
+class MultipleFileInput(forms.ClearableFileInput):
+    # Django refuses ``multiple`` on file inputs unless the widget opts in
+    allow_multiple_selected = True
+
+
 class PhotoUploadForm(forms.ModelForm):
     class Meta:
         model = MissingPersonPhoto
         fields = ["photo", "description", "alternative_text"]
         widgets = {
-            "photo": forms.ClearableFileInput(
+            "photo": MultipleFileInput(
                 attrs={"class": "form-control", "accept": "image/*", "multiple": True}
             ),
             "description": forms.Textarea(
@@ -0,0 +1,195 @@
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .utils import phonetic_key
+
+# minimum word similarity for a name to count as a match, same scale as
+# pg_trgm's word_similarity (0 - 1). PostgreSQL connections get it as
+# pg_trgm.word_similarity_threshold (see knmpdb/settings.py), which %> uses
+SIMILARITY_THRESHOLD = getattr(settings, "FUZZY_SIMILARITY_THRESHOLD", 0.5)
+
+# cap on the in-process index's matches kept, after the queryset's filters
+MAX_CANDIDATES = 500
+
+
+def trigrams(value):
+    """
+    pg_trgm style trigrams: lowercase, split into words, pad each word
+    with two leading spaces and one trailing space.
+    """
+    grams = set()
+    for word in value.lower().split():
+        word = "".join(c for c in word if c.isalnum())
+        if not word:
+            continue
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """
+    In-process inverted trigram index over one text column of a model.
+    Used on SQLite, where there is no pg_trgm, so fuzzy lookups only
+    touch the posting lists of the query's trigrams instead of scanning
+    the table. Built lazily on first use and kept current from signals.
+    """
+
+    def __init__(self, model_label, field):
+        self.model_label = model_label
+        self.field = field
+        self.postings = defaultdict(set)
+        self.grams = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def _model(self):
+        from django.apps import apps
+
+        return apps.get_model(self.model_label)
+
+    def _add(self, pk, value):
+        grams = trigrams(value or "")
+        self.grams[pk] = grams
+        for gram in grams:
+            self.postings[gram].add(pk)
+
+    def _discard(self, pk):
+        for gram in self.grams.pop(pk, ()):
+            postings = self.postings.get(gram)
+            if postings is not None:
+                postings.discard(pk)
+                if not postings:
+                    del self.postings[gram]
+
+    def load(self):
+        with self.lock:
+            if self.loaded:
+                return
+            rows = self._model().objects.values_list("pk", self.field)
+            for pk, value in rows.iterator(chunk_size=5000):
+                self._add(pk, value)
+            self.loaded = True
+
+    def update(self, pk, value):
+        if not self.loaded:
+            return  # picked up when the index is first built
+        with self.lock:
+            self._discard(pk)
+            self._add(pk, value)
+
+    def remove(self, pk):
+        if not self.loaded:
+            return
+        with self.lock:
+            self._discard(pk)
+
+    def clear(self):
+        with self.lock:
+            self.postings.clear()
+            self.grams.clear()
+            self.loaded = False
+
+    def search(self, query, threshold=SIMILARITY_THRESHOLD):
+        """
+        Return ``{pk: similarity}``, where similarity is the share of the
+        query's trigrams found in the indexed value.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return {}
+        self.load()
+
+        hits = Counter()
+        with self.lock:
+            for gram in query_grams:
+                hits.update(self.postings.get(gram, ()))
+
+        size = len(query_grams)
+        return {
+            pk: count / size for pk, count in hits.items() if count / size >= threshold
+        }
+
+
+person_name_index = NgramIndex("core.MissingPerson", "name")
+person_phonetic_index = NgramIndex("core.MissingPerson", "name_phonetic")
+contact_name_index = NgramIndex("core.MissingPersonContact", "name")
+contact_phonetic_index = NgramIndex("core.MissingPersonContact", "name_phonetic")
+
+
+def _ngram_scores(queryset, query, name_index, phonetic_index):
+    """
+    ``{pk: similarity}`` of the best ``MAX_CANDIDATES`` matches in
+    ``queryset``. Matches are checked against the queryset best first, a
+    batch at a time, so its filters apply before the cap does.
+    """
+    scores = name_index.search(query)
+    key = phonetic_key(query)
+    if key:
+        for pk, score in phonetic_index.search(key).items():
+            scores[pk] = max(score, scores.get(pk, 0))
+
+    ranked = sorted(scores.items(), key=lambda hit: hit[1], reverse=True)
+    kept = {}
+    for start in range(0, len(ranked), MAX_CANDIDATES):
+        batch = ranked[start : start + MAX_CANDIDATES]
+        in_queryset = set(
+            queryset.filter(pk__in=[pk for pk, _ in batch]).values_list("pk", flat=True)
+        )
+        for pk, score in batch:
+            if pk in in_queryset:
+                kept[pk] = score
+                if len(kept) == MAX_CANDIDATES:
+                    return kept
+    return kept
+
+
+def _fuzzy_search(queryset, query, name_index, phonetic_index):
+    if not query.strip():
+        return queryset.none().annotate(search_rank=Value(0.0))
+
+    if connection.vendor == "postgresql":
+        key = phonetic_key(query) or query
+        # %> (trigram_word_similar) is served by the gin_trgm_ops indexes
+        return queryset.filter(
+            Q(name__trigram_word_similar=query)
+            | Q(name_phonetic__trigram_word_similar=key)
+        ).annotate(
+            search_rank=Greatest(
+                TrigramWordSimilarity(query, "name"),
+                TrigramWordSimilarity(key, "name_phonetic"),
+            )
+        )
+
+    scores = _ngram_scores(queryset, query, name_index, phonetic_index)
+    if not scores:
+        return queryset.none().annotate(search_rank=Value(0.0))
+    return queryset.filter(pk__in=scores).annotate(
+        search_rank=Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in scores.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+def fuzzy_search_missing_persons(queryset, query):
+    """
+    Filter ``queryset`` to missing persons whose name looks or sounds like
+    ``query``, annotated with a ``search_rank`` similarity (higher is better).
+    """
+    return _fuzzy_search(queryset, query, person_name_index, person_phonetic_index)
+
+
+def fuzzy_search_contacts(queryset, query):
+    """
+    Same as ``fuzzy_search_missing_persons`` but for contacts, handy for
+    spotting the same reporter entered under different spellings.
+    """
+    return _fuzzy_search(queryset, query, contact_name_index, contact_phonetic_index)
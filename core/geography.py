@@ -0,0 +1,247 @@
+import csv
+import hashlib
+import json
+import threading
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+GEOGRAPHY_CSV = (
+    settings.BASE_DIR / "static" / "data" / "counties-constituencies-wards.csv"
+)
+
+Region = namedtuple(
+    "Region",
+    [
+        "county_id",
+        "constituency_id",
+        "ward_id",
+        "county_name",
+        "constituency_name",
+        "ward_name",
+    ],
+)
+NO_REGION = Region(None, None, None, "", "", "")
+
+_lookups = None
+_lookups_lock = threading.Lock()
+
+_location_index = None
+
+
+def normalize_name(value):
+    """
+    ``" Nairobi  city "`` -> ``"NAIROBI CITY"``, the CSV spells everything
+    in upper case.
+    """
+    return " ".join((value or "").upper().split())
+
+
+def read_geography_csv(csv_file_path=GEOGRAPHY_CSV):
+    """
+    Rows of the counties/constituencies/wards CSV as dicts with ``county``,
+    ``constituency`` and ``ward`` names and their official ``*_code``.
+    """
+    rows = []
+    # utf-8-sig, the file starts with a byte order mark
+    with open(csv_file_path, mode="r", encoding="utf-8-sig") as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            # a few names have doubled spaces
+            ward = " ".join(row["WARD NAME"].split())
+            if not ward:
+                continue
+            rows.append(
+                {
+                    "county_code": int(row["COUNTY ID"]),
+                    "county": " ".join(row["COUNTY NAME"].split()),
+                    "constituency_code": int(row["CONSTITUENCY ID"]),
+                    "constituency": " ".join(row["CONSTITUENCY NAME"].split()),
+                    "ward_code": int(row["WARD ID"]),
+                    "ward": ward,
+                }
+            )
+    return rows
+
+
+def load_geography(csv_file_path=GEOGRAPHY_CSV):
+    """
+    Create or update the County/Constituency/Ward tables from the CSV,
+    matching rows on their official codes. Returns the row counts.
+    """
+    from .models import Constituency, County, Ward
+
+    rows = read_geography_csv(csv_file_path)
+
+    counties = {row["county_code"]: row["county"] for row in rows}
+    County.objects.bulk_create(
+        [County(code=code, name=name) for code, name in counties.items()],
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=["name"],
+    )
+    county_ids = dict(County.objects.values_list("code", "id"))
+
+    constituencies = {
+        row["constituency_code"]: (row["constituency"], row["county_code"])
+        for row in rows
+    }
+    Constituency.objects.bulk_create(
+        [
+            Constituency(code=code, name=name, county_id=county_ids[county_code])
+            for code, (name, county_code) in constituencies.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=["name", "county"],
+    )
+    constituency_ids = dict(Constituency.objects.values_list("code", "id"))
+
+    Ward.objects.bulk_create(
+        [
+            Ward(
+                code=row["ward_code"],
+                name=row["ward"],
+                constituency_id=constituency_ids[row["constituency_code"]],
+            )
+            for row in rows
+        ],
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=["name", "constituency"],
+    )
+
+    clear_lookups()
+    return len(counties), len(constituencies), len(rows)
+
+
+def build_lookups(county_rows, constituency_rows, ward_rows):
+    """
+    Name -> (id, name) maps for ``resolve_region``, from ``(id, name)``
+    county rows and ``(id, name, parent_id)`` constituency and ward rows.
+    """
+    return {
+        "counties": {normalize_name(name): (pk, name) for pk, name in county_rows},
+        "constituencies": {
+            (parent_id, normalize_name(name)): (pk, name)
+            for pk, name, parent_id in constituency_rows
+        },
+        "wards": {
+            (parent_id, normalize_name(name)): (pk, name)
+            for pk, name, parent_id in ward_rows
+        },
+    }
+
+
+def get_lookups():
+    # ~1500 rows that practically never change, kept in memory so saving a
+    # person doesn't cost three extra queries
+    global _lookups
+    if _lookups is None:
+        from .models import Constituency, County, Ward
+
+        with _lookups_lock:
+            lookups = build_lookups(
+                County.objects.values_list("id", "name"),
+                Constituency.objects.values_list("id", "name", "county_id"),
+                Ward.objects.values_list("id", "name", "constituency_id"),
+            )
+            if not lookups["counties"]:
+                return lookups  # not loaded yet, try again next time
+            _lookups = lookups
+    return _lookups
+
+
+def county_names():
+    return sorted(name for _, name in get_lookups()["counties"].values())
+
+
+def clear_lookups():
+    global _lookups, _location_index
+    _lookups = None
+    _location_index = None
+
+
+def _dump(rows):
+    return json.dumps(rows, separators=(",", ":")).encode()
+
+
+def location_index():
+    """
+    Pre-serialized JSON for the report form's location dropdowns, built
+    once per process: ``counties`` is a list of ``[code, name]`` pairs,
+    ``constituencies`` and ``wards`` map a county / constituency code to
+    the same for its children. ``version`` is a hash of all of it, used in
+    the endpoint URLs so responses can be cached forever.
+    """
+    global _location_index
+    if _location_index is None:
+        from .models import Constituency, County, Ward
+
+        counties = list(County.objects.order_by("code").values_list("code", "name"))
+        constituencies = {}
+        for code, name, county_code in Constituency.objects.order_by(
+            "code"
+        ).values_list("code", "name", "county__code"):
+            constituencies.setdefault(county_code, []).append([code, name])
+        wards = {}
+        for code, name, constituency_code in Ward.objects.order_by("code").values_list(
+            "code", "name", "constituency__code"
+        ):
+            wards.setdefault(constituency_code, []).append([code, name])
+
+        index = {
+            # also rendered straight into the form, see core.views.report_missing
+            "county_rows": counties,
+            "counties": _dump(counties),
+            "constituencies": {
+                code: _dump(rows) for code, rows in constituencies.items()
+            },
+            "wards": {code: _dump(rows) for code, rows in wards.items()},
+        }
+        digest = hashlib.sha256(index["counties"])
+        for group in ("constituencies", "wards"):
+            for code, body in sorted(index[group].items()):
+                digest.update(f"{group}:{code}:".encode() + body)
+        index["version"] = digest.hexdigest()[:12]
+        if not counties:
+            return index  # not loaded yet, try again next time
+        _location_index = index
+    return _location_index
+
+
+async def alocation_index():
+    # only building it needs the database
+    if _location_index is not None:
+        return _location_index
+    return await sync_to_async(location_index)()
+
+
+def resolve_region(county, sub_county="", ward="", lookups=None):
+    """
+    Match free text county/sub county/ward names against the geography
+    tables. Each level is looked up within the one above it and anything
+    that doesn't match (along with everything below it) is left empty.
+    """
+    if lookups is None:
+        lookups = get_lookups()
+
+    county_match = lookups["counties"].get(normalize_name(county))
+    if county_match is None:
+        return NO_REGION
+    county_id, county_name = county_match
+
+    constituency_match = lookups["constituencies"].get(
+        (county_id, normalize_name(sub_county))
+    )
+    if constituency_match is None:
+        return NO_REGION._replace(county_id=county_id, county_name=county_name)
+    constituency_id, constituency_name = constituency_match
+
+    ward_id, ward_name = lookups["wards"].get(
+        (constituency_id, normalize_name(ward)), (None, "")
+    )
+    return Region(
+        county_id, constituency_id, ward_id, county_name, constituency_name, ward_name
+    )
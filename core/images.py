@@ -0,0 +1,117 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# rendition name -> longest edge in pixels
+RENDITIONS = {
+    "card": 400,
+    "gallery": 800,
+    "full": 1600,
+}
+
+# output formats, WebP first since it's what browsers should prefer
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+# perceptual hashes are taken from a HASH_SIZE + 1 x HASH_SIZE grayscale
+# thumbnail, one bit per pair of horizontal neighbours, and looked up in
+# HASH_PARTS parts of 16 bits (see core.photo_search)
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+HASH_PARTS = 4
+PART_BITS = HASH_BITS // HASH_PARTS
+
+
+def rendition_name(original_name, rendition, extension):
+    """
+    ``missing_person_photos/<uuid>.jpg`` -> ``missing_person_photos/<uuid>_card.webp``
+    """
+    root = os.path.splitext(original_name)[0]
+    return f"{root}_{rendition}.{extension}"
+
+
+def load_image(file, draft_size=None):
+    """
+    Open an uploaded image upright and without metadata: the EXIF
+    orientation is applied to the pixels and everything else (GPS
+    position, camera serials...) is dropped by converting to plain RGB.
+    With ``draft_size`` JPEGs are decoded at a fraction of their size, as
+    long as it stays at least that big.
+    """
+    with Image.open(file) as image:
+        if draft_size:
+            image.draft("RGB", draft_size)
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB")
+
+
+def open_photo(photo):
+    photo.photo.open("rb")
+    try:
+        return load_image(photo.photo)
+    finally:
+        photo.photo.close()
+
+
+def perceptual_hash(image):
+    """
+    64 bit difference hash of a loaded image: each bit says whether a
+    pixel of a tiny grayscale copy is brighter than its right neighbour.
+    Resized, recompressed or lightly edited copies of a photo hash to the
+    same value or one a few bits away.
+    """
+    small = image.convert("L").resize(
+        (HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS, reducing_gap=3.0
+    )
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(HASH_SIZE):
+        for column in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + column]
+            value = value << 1 | (left > pixels[row * (HASH_SIZE + 1) + column + 1])
+    return value
+
+
+def split_hash(value):
+    # most significant part first
+    mask = (1 << PART_BITS) - 1
+    return [
+        value >> (PART_BITS * (HASH_PARTS - 1 - i)) & mask for i in range(HASH_PARTS)
+    ]
+
+
+def generate_renditions(photo, source=None):
+    """
+    Write every rendition of ``photo`` next to the original through the
+    photo field's storage and return the mapping to store on
+    ``MissingPersonPhoto.renditions``. ``source`` is the photo already
+    opened with ``open_photo``, if the caller has it.
+    """
+    storage = photo.photo.storage
+    if source is None:
+        source = open_photo(photo)
+
+    renditions = {}
+    for rendition, size in RENDITIONS.items():
+        image = source.copy()
+        # never upscale, small originals just get re-encoded
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        entry = {"width": image.width, "height": image.height}
+        for extension, options in FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(buffer, **options)
+            name = rendition_name(photo.photo.name, rendition, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            entry[extension] = storage.save(name, ContentFile(buffer.getvalue()))
+        renditions[rendition] = entry
+    return renditions
@@ -0,0 +1,233 @@
+import csv
+import io
+import json
+import os
+import re
+from collections import namedtuple
+
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from .cache import invalidate_person_pages
+from .forms import BasicInfoForm, ContactInfoForm
+from .models import MissingPerson, MissingPersonContact, Status
+from .signals import cases_imported
+
+# rows inserted per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# spreadsheet column -> ContactInfoForm field
+CONTACT_COLUMNS = {
+    "contact_name": "name",
+    "contact_phone": "phone_number",
+    "contact_email": "email",
+}
+
+# friendlier spellings accepted in the gender column
+GENDERS = {"m": "M", "male": "M", "f": "F", "female": "F"}
+
+RowError = namedtuple("RowError", ["row", "messages"])
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+
+def column_name(header):
+    # "Last Seen Location" -> "last_seen_location"
+    return re.sub(r"[^a-z0-9]+", "_", (header or "").strip().lower()).strip("_")
+
+
+def read_rows(file, name):
+    """
+    ``(row number, {column: value})`` for each case in an uploaded CSV or
+    JSON (a list of objects) file, picked by the extension of ``name``.
+    """
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".json":
+        try:
+            records = json.load(file)
+        except ValueError as e:
+            raise ValueError(f"Not a valid JSON file: {e}")
+        if not isinstance(records, list):
+            raise ValueError("The JSON file should hold a list of cases")
+        for number, record in enumerate(records, start=1):
+            if not isinstance(record, dict):
+                record = {}
+            yield number, {column_name(key): value for key, value in record.items()}
+    elif extension == ".csv":
+        # utf-8-sig, spreadsheet exports often start with a byte order mark
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        reader = csv.DictReader(text)
+        reader.fieldnames = [column_name(header) for header in reader.fieldnames or []]
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        raise ValueError("Only .csv and .json files can be imported")
+
+
+def clean_value(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def validate_row(record):
+    """
+    Check a row with the same rules as the report form. Returns an unsaved
+    ``(person, contact)`` pair, or a list of error messages.
+    """
+    data = {
+        field: clean_value(record.get(field)) for field in BasicInfoForm.Meta.fields
+    }
+    data["gender"] = GENDERS.get(data["gender"].lower(), data["gender"])
+    person_form = BasicInfoForm(data)
+    contact_form = ContactInfoForm(
+        {
+            field: clean_value(record.get(column))
+            for column, field in CONTACT_COLUMNS.items()
+        }
+    )
+
+    errors = []
+    if not person_form.is_valid():
+        for field, messages in person_form.errors.items():
+            errors.extend(f"{field}: {message}" for message in messages)
+    if not contact_form.is_valid():
+        columns = {field: column for column, field in CONTACT_COLUMNS.items()}
+        for field, messages in contact_form.errors.items():
+            errors.extend(
+                f"{columns.get(field, field)}: {message}" for message in messages
+            )
+
+    status = clean_value(record.get("status")) or Status.MISSING
+    if status not in Status.values:
+        errors.append(f"status: must be one of {', '.join(Status.values)}")
+    if errors:
+        return errors
+
+    person = person_form.save(commit=False)
+    person.status = status
+    person.set_derived_fields()
+    contact = contact_form.save(commit=False)
+    contact.set_derived_fields()
+    return person, contact
+
+
+def numbered_slugs(base):
+    """
+    Existing ``<base>-...`` slugs. SQLite's LIKE can't use the slug index,
+    but a ``"<base>-" <= slug < "<base>."`` range can, and matches the same
+    rows since "." sorts right after "-" in its byte order comparison.
+    """
+    slugs = MissingPerson.objects.all()
+    if connection.vendor == "sqlite":
+        slugs = slugs.filter(slug__gte=f"{base}-", slug__lt=f"{base}.")
+    else:
+        # PostgreSQL has a varchar_pattern_ops index on slug for this
+        slugs = slugs.filter(slug__startswith=f"{base}-")
+    return slugs.values_list("slug", flat=True)
+
+
+class SlugAllocator:
+    """
+    Hands out unique slugs the way AutoSlugField would (``name``,
+    ``name-2``, ``name-3``...), checking a whole batch against the database
+    in one query instead of one per row.
+    """
+
+    def __init__(self):
+        self.used = set()
+        # base -> next number to try, for names used over and over
+        self.numbered = {}
+        self.looked_up = set()
+        self.max_length = MissingPerson._meta.get_field("slug").max_length
+
+    def candidate(self, base):
+        slug = base
+        while slug in self.used:
+            number = self.numbered.setdefault(base, 2)
+            suffix = f"-{number}"
+            slug = base[: self.max_length - len(suffix)].strip("-") + suffix
+            self.numbered[base] = number + 1
+        # reserved straight away so repeats within the batch move on
+        self.used.add(slug)
+        return slug
+
+    def assign(self, persons):
+        pending = [(person, base_slug(person.name)) for person in persons]
+        while pending:
+            candidates = [
+                (person, base, self.candidate(base)) for person, base in pending
+            ]
+            taken = set(
+                MissingPerson.objects.filter(
+                    slug__in=[slug for _, _, slug in candidates]
+                ).values_list("slug", flat=True)
+            )
+            pending = []
+            for person, base, slug in candidates:
+                if slug not in taken:
+                    person.slug = slug
+                    continue
+                if base not in self.looked_up:
+                    # a name already in the database, skip past its
+                    # numbered variants rather than trying them one by one
+                    self.used.update(numbered_slugs(base))
+                    self.looked_up.add(base)
+                pending.append((person, base))
+
+
+def base_slug(name):
+    max_length = MissingPerson._meta.get_field("slug").max_length
+    return slugify(name)[:max_length].strip("-") or "missing-person"
+
+
+@transaction.atomic
+def insert_batch(pairs, slugs):
+    persons = [person for person, _ in pairs]
+    contacts = [contact for _, contact in pairs]
+
+    slugs.assign(persons)
+    MissingPerson.objects.bulk_create(persons)
+    MissingPersonContact.objects.bulk_create(contacts)
+    Through = MissingPerson.contacts.through
+    Through.objects.bulk_create(
+        Through(missingperson_id=person.pk, missingpersoncontact_id=contact.pk)
+        for person, contact in pairs
+    )
+    cases_imported.send(sender=MissingPerson, persons=persons, contacts=contacts)
+
+
+def import_cases(records, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Validate and insert ``(row number, record)`` pairs from ``read_rows``.
+    Valid rows are inserted ``batch_size`` at a time, each batch in its own
+    transaction, invalid ones are skipped and listed in the result.
+    """
+    result = ImportResult()
+    slugs = SlugAllocator()
+    batch = []
+    for number, record in records:
+        result.rows += 1
+        validated = validate_row(record)
+        if isinstance(validated, list):
+            result.errors.append(RowError(number, validated))
+            continue
+        batch.append(validated)
+        if len(batch) == batch_size:
+            if not dry_run:
+                insert_batch(batch, slugs)
+            result.created += len(batch)
+            batch = []
+    if batch:
+        if not dry_run:
+            insert_batch(batch, slugs)
+        result.created += len(batch)
+
+    if result.created and not dry_run:
+        invalidate_person_pages([])
+    return result
@@ -0,0 +1,20 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db.backends.ddl_references import Statement
+
+
+class PostgresGinIndex(GinIndex):
+    """
+    A GIN index on PostgreSQL and nothing elsewhere, for the columns SQLite
+    development databases keep but never search (full text search goes
+    through an FTS5 table there, see core.search).
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return Statement("")
+        return super().remove_sql(model, schema_editor, **kwargs)
@@ -0,0 +1,173 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# seconds before a failed job is retried, doubled on every attempt
+RETRY_BACKOFF = getattr(settings, "JOBS_RETRY_BACKOFF", 30)
+
+# a job still "running" after this many seconds is assumed to belong to a
+# dead worker and is handed out again
+STALE_AFTER = getattr(settings, "JOBS_STALE_AFTER", 600)
+
+TASKS = {}
+
+
+def run_inline():
+    # handy for local development without a `run_jobs` worker
+    return getattr(settings, "JOBS_RUN_INLINE", False)
+
+
+def task(name):
+    """
+    Register a function as a background task under ``name``. The function
+    is called with the job payload as keyword arguments.
+    """
+
+    def decorator(func):
+        TASKS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, max_attempts=5, delay=0, **payload):
+    """
+    Queue ``name`` to run with ``payload``. The job row is written in the
+    caller's transaction, so it only becomes visible if that commits.
+    """
+    job = Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    if run_inline():
+        transaction.on_commit(run_pending_jobs)
+    return job
+
+
+def enqueue_many(name, payloads, max_attempts=5):
+    now = timezone.now()
+    jobs = Job.objects.bulk_create(
+        Job(name=name, payload=payload, max_attempts=max_attempts, run_after=now)
+        for payload in payloads
+    )
+    if run_inline():
+        transaction.on_commit(run_pending_jobs)
+    return jobs
+
+
+def claim_job():
+    """
+    Lock and mark the next runnable job as running. ``SKIP LOCKED`` lets
+    any number of workers poll the same table without blocking each other
+    (it's a no-op on SQLite, where the status check in the UPDATE guards
+    against double claims instead).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=JobStatus.QUEUED, run_after__lte=now)
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            stale = now - timedelta(seconds=STALE_AFTER)
+            job = (
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=JobStatus.RUNNING, locked_at__lt=stale)
+                .order_by("locked_at", "id")
+                .first()
+            )
+        if job is None:
+            return None
+
+        claimed = Job.objects.filter(pk=job.pk, status=job.status).update(
+            status=JobStatus.RUNNING, locked_at=now, attempts=job.attempts + 1
+        )
+        if not claimed:
+            return None
+
+    job.status = JobStatus.RUNNING
+    job.locked_at = now
+    job.attempts += 1
+    return job
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome, scheduling a retry with
+    exponential backoff when it fails and attempts remain.
+    """
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {job.name!r}")
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            status = JobStatus.QUEUED
+            run_after = timezone.now() + timedelta(
+                seconds=RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            )
+            logger.warning("Job %s failed, retrying at %s", job, run_after)
+        else:
+            status = JobStatus.FAILED
+            run_after = job.run_after
+            logger.error("Job %s failed permanently:\n%s", job, error)
+            on_failure = getattr(func, "on_failure", None)
+            if on_failure is not None:
+                on_failure(**job.payload)
+        Job.objects.filter(pk=job.pk).update(
+            status=status,
+            run_after=run_after,
+            locked_at=None,
+            last_error=error,
+            updated_at=timezone.now(),
+        )
+        return False
+
+    # updated_at doubles as the finish time for prune_jobs
+    Job.objects.filter(pk=job.pk).update(
+        status=JobStatus.DONE, locked_at=None, last_error="", updated_at=timezone.now()
+    )
+    return True
+
+
+def run_pending_jobs(limit=None):
+    """
+    Run queued jobs until the queue is empty (or ``limit`` jobs ran).
+    Returns the number of jobs that were run.
+    """
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+def prune_jobs(days, failed_days):
+    """
+    Delete jobs that finished more than ``days`` ago, or failed for good
+    more than ``failed_days`` ago. Returns the number deleted.
+    """
+    now = timezone.now()
+    deleted, _ = Job.objects.filter(
+        Q(status=JobStatus.DONE, updated_at__lt=now - timedelta(days=days))
+        | Q(status=JobStatus.FAILED, updated_at__lt=now - timedelta(days=failed_days))
+    ).delete()
+    return deleted
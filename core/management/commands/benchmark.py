@@ -0,0 +1,117 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core.benchmarks import DEFAULT_THRESHOLD, SCENARIOS, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the busiest pages against seeded datasets in a separate test "
+        "database and compare with a saved baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            action="append",
+            dest="sizes",
+            help="Number of cases to benchmark against, can be repeated "
+            "(default 10000)",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=[scenario.name for scenario in SCENARIOS],
+            help="Only run these scenarios, can be repeated",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed requests per scenario"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed for the datasets"
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark-results.json",
+            help="Where to write the results",
+        )
+        parser.add_argument("--baseline", help="Results file to compare against")
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Also write the results to the --baseline file",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help="Allowed slowdown as a fraction of the baseline (default 0.25)",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database (and its seeded cases) between runs",
+        )
+
+    def handle(self, *args, **options):
+        if options["save_baseline"] and not options["baseline"]:
+            raise CommandError("--save-baseline needs --baseline")
+
+        baseline = None
+        if options["baseline"] and not options["save_baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Can't read the baseline: {e}")
+
+        # never seed the real database
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        try:
+            results = run_benchmarks(
+                options["sizes"] or [10000],
+                repeat=options["repeat"],
+                seed=options["seed"],
+                scenarios=options["scenarios"],
+                log=self.log,
+            )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        paths = [options["output"]]
+        if options["save_baseline"]:
+            paths.append(options["baseline"])
+        for path in paths:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+        self.stdout.write(f"Results written to {', '.join(paths)}")
+
+        if baseline is None:
+            return
+        if baseline.get("meta", {}).get("vendor") != results["meta"]["vendor"]:
+            self.stderr.write("The baseline was recorded on a different database")
+        regressions = compare(results, baseline, options["threshold"])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(f"{len(regressions)} regressions against the baseline")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
+
+    def log(self, size, scenario, result):
+        work = result.get("rows_scanned", result.get("vm_steps", ""))
+        self.stdout.write(
+            f"{size:>8} {scenario:<28} {result['median_ms']:>9.2f}ms "
+            f"{result['queries']:>3} queries {work:>12}"
+        )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_plans import CANONICAL_QUERIES, explain_canonical_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the listing, dashboard and API queries and report whether "
+        "each one is answered from an index"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "queries",
+            nargs="*",
+            choices=[[], *(query.name for query in CANONICAL_QUERIES)],
+            help="Only explain these queries",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Fail if any query scans the whole table or sorts",
+        )
+
+    def handle(self, *args, **options):
+        problems = 0
+        for name, plan, indexes, full_scan, sorts in explain_canonical_queries(
+            options["queries"]
+        ):
+            notes = []
+            if full_scan:
+                notes.append("scans the whole table")
+            if sorts:
+                notes.append("sorts")
+            if not indexes:
+                notes.append("no index")
+            status = (
+                self.style.WARNING(", ".join(notes))
+                if notes
+                else self.style.SUCCESS("ok")
+            )
+            self.stdout.write(
+                f"{name:<20} {status} ({', '.join(indexes) or 'no index used'})"
+            )
+            if options["verbosity"] > 1 or notes:
+                self.stdout.write(f"    {plan.replace(chr(10), chr(10) + '    ')}")
+            problems += bool(notes)
+
+        if problems:
+            # on small tables the planner rightly prefers a scan, judge the
+            # plans against a production sized database (see seed_cases)
+            message = f"{problems} queries don't use an index as intended"
+            if options["strict"]:
+                raise CommandError(message)
+            self.stderr.write(message)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.images import generate_renditions
+from core.models import MissingPersonPhoto
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG renditions for uploaded photos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate renditions for photos that already have them",
+        )
+
+    def handle(self, *args, **options):
+        photos = MissingPersonPhoto.objects.exclude(photo="")
+        if not options["force"]:
+            photos = photos.filter(renditions={})
+
+        done = failed = 0
+        for photo in photos.iterator(chunk_size=100):
+            try:
+                renditions = generate_renditions(photo)
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f"Photo {photo.pk}: {e}")
+                continue
+            MissingPersonPhoto.objects.filter(pk=photo.pk).update(renditions=renditions)
+            done += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated renditions for {done} photos ({failed} failed)"
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.images import open_photo, perceptual_hash
+from core.models import MissingPersonPhoto
+
+
+class Command(BaseCommand):
+    help = "Compute the perceptual hashes photo search matches uploads against"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompute hashes for photos that already have one",
+        )
+
+    def handle(self, *args, **options):
+        photos = MissingPersonPhoto.objects.exclude(photo="")
+        if not options["force"]:
+            photos = photos.filter(perceptual_hash__isnull=True)
+
+        done = failed = 0
+        for photo in photos.only("id", "photo").iterator(chunk_size=100):
+            try:
+                value = perceptual_hash(open_photo(photo))
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f"Photo {photo.pk}: {e}")
+                continue
+            MissingPersonPhoto.objects.filter(pk=photo.pk).update(
+                **photo.hash_fields(value)
+            )
+            done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Hashed {done} photos ({failed} failed)"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import IMPORT_BATCH_SIZE, import_cases, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import missing person cases from a CSV or JSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file of cases")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Cases inserted per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate the file",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as file:
+                result = import_cases(
+                    read_rows(file, options["path"]),
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        for error in result.errors:
+            self.stderr.write(f"Row {error.row}: {'; '.join(error.messages)}")
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {result.created} of {result.rows} cases, "
+                f"{len(result.errors)} rows had errors"
+            )
+        )
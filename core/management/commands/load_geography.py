@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.geography import GEOGRAPHY_CSV, load_geography
+
+
+class Command(BaseCommand):
+    help = "Load counties, constituencies and wards from the geography CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--csv",
+            default=GEOGRAPHY_CSV,
+            help="Path to a counties-constituencies-wards CSV file",
+        )
+
+    def handle(self, *args, **options):
+        counties, constituencies, wards = load_geography(options["csv"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {counties} counties, {constituencies} constituencies "
+                f"and {wards} wards"
+            )
+        )
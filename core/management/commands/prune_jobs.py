@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.jobs import prune_jobs
+
+
+class Command(BaseCommand):
+    help = "Delete finished and failed background jobs past their retention"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.JOBS_RETENTION,
+            help="Keep finished jobs from the last this many days",
+        )
+        parser.add_argument(
+            "--failed-days",
+            type=int,
+            default=settings.JOBS_FAILED_RETENTION,
+            help="Keep failed jobs from the last this many days",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_jobs(options["days"], options["failed_days"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} old jobs"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.models import MissingPerson
+from core.search import index_missing_persons
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full text search document for every missing person"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows to reindex per UPDATE/INSERT (default: 5000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        pks = MissingPerson.objects.order_by("pk").values_list("pk", flat=True)
+
+        total = 0
+        batch = []
+        for pk in pks.iterator(chunk_size=batch_size):
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                index_missing_persons(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            index_missing_persons(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {total} missing persons"))
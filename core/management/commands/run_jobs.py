@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs (photo ingestion, renditions, cleanup)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            ran = run_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs"))
+            return
+
+        self.stdout.write("Waiting for jobs, press Ctrl+C to stop")
+        try:
+            while True:
+                close_old_connections()
+                if not run_pending_jobs(limit=100):
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seeding import SEED_BATCH_SIZE, seed_cases
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with made up cases for development and load "
+        "testing. Never run this against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=1000, help="Number of cases to create"
+        )
+        parser.add_argument(
+            "--photos",
+            action="store_true",
+            help="Give every case a generated placeholder photo",
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Random seed, the same seed gives the same data"
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=3 * 365,
+            help="Spread the reports over this many days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SEED_BATCH_SIZE,
+            help="Cases inserted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        if count < 1 or options["days"] < 1:
+            raise CommandError("--count and --days must be at least 1")
+        try:
+            for inserted in seed_cases(
+                count,
+                photos=options["photos"],
+                seed=options["seed"],
+                days=options["days"],
+                batch_size=options["batch_size"],
+            ):
+                self.stdout.write(f"{inserted}/{count}", ending="\r")
+                self.stdout.flush()
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"Created {count} cases"))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.uploads import sweep_staged_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete photos uploaded in the report wizard but never submitted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=settings.STAGED_UPLOAD_MAX_AGE,
+            help="Remove staged uploads older than this many hours",
+        )
+
+    def handle(self, *args, **options):
+        removed = sweep_staged_uploads(options["max_age"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} abandoned uploads"))
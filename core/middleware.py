@@ -0,0 +1,102 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .routers import PIN_COOKIE, ReadState, current_state, replica_configured
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Tracks what each request reads and writes for ``core.routers``, and
+    after a request that wrote keeps the visitor on the primary for
+    ``REPLICA_PIN_SECONDS`` so they see their own changes (a reporter their
+    new case) before the replica catches up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = ReadState(pinned=PIN_COOKIE in request.COOKIES)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        # the ORM's threads get a copy of the context, so the router still
+        # sees this request's state
+        state = ReadState(pinned=PIN_COOKIE in request.COOKIES)
+        token = current_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+        return self.pin(request, response, state)
+
+    def pin(self, request, response, state):
+        if state.wrote and replica_configured():
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+                secure=request.is_secure(),
+            )
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, which is sync only: under ASGI every request would hop to a
+    thread and back just to be checked against the static files. Here the
+    lookup happens on the event loop and only the file reads in a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+
+        response = await sync_to_async(self.serve, thread_sensitive=False)(
+            static_file, request
+        )
+        # no file for HEAD and 304 responses; the response closes the file
+        response.streaming_content = read_file(response.file_to_stream)
+        return response
+
+
+async def read_file(file, block_size=64 * 1024):
+    if file is None:
+        return
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while chunk := await read(block_size):
+        yield chunk
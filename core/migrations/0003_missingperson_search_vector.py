@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:36
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = "core_missingperson_fts"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS core_missingperson_search_vector_gin "
+            "ON core_missingperson USING gin (search_vector)"
+        )
+        schema_editor.execute(
+            "UPDATE core_missingperson SET search_vector = "
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(last_seen_location, '')), 'B') || "
+            "setweight(to_tsvector('simple', concat_ws(' ', county, sub_county, ward)), 'C') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(name, last_seen_location, region, description)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} "
+            "(rowid, name, last_seen_location, region, description) "
+            "SELECT id, name, last_seen_location, "
+            "county || ' ' || sub_county || ' ' || ward, description "
+            "FROM core_missingperson"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS core_missingperson_search_vector_gin"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_missingpersonphoto_alternative_text_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="missingperson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
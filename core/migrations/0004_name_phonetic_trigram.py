@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:38
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from core.utils import phonetic_key
+
+TRIGRAM_INDEXES = (
+    ("core_missingperson_name_trgm", "core_missingperson", "name"),
+    ("core_missingperson_name_phonetic_trgm", "core_missingperson", "name_phonetic"),
+    ("core_missingpersoncontact_name_trgm", "core_missingpersoncontact", "name"),
+    (
+        "core_missingpersoncontact_name_phonetic_trgm",
+        "core_missingpersoncontact",
+        "name_phonetic",
+    ),
+)
+
+
+def populate_phonetic_keys(apps, schema_editor):
+    for model_name in ("MissingPerson", "MissingPersonContact"):
+        model = apps.get_model("core", model_name)
+        batch = []
+        for obj in model.objects.only("pk", "name").iterator(chunk_size=2000):
+            obj.name_phonetic = phonetic_key(obj.name)
+            batch.append(obj)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ["name_phonetic"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["name_phonetic"])
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} "
+            f"ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_missingperson_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="missingperson",
+            name="name_phonetic",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="missingpersoncontact",
+            name="name_phonetic",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_phonetic_keys, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
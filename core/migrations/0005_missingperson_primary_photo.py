@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_photo_summary(apps, schema_editor):
+    MissingPerson = apps.get_model("core", "MissingPerson")
+    Through = MissingPerson.photos.through
+
+    summaries = {}
+    rows = Through.objects.order_by(
+        "missingperson_id", "-missingpersonphoto__is_primary", "missingpersonphoto_id"
+    ).values_list("missingperson_id", "missingpersonphoto_id")
+    for person_id, photo_id in rows.iterator(chunk_size=5000):
+        primary_photo_id, count = summaries.get(person_id, (photo_id, 0))
+        summaries[person_id] = (primary_photo_id, count + 1)
+
+    for person_id, (primary_photo_id, count) in summaries.items():
+        MissingPerson.objects.filter(pk=person_id).update(
+            primary_photo_id=primary_photo_id, photo_count=count
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_name_phonetic_trigram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="missingperson",
+            name="photo_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="missingperson",
+            name="primary_photo",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="core.missingpersonphoto",
+            ),
+        ),
+        migrations.RunPython(populate_photo_summary, migrations.RunPython.noop),
+    ]
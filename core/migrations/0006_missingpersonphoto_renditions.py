@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_missingperson_primary_photo"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="missingpersonphoto",
+            name="renditions",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
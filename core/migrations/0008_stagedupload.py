@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:48
+
+import core.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_photo_status_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StagedUpload",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "file",
+                    models.ImageField(upload_to=core.utils.generate_unique_filename),
+                ),
+                ("original_name", models.CharField(max_length=255)),
+                ("description", models.TextField(blank=True)),
+                ("alternative_text", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["created_at"], name="core_staged_created_d5ff01_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,210 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.geography import build_lookups, read_geography_csv, resolve_region
+
+
+def load_geography(apps, schema_editor):
+    County = apps.get_model("core", "County")
+    Constituency = apps.get_model("core", "Constituency")
+    Ward = apps.get_model("core", "Ward")
+    MissingPerson = apps.get_model("core", "MissingPerson")
+
+    rows = read_geography_csv()
+    counties = {row["county_code"]: row["county"] for row in rows}
+    County.objects.bulk_create(
+        County(code=code, name=name) for code, name in counties.items()
+    )
+    county_ids = dict(County.objects.values_list("code", "id"))
+    constituencies = {
+        row["constituency_code"]: (row["constituency"], row["county_code"])
+        for row in rows
+    }
+    Constituency.objects.bulk_create(
+        Constituency(code=code, name=name, county_id=county_ids[county_code])
+        for code, (name, county_code) in constituencies.items()
+    )
+    constituency_ids = dict(Constituency.objects.values_list("code", "id"))
+    Ward.objects.bulk_create(
+        Ward(
+            code=row["ward_code"],
+            name=row["ward"],
+            constituency_id=constituency_ids[row["constituency_code"]],
+        )
+        for row in rows
+    )
+
+    # point existing reports at the tables and fix up their spelling
+    lookups = build_lookups(
+        County.objects.values_list("id", "name"),
+        Constituency.objects.values_list("id", "name", "county_id"),
+        Ward.objects.values_list("id", "name", "constituency_id"),
+    )
+    fields = [
+        "county",
+        "sub_county",
+        "ward",
+        "region_county",
+        "region_constituency",
+        "region_ward",
+    ]
+    batch = []
+    persons = MissingPerson.objects.only("county", "sub_county", "ward")
+    for person in persons.iterator(chunk_size=2000):
+        region = resolve_region(
+            person.county, person.sub_county, person.ward, lookups=lookups
+        )
+        if region.county_id is None:
+            continue
+        person.region_county_id = region.county_id
+        person.region_constituency_id = region.constituency_id
+        person.region_ward_id = region.ward_id
+        person.county = region.county_name
+        person.sub_county = region.constituency_name or person.sub_county
+        person.ward = region.ward_name or person.ward
+        batch.append(person)
+        if len(batch) >= 2000:
+            MissingPerson.objects.bulk_update(batch, fields)
+            batch = []
+    MissingPerson.objects.bulk_update(batch, fields)
+
+
+def unload_geography(apps, schema_editor):
+    apps.get_model("core", "County").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_stagedupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Constituency",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.PositiveSmallIntegerField(unique=True)),
+                ("name", models.CharField(max_length=100)),
+            ],
+            options={
+                "verbose_name_plural": "constituencies",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="County",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.PositiveSmallIntegerField(unique=True)),
+                ("name", models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                "verbose_name_plural": "counties",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="missingperson",
+            name="region_constituency",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="missing_persons",
+                to="core.constituency",
+            ),
+        ),
+        migrations.AddField(
+            model_name="constituency",
+            name="county",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="constituencies",
+                to="core.county",
+            ),
+        ),
+        migrations.AddField(
+            model_name="missingperson",
+            name="region_county",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="missing_persons",
+                to="core.county",
+            ),
+        ),
+        migrations.CreateModel(
+            name="Ward",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.PositiveSmallIntegerField(unique=True)),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "constituency",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wards",
+                        to="core.constituency",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="missingperson",
+            name="region_ward",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="missing_persons",
+                to="core.ward",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="constituency",
+            constraint=models.UniqueConstraint(
+                fields=("county", "name"), name="unique_constituency_per_county"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ward",
+            constraint=models.UniqueConstraint(
+                fields=("constituency", "name"), name="unique_ward_per_constituency"
+            ),
+        ),
+        migrations.RunPython(load_geography, unload_geography),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_geography"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                condition=models.Q(("status", "missing")),
+                fields=["-created_at", "-id"],
+                name="missing_person_listing_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                condition=models.Q(("status", "missing")),
+                fields=["gender", "-created_at", "-id"],
+                name="missing_person_gender_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                condition=models.Q(("status", "missing")),
+                fields=["region_county", "-created_at", "-id"],
+                name="missing_person_county_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="missing_person_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                fields=["updated_at", "id"], name="missing_person_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                fields=["county", "status", "gender"], name="missing_person_stats_idx"
+            ),
+        ),
+    ]
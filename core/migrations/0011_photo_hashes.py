@@ -0,0 +1,54 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="missingpersonphoto",
+            name="hash_part_0",
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="missingpersonphoto",
+            name="hash_part_1",
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="missingpersonphoto",
+            name="hash_part_2",
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="missingpersonphoto",
+            name="hash_part_3",
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="missingpersonphoto",
+            name="perceptual_hash",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="missingpersonphoto",
+            index=models.Index(fields=["hash_part_0"], name="photo_hash_part_0_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="missingpersonphoto",
+            index=models.Index(fields=["hash_part_1"], name="photo_hash_part_1_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="missingpersonphoto",
+            index=models.Index(fields=["hash_part_2"], name="photo_hash_part_2_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="missingpersonphoto",
+            index=models.Index(fields=["hash_part_3"], name="photo_hash_part_3_idx"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_photo_hashes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="missingperson",
+            index=models.Index(
+                condition=models.Q(("status", "missing")),
+                fields=["updated_at"],
+                name="missing_person_changed_idx",
+            ),
+        ),
+    ]
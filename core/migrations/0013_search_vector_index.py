@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:24
+
+import core.indexes
+from django.db import migrations
+
+# created with raw SQL by 0003, taken over by the declared index
+OLD_INDEX = "core_missingperson_search_vector_gin"
+INDEX = "missing_person_search_idx"
+
+
+def adopt_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"ALTER INDEX IF EXISTS {OLD_INDEX} RENAME TO {INDEX}")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX} "
+        "ON core_missingperson USING gin (search_vector)"
+    )
+
+
+def release_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"ALTER INDEX IF EXISTS {INDEX} RENAME TO {OLD_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_missing_person_changed_idx"),
+    ]
+
+    operations = [
+        # the index usually exists already, only renamed here; the state
+        # change lets makemigrations and explain_queries see it
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(adopt_search_index, release_search_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="missingperson",
+                    index=core.indexes.PostgresGinIndex(
+                        fields=["search_vector"], name=INDEX
+                    ),
+                ),
+            ],
+        ),
+    ]
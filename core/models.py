@@ -1,6 +1,11 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 from django_extensions.db.models import AutoSlugField
-from .utils import format_phone_number, generate_unique_filename
+from .images import HASH_PARTS, split_hash
+from .indexes import PostgresGinIndex
+from .utils import format_phone_number, generate_unique_filename, phonetic_key
 
 
 class Status(models.TextChoices):
@@ -9,6 +14,19 @@ class Status(models.TextChoices):
     FOUND_CONFIRMED = "found_confirmed", "Found - Confirmed"
 
 
+class PhotoStatus(models.TextChoices):
+    PENDING = "pending", "Pending"
+    READY = "ready", "Ready"
+    FAILED = "failed", "Failed"
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    DONE = "done", "Done"
+    FAILED = "failed", "Failed"
+
+
 class TimestampedModel(models.Model):
     """
     Abstract model for timestamp fields
@@ -21,17 +39,150 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+class County(models.Model):
+    """
+    Administrative geography, loaded from
+    static/data/counties-constituencies-wards.csv (see core.geography).
+    ``code`` is the official number from the CSV.
+    """
+
+    code = models.PositiveSmallIntegerField(unique=True)
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "counties"
+
+    def __str__(self):
+        return self.name
+
+
+class Constituency(models.Model):
+    code = models.PositiveSmallIntegerField(unique=True)
+    name = models.CharField(max_length=100)
+    county = models.ForeignKey(
+        County, on_delete=models.CASCADE, related_name="constituencies"
+    )
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "constituencies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["county", "name"], name="unique_constituency_per_county"
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Ward(models.Model):
+    code = models.PositiveSmallIntegerField(unique=True)
+    name = models.CharField(max_length=100)
+    constituency = models.ForeignKey(
+        Constituency, on_delete=models.CASCADE, related_name="wards"
+    )
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["constituency", "name"], name="unique_ward_per_constituency"
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 class MissingPersonPhoto(TimestampedModel):
 
     photo = models.ImageField(upload_to=generate_unique_filename)
     description = models.TextField(blank=True)
     alternative_text = models.CharField(max_length=255, blank=True)
     is_primary = models.BooleanField(default=False)
+    # photos from the report form are stored by a background job (see core.tasks)
+    status = models.CharField(
+        max_length=10, choices=PhotoStatus.choices, default=PhotoStatus.READY
+    )
+    # resized, EXIF-free copies of photo, see core.images.RENDITIONS
+    # {"card": {"width": 400, "height": 300, "webp": "<name>", "jpeg": "<name>"}, ...}
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # core.images.perceptual_hash, set along with the renditions and stored
+    # signed to fit a bigint; its 16 bit parts are indexed separately so
+    # core.photo_search can find lookalikes without reading every hash
+    perceptual_hash = models.BigIntegerField(null=True, blank=True, editable=False)
+    hash_part_0 = models.IntegerField(null=True, blank=True, editable=False)
+    hash_part_1 = models.IntegerField(null=True, blank=True, editable=False)
+    hash_part_2 = models.IntegerField(null=True, blank=True, editable=False)
+    hash_part_3 = models.IntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=[f"hash_part_{i}"], name=f"photo_hash_part_{i}_idx")
+            for i in range(HASH_PARTS)
+        ]
 
     def __str__(self):
         return f"Photo {self.id} - {self.description[:20]}"
 
+    @staticmethod
+    def hash_fields(value):
+        """
+        Field values storing the perceptual hash ``value``.
+        """
+        fields = {"perceptual_hash": value - (1 << 64) if value >= 1 << 63 else value}
+        for i, part in enumerate(split_hash(value)):
+            fields[f"hash_part_{i}"] = part
+        return fields
+
+    def get_upload_path(self):
+        return "missing_person_photos/"
+
+    def rendition_url(self, rendition, extension="jpeg"):
+        """
+        URL of a rendition, falling back to the original upload until the
+        renditions have been generated.
+        """
+        name = self.renditions.get(rendition, {}).get(extension)
+        if name:
+            return self.photo.storage.url(name)
+        return self.photo.url
+
+    def srcset(self, extension="jpeg"):
+        # small originals aren't upscaled, so several renditions can share a width
+        candidates = {}
+        for entry in self.renditions.values():
+            if entry.get(extension):
+                candidates.setdefault(entry["width"], entry[extension])
+        return ", ".join(
+            f"{self.photo.storage.url(name)} {width}w"
+            for width, name in sorted(candidates.items())
+        )
+
+
+class StagedUpload(TimestampedModel):
+    """
+    Photo uploaded in step 2 of the report wizard. The file is written once,
+    straight to its final name, and becomes a MissingPersonPhoto when the
+    report is submitted (see core.uploads).
+    """
+
+    file = models.ImageField(upload_to=generate_unique_filename)
+    original_name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    alternative_text = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        # the sweeper looks for abandoned uploads by age
+        indexes = [models.Index(fields=["created_at"])]
+
+    def __str__(self):
+        return self.original_name
+
     def get_upload_path(self):
+        # same place as MissingPersonPhoto so promoting never moves the file
         return "missing_person_photos/"
 
 
@@ -40,16 +191,24 @@ class MissingPersonContact(TimestampedModel):
     phone_number = models.CharField(max_length=20)
     email = models.EmailField(blank=True)
 
+    # phonetic key of name, for lookalike / duplicate matching (see core.fuzzy)
+    name_phonetic = models.CharField(max_length=255, blank=True, editable=False)
+
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
+        self.set_derived_fields()
+        super().save(*args, **kwargs)
+
+    def set_derived_fields(self):
+        # also called by the bulk import (core.imports), which skips save()
+        self.name_phonetic = phonetic_key(self.name)
         if self.phone_number:
             try:
                 self.phone_number = format_phone_number(self.phone_number)
             except ValueError:
                 pass  # Invalid phone number, save as is
-        super().save(*args, **kwargs)
 
 
 class MissingPerson(TimestampedModel):
@@ -57,15 +216,54 @@ class MissingPerson(TimestampedModel):
     genders = (("M", "Male"), ("F", "Female"))
 
     name = models.CharField(max_length=255)
+    # phonetic key of name, for lookalike / duplicate matching (see core.fuzzy)
+    name_phonetic = models.CharField(max_length=255, blank=True, editable=False)
     gender = models.CharField(max_length=1, choices=genders)
     age = models.PositiveIntegerField(null=True, blank=True)
     last_seen_location = models.CharField(max_length=255)
     description = models.TextField()
     photos = models.ManyToManyField(MissingPersonPhoto, blank=True)
+    # denormalized from photos so list pages can join the thumbnail in one
+    # query, kept in sync by refresh_photo_summary() from core.signals
+    primary_photo = models.ForeignKey(
+        MissingPersonPhoto,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    photo_count = models.PositiveIntegerField(default=0, editable=False)
 
     county = models.CharField(max_length=100, blank=True)
     sub_county = models.CharField(max_length=100, blank=True)
     ward = models.CharField(max_length=100, blank=True)
+    # the above matched against the geography tables on save, indexed so
+    # region filters don't compare strings (unmatched free text stays null)
+    region_county = models.ForeignKey(
+        County,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="missing_persons",
+    )
+    region_constituency = models.ForeignKey(
+        Constituency,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="missing_persons",
+    )
+    region_ward = models.ForeignKey(
+        Ward,
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="missing_persons",
+    )
 
     # a missing person can have multiple contacts
     contacts = models.ManyToManyField(MissingPersonContact, blank=True)
@@ -77,24 +275,133 @@ class MissingPerson(TimestampedModel):
     date_found = models.DateTimeField(null=True, blank=True)
 
     # slug field for SEO-friendly URLs
+    # a slug set before the first save is kept, the bulk import assigns them
     slug = AutoSlugField(
-        populate_from="name", unique=True, max_length=255, db_index=True
+        populate_from="name",
+        unique=True,
+        max_length=255,
+        db_index=True,
+        overwrite_on_add=False,
     )
 
+    # weighted full text search document, maintained by core.search
+    # (GIN indexed on PostgreSQL, mirrored into an FTS5 table on SQLite)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        # matched to the listing and console query shapes, newest first with
+        # id as the tie breaker like the cursor pagination; check the plans
+        # with `python manage.py explain_queries`
+        indexes = [
+            # public listing and home page (only open cases are shown),
+            # optionally narrowed to a gender or county
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=Q(status=Status.MISSING),
+                name="missing_person_listing_idx",
+            ),
+            models.Index(
+                fields=["gender", "-created_at", "-id"],
+                condition=Q(status=Status.MISSING),
+                name="missing_person_gender_idx",
+            ),
+            models.Index(
+                fields=["region_county", "-created_at", "-id"],
+                condition=Q(status=Status.MISSING),
+                name="missing_person_county_idx",
+            ),
+            # the listing's ETag, MAX(updated_at) of the open cases
+            models.Index(
+                fields=["updated_at"],
+                condition=Q(status=Status.MISSING),
+                name="missing_person_changed_idx",
+            ),
+            # console cases table (every status)
+            models.Index(
+                fields=["-created_at", "-id"], name="missing_person_created_idx"
+            ),
+            # partner API sync, oldest change first
+            models.Index(
+                fields=["updated_at", "id"], name="missing_person_updated_idx"
+            ),
+            # case statistics GROUP BY, answered from the index alone
+            models.Index(
+                fields=["county", "status", "gender"], name="missing_person_stats_idx"
+            ),
+            # full text search (core.search), SQLite uses an FTS5 table instead
+            PostgresGinIndex(
+                fields=["search_vector"], name="missing_person_search_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
-        # Save the object first to get an ID
+        self.set_derived_fields()
         super().save(*args, **kwargs)
 
-        # Then handle photo primary setting if photos exist
-        if (
-            self.pk
-            and self.photos.exists()
-            and not self.photos.filter(is_primary=True).exists()
-        ):
-            first_photo = self.photos.first()
-            if first_photo:
-                first_photo.is_primary = True
-                first_photo.save()
+    def set_derived_fields(self):
+        # also called by the bulk import (core.imports), which skips save()
+        from .geography import resolve_region
+
+        self.name_phonetic = phonetic_key(self.name)
+        region = resolve_region(self.county, self.sub_county, self.ward)
+        self.region_county_id = region.county_id
+        self.region_constituency_id = region.constituency_id
+        self.region_ward_id = region.ward_id
+        # store the official spelling of whatever matched
+        self.county = region.county_name or self.county
+        self.sub_county = region.constituency_name or self.sub_county
+        self.ward = region.ward_name or self.ward
+
+    def refresh_photo_summary(self):
+        """
+        Recompute primary_photo and photo_count from the ready photos,
+        marking the first photo as primary when none is.
+        """
+        photos = list(
+            self.photos.filter(status=PhotoStatus.READY)
+            .order_by("-is_primary", "id")
+            .values_list("pk", "is_primary")
+        )
+        primary_photo_id = photos[0][0] if photos else None
+        if photos and not photos[0][1]:
+            MissingPersonPhoto.objects.filter(pk=primary_photo_id).update(
+                is_primary=True
+            )
+
+        self.primary_photo_id = primary_photo_id
+        self.photo_count = len(photos)
+        self.updated_at = timezone.now()
+        MissingPerson.objects.filter(pk=self.pk).update(
+            primary_photo_id=self.primary_photo_id,
+            photo_count=self.photo_count,
+            updated_at=self.updated_at,
+        )
+
+
+class Job(TimestampedModel):
+    """
+    A unit of background work, picked up by ``manage.py run_jobs``.
+    See core.jobs for enqueueing and the worker loop.
+    """
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"]),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
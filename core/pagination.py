@@ -0,0 +1,180 @@
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 48
+
+CURSOR_SALT = "core.pagination.cursor"
+
+
+def get_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse a ``page_items`` style query parameter, clamped to ``1..maximum``.
+    """
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def approximate_count(queryset):
+    """
+    Row estimate from the PostgreSQL planner statistics, so listings can
+    show "about N results" without a COUNT(*). Returns None elsewhere.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 for a table that has never been analyzed
+        return max(row[0], 0) if row else None
+
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: each page is fetched with a ``WHERE (ordering) <
+    (last row)`` filter instead of ``OFFSET``, and there is no COUNT(*),
+    so page 1000 costs the same as page 1.
+
+    ``ordering`` must end in a unique field (``id``) so rows never tie.
+    Cursors are signed, opaque tokens that encode the boundary row's
+    ordering values and the direction to read in.
+    """
+
+    def __init__(self, queryset, per_page, ordering=("-created_at", "-id")):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = [
+            (field.lstrip("-"), field.startswith("-")) for field in ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for field, _ in self.ordering:
+            # model instances, or dicts from a .values() queryset
+            value = obj[field] if isinstance(obj, dict) else getattr(obj, field)
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            values.append(value)
+        return signing.dumps({"v": values, "d": direction}, salt=CURSOR_SALT)
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            values, direction = data["v"], data["d"]
+        except (signing.BadSignature, KeyError, TypeError):
+            return None, None
+        if len(values) != len(self.ordering) or direction not in ("next", "prev"):
+            return None, None
+        return values, direction
+
+    def _after(self, values, reverse=False):
+        """
+        Q object selecting rows strictly after ``values`` in the paginator
+        ordering (or strictly before, when ``reverse``).
+        """
+        clauses = []
+        for i, (field, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != reverse else "gt"
+            equal = {name: values[j] for j, (name, _) in enumerate(self.ordering[:i])}
+            clauses.append(Q(**equal, **{f"{field}__{lookup}": values[i]}))
+        # redundant with the clauses, but a plain range on the leading field
+        # lets the database seek into the ordering index instead of walking
+        # it from the start and filtering
+        field, descending = self.ordering[0]
+        bound = Q(
+            **{f"{field}__{'lte' if descending != reverse else 'gte'}": values[0]}
+        )
+        return bound & reduce(or_, clauses)
+
+    def _order_by(self, reverse=False):
+        return [
+            f"-{field}" if descending != reverse else field
+            for field, descending in self.ordering
+        ]
+
+    def _rows(self, values, direction):
+        # a row past the page tells whether there's another one
+        if values is None:
+            queryset = self.queryset.order_by(*self._order_by())
+        else:
+            reverse = direction == "prev"
+            queryset = self.queryset.filter(
+                self._after(values, reverse=reverse)
+            ).order_by(*self._order_by(reverse))
+        return queryset[: self.per_page + 1]
+
+    def _page(self, rows, values, direction):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if values is None:
+            next_cursor = self.encode_cursor(rows[-1], "next") if has_more else None
+            return CursorPage(rows, next_cursor, None)
+
+        if direction == "prev":
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, True
+
+        if not rows:
+            return CursorPage(rows, None, None)
+        return CursorPage(
+            rows,
+            self.encode_cursor(rows[-1], "next") if has_next else None,
+            self.encode_cursor(rows[0], "prev") if has_previous else None,
+        )
+
+    def page(self, cursor=None):
+        values, direction = self.decode_cursor(cursor) if cursor else (None, None)
+        return self._page(list(self._rows(values, direction)), values, direction)
+
+    async def apage(self, cursor=None):
+        values, direction = self.decode_cursor(cursor) if cursor else (None, None)
+        rows = [row async for row in self._rows(values, direction)]
+        return self._page(rows, values, direction)
@@ -0,0 +1,117 @@
+from functools import reduce
+from itertools import combinations
+from operator import or_
+
+from django.db.models import Q
+from PIL import Image
+
+from .images import (
+    HASH_BITS,
+    HASH_PARTS,
+    PART_BITS,
+    load_image,
+    perceptual_hash,
+    split_hash,
+)
+from .models import MissingPerson, MissingPersonPhoto, PhotoStatus, Status
+
+# photos whose hashes differ in more bits than this don't look alike
+MAX_DISTANCE = 10
+MAX_RESULTS = 12
+
+# JPEGs are decoded at no less than this, plenty for the hash
+UPLOAD_DRAFT_SIZE = (128, 128)
+
+
+def upload_hash(file):
+    """
+    Perceptual hash of an uploaded image, or None if it can't be read.
+    """
+    try:
+        image = load_image(file, draft_size=UPLOAD_DRAFT_SIZE)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        # Pillow raises all of these for broken or hostile files
+        return None
+    return perceptual_hash(image)
+
+
+def hamming_distance(a, b):
+    # stored hashes are signed, the mask makes both sides unsigned
+    return ((a ^ b) & ((1 << HASH_BITS) - 1)).bit_count()
+
+
+def nearby_parts(part, radius):
+    """
+    Every ``PART_BITS`` bit value at most ``radius`` bits away from ``part``.
+    """
+    values = [part]
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(PART_BITS), distance):
+            values.append(reduce(lambda value, bit: value ^ 1 << bit, bits, part))
+    return values
+
+
+def lookalike_candidates(value, max_distance=MAX_DISTANCE):
+    """
+    ``(id, perceptual_hash)`` of the ready photos that may be within
+    ``max_distance`` bits of ``value``.
+
+    Multi-index hashing: a hash at most ``max_distance`` bits away has at
+    least one of its ``HASH_PARTS`` parts at most ``max_distance //
+    HASH_PARTS`` bits away from the same part of ``value``, so only photos
+    with such a part are fetched, each through its part's index.
+    """
+    radius = max_distance // HASH_PARTS
+    near = reduce(
+        or_,
+        (
+            Q(**{f"hash_part_{i}__in": nearby_parts(part, radius)})
+            for i, part in enumerate(split_hash(value))
+        ),
+    )
+    return MissingPersonPhoto.objects.filter(
+        near, status=PhotoStatus.READY
+    ).values_list("id", "perceptual_hash")
+
+
+def lookalike_photos(value, max_distance=MAX_DISTANCE):
+    """
+    ``{photo id: distance}`` of the ready photos whose hash is within
+    ``max_distance`` bits of ``value``.
+    """
+    distances = {}
+    for photo_id, stored in lookalike_candidates(value, max_distance):
+        distance = hamming_distance(stored, value)
+        if distance <= max_distance:
+            distances[photo_id] = distance
+    return distances
+
+
+def find_lookalikes(value, max_distance=MAX_DISTANCE, limit=MAX_RESULTS):
+    """
+    Open cases with a photo that looks like the one hashed to ``value``,
+    nearest first, as ``(person, photo, distance)`` with their closest
+    photo.
+    """
+    distances = lookalike_photos(value, max_distance)
+    if not distances:
+        return []
+
+    closest = {}
+    links = MissingPerson.photos.through.objects.filter(
+        missingpersonphoto_id__in=distances, missingperson__status=Status.MISSING
+    ).values_list("missingperson_id", "missingpersonphoto_id")
+    for person_id, photo_id in links:
+        best = closest.get(person_id)
+        if best is None or distances[photo_id] < distances[best]:
+            closest[person_id] = photo_id
+
+    # newest case first between equally close ones
+    nearest = sorted(closest.items(), key=lambda item: (distances[item[1]], -item[0]))
+    nearest = nearest[:limit]
+    persons = MissingPerson.objects.in_bulk([person_id for person_id, _ in nearest])
+    photos = MissingPersonPhoto.objects.in_bulk([photo_id for _, photo_id in nearest])
+    return [
+        (persons[person_id], photos[photo_id], distances[photo_id])
+        for person_id, photo_id in nearest
+    ]
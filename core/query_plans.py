@@ -0,0 +1,132 @@
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Count
+from django.http import QueryDict
+from django.utils import timezone
+
+from .models import County, MissingPerson, MissingPersonPhoto
+from .pagination import DEFAULT_PAGE_SIZE, CursorPaginator
+from .photo_search import lookalike_candidates
+from .search import search_missing_persons
+
+# (name, function returning the queryset the page runs)
+CanonicalQuery = namedtuple("CanonicalQuery", ["name", "queryset"])
+
+
+def listing(params=""):
+    from .views import filter_missing_persons
+
+    def queryset():
+        persons, ordering = filter_missing_persons(QueryDict(params))
+        return persons.select_related("primary_photo").order_by(*ordering)[
+            : DEFAULT_PAGE_SIZE + 1
+        ]
+
+    return queryset
+
+
+def listing_county():
+    county = County.objects.values_list("name", flat=True).first() or ""
+    return listing(f"county={county}")()
+
+
+def listing_next_page():
+    # the query behind a "next" cursor, from a row part way down the listing
+    persons = MissingPerson.objects.filter(status="missing")
+    ordering = ("-created_at", "-id")
+    paginator = CursorPaginator(persons, DEFAULT_PAGE_SIZE, ordering)
+    boundary = persons.order_by(*ordering).values("created_at", "id")[
+        DEFAULT_PAGE_SIZE * 10 : DEFAULT_PAGE_SIZE * 10 + 1
+    ]
+    row = boundary[0] if boundary else {"created_at": timezone.now(), "id": 0}
+    values = [row["created_at"], row["id"]]
+    return persons.filter(paginator._after(values)).order_by(*ordering)[
+        : DEFAULT_PAGE_SIZE + 1
+    ]
+
+
+CANONICAL_QUERIES = [
+    CanonicalQuery(
+        "web_index",
+        lambda: MissingPerson.objects.filter(status="missing")
+        .select_related("primary_photo")
+        .order_by("-created_at")[:3],
+    ),
+    CanonicalQuery("listing", listing()),
+    CanonicalQuery("listing_gender", listing("gender=F")),
+    CanonicalQuery("listing_age_range", listing("age_min=18&age_max=35")),
+    CanonicalQuery("listing_county", listing_county),
+    # the full text match, results are then sorted by rank whatever the index
+    CanonicalQuery(
+        "search",
+        lambda: search_missing_persons(
+            MissingPerson.objects.filter(status="missing"), "kamau"
+        ).values("id"),
+    ),
+    # the listing ETag's MAX(updated_at), written the way the planner runs it
+    CanonicalQuery(
+        "listing_etag",
+        lambda: MissingPerson.objects.filter(status="missing")
+        .order_by("-updated_at")
+        .values("updated_at")[:1],
+    ),
+    CanonicalQuery("listing_next_page", listing_next_page),
+    CanonicalQuery(
+        "dashboard_cases",
+        lambda: MissingPerson.objects.order_by("-created_at", "-id").values(
+            "id", "slug", "name", "gender", "age", "county", "status", "created_at"
+        )[:25],
+    ),
+    CanonicalQuery(
+        "case_statistics",
+        lambda: MissingPerson.objects.order_by()
+        .values("county", "status", "gender")
+        .annotate(count=Count("id")),
+    ),
+    CanonicalQuery(
+        "api_sync",
+        lambda: MissingPerson.objects.filter(updated_at__gte="2000-01-01T00:00:00Z")
+        .order_by("updated_at", "id")
+        .values("id", "updated_at")[:51],
+    ),
+    CanonicalQuery("photo_search", lambda: lookalike_candidates(0x0123456789ABCDEF)),
+]
+
+# a full scan of one of these is what the indexes are there to avoid
+TABLES = [MissingPerson._meta.db_table, MissingPersonPhoto._meta.db_table]
+
+
+def summarize_plan(plan):
+    """
+    ``(index names used, full scan of the cases or photos table, sorts)``
+    read off the text of an EXPLAIN (``QuerySet.explain()``) on SQLite or
+    PostgreSQL.
+    """
+    if connection.vendor == "sqlite":
+        indexes = re.findall(r"USING (?:COVERING )?INDEX (\w+)", plan)
+        # the FTS5 table standing in for the search index
+        indexes += re.findall(r"SCAN (\w+) VIRTUAL TABLE", plan)
+        full_scan = any(
+            re.search(rf"SCAN {table}\b(?! USING)", plan) for table in TABLES
+        )
+        sorts = "USE TEMP B-TREE" in plan
+    else:
+        indexes = re.findall(r"Index (?:Only )?Scan(?: Backward)? using (\w+)", plan)
+        indexes += re.findall(r"Bitmap Index Scan on (\w+)", plan)
+        full_scan = any(f"Seq Scan on {table} " in plan for table in TABLES)
+        # Sort and Incremental Sort nodes, not "Sort Key:" lines
+        sorts = bool(re.search(r"Sort\s+\(cost", plan))
+    return sorted(set(indexes)), full_scan, sorts
+
+
+def explain_canonical_queries(names=None):
+    """
+    ``(name, plan, indexes, full_scan, sorts)`` for each canonical query.
+    """
+    for query in CANONICAL_QUERIES:
+        if names and query.name not in names:
+            continue
+        plan = query.queryset().explain()
+        yield (query.name, plan, *summarize_plan(plan))
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def client_ip(request):
+    """
+    The visitor's IP address. Behind ``TRUSTED_PROXY_COUNT`` reverse proxies
+    REMOTE_ADDR is the nearest proxy's, so it's read from X-Forwarded-For,
+    the entry the outermost trusted proxy added. Entries left of that are
+    whatever the client sent and can't be trusted.
+    """
+    proxies = getattr(settings, "TRUSTED_PROXY_COUNT", 0)
+    if proxies:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        addresses = [address.strip() for address in forwarded.split(",")]
+        if forwarded and len(addresses) >= proxies:
+            return addresses[-proxies]
+    return request.META.get("REMOTE_ADDR")
+
+
+def hit_rate_limit(key, limit, window):
+    """
+    Count a hit against ``key``'s fixed ``window`` second window, allowing
+    ``limit`` per window. Returns ``(allowed, remaining, seconds_until_reset)``.
+    """
+    now = time.time()
+    cache_key = f"{key}:{int(now // window)}"
+    cache.add(cache_key, 0, window * 2)
+    try:
+        count = cache.incr(cache_key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(cache_key, 1, window * 2)
+        count = 1
+    reset = window - int(now % window)
+    return count <= limit, max(limit - count, 0), reset
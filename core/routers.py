@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA = "replica"
+
+# read straight back after being written (a login, a new session), so never
+# from a replica that may not have them yet
+PRIMARY_ONLY_APPS = {"admin", "auth", "sessions", "account", "socialaccount"}
+
+# cookie keeping a visitor on the primary for a while after they write
+PIN_COOKIE = "primary_pin"
+
+
+class ReadState:
+    """
+    Where the current request may read from, set up by
+    ``core.middleware.ReplicaRoutingMiddleware``.
+    """
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.replica_allowed = False
+        self.used_replica = False
+        self.wrote = False
+
+
+current_state = ContextVar("read_state", default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def replica_lag():
+    """
+    Seconds the replica is behind the primary. Only PostgreSQL can tell,
+    anything else (SQLite stand-ins in development) counts as caught up
+    once it's reachable.
+    """
+    connection = connections[REPLICA]
+    # raises if the replica can't be reached
+    connection.ensure_connection()
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN NOT pg_is_in_recovery() "
+            "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        )
+        return float(cursor.fetchone()[0] or 0)
+
+
+class ReplicaHealth:
+    """
+    Whether the replica is reachable and caught up, checked at most every
+    ``REPLICA_LAG_CHECK_INTERVAL`` seconds per process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.usable = False
+
+    def is_usable(self):
+        now = time.monotonic()
+        with self.lock:
+            if (
+                self.checked_at is not None
+                and now - self.checked_at < settings.REPLICA_LAG_CHECK_INTERVAL
+            ):
+                return self.usable
+            # other threads keep the last answer while this one checks
+            self.checked_at = now
+
+        try:
+            lag = replica_lag()
+            usable = lag <= settings.REPLICA_MAX_LAG
+            if not usable:
+                logger.warning("Replica is %.1fs behind, reading from primary", lag)
+        except DatabaseError as e:
+            logger.warning("Replica unavailable, reading from primary: %s", e)
+            usable = False
+        self.usable = usable
+        return usable
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the ``replica`` database inside views marked with
+    ``read_from_replica``, unless the visitor wrote something recently,
+    the request is in a transaction or has written, or the replica is
+    lagging. Everything else, and every write, goes to ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if (
+            state is None
+            or not state.replica_allowed
+            or state.pinned
+            or state.wrote
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or not replica_configured()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+            or not replica_health.is_usable()
+        ):
+            return DEFAULT_DB_ALIAS
+        state.used_replica = True
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # same data on both
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its schema from the primary
+        return db != REPLICA
+
+
+def read_from_replica(view):
+    """
+    Let a read only view's GET requests read from the replica.
+    """
+
+    def allow(request):
+        state = current_state.get()
+        if state is None or request.method not in ("GET", "HEAD"):
+            return None
+        state.replica_allowed = True
+        return state
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            state = allow(request)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                if state is not None:
+                    state.replica_allowed = False
+
+    else:
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            state = allow(request)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                if state is not None:
+                    state.replica_allowed = False
+
+    return wrapper
+
+
+def used_replica():
+    state = current_state.get()
+    return state is not None and state.used_replica
@@ -0,0 +1,132 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Value
+from django.db.models.expressions import RawSQL
+
+# SQLite fallback table, kept in sync with core_missingperson by rowid
+FTS_TABLE = "core_missingperson_fts"
+
+# bm25 column weights for the FTS5 table, in the order the columns are declared
+# (name > last seen location > county/sub county/ward > description)
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# weighted search document used on PostgreSQL
+SEARCH_VECTOR = (
+    SearchVector("name", weight="A", config="simple")
+    + SearchVector("last_seen_location", weight="B", config="simple")
+    + SearchVector("county", "sub_county", "ward", weight="C", config="simple")
+    + SearchVector("description", weight="D", config="simple")
+)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_postgres():
+    return connection.vendor == "postgresql"
+
+
+def tokenize(query):
+    """
+    Split a user supplied query into plain word tokens, dropping any
+    operator characters so they can't break the tsquery / FTS5 syntax.
+    """
+    return TOKEN_RE.findall(query.lower())
+
+
+def index_missing_persons(pks=None):
+    """
+    (Re)build the search document for the given missing person ids,
+    or for every row when ``pks`` is None.
+    """
+    from .models import MissingPerson
+
+    if pks is not None:
+        pks = list(pks)
+        if not pks:
+            return
+
+    if is_postgres():
+        queryset = MissingPerson.objects.all()
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        queryset.update(search_vector=SEARCH_VECTOR)
+        return
+
+    if connection.vendor != "sqlite":
+        return
+
+    select_sql = (
+        "SELECT id, name, last_seen_location, "
+        "county || ' ' || sub_county || ' ' || ward, description "
+        "FROM core_missingperson"
+    )
+    with connection.cursor() as cursor:
+        if pks is None:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} "
+                "(rowid, name, last_seen_location, region, description) " + select_sql
+            )
+            return
+
+        placeholders = ", ".join(["%s"] * len(pks))
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", pks)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} "
+            "(rowid, name, last_seen_location, region, description) "
+            + select_sql
+            + f" WHERE id IN ({placeholders})",
+            pks,
+        )
+
+
+def remove_from_index(pks):
+    """
+    Drop deleted missing persons from the SQLite FTS table.
+    On PostgreSQL the vector lives on the row itself so nothing to do.
+    """
+    pks = list(pks)
+    if not pks or connection.vendor != "sqlite":
+        return
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", pks)
+
+
+def search_missing_persons(queryset, query):
+    """
+    Filter ``queryset`` down to rows matching ``query`` and annotate each
+    with a ``search_rank`` (higher is better). Every token is prefix
+    matched so partially typed words still hit.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none().annotate(search_rank=Value(0.0))
+
+    if is_postgres():
+        search_query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens),
+            search_type="raw",
+            config="simple",
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F("search_vector"), search_query)
+        )
+
+    match = " AND ".join(f'"{token}"*' for token in tokens)
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    table = queryset.model._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        )
+    ).annotate(
+        # bm25() is lower-is-better, flip it so both backends sort descending
+        search_rank=RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id",
+            [match],
+        )
+    )
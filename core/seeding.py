@@ -0,0 +1,290 @@
+import io
+import random
+from datetime import datetime, time, timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+from PIL import Image, ImageDraw
+
+from .cache import invalidate_person_pages
+from .fuzzy import (
+    contact_name_index,
+    contact_phonetic_index,
+    person_name_index,
+    person_phonetic_index,
+)
+from .images import generate_renditions
+from .imports import SlugAllocator
+from .models import (
+    MissingPerson,
+    MissingPersonContact,
+    MissingPersonPhoto,
+    PhotoStatus,
+    Status,
+    Ward,
+)
+from .search import index_missing_persons
+from .utils import phonetic_key
+
+SEED_BATCH_SIZE = 5000
+
+# Faker is slow next to everything else here, so names and descriptions are
+# drawn from pools generated once (2000 x 2000 names is plenty of variety)
+NAME_POOL_SIZE = 2000
+DESCRIPTION_POOL_SIZE = 500
+
+# roughly the mix of open and resolved cases in production
+STATUS_WEIGHTS = {
+    Status.MISSING: 70,
+    Status.FOUND_PENDING: 10,
+    Status.FOUND_CONFIRMED: 20,
+}
+
+LANDMARKS = [
+    "Bus stage",
+    "Market",
+    "Matatu terminus",
+    "Primary school",
+    "Shopping centre",
+    "Hospital",
+    "Church",
+    "Mosque",
+    "Police station",
+    "Petrol station",
+    "Chief's camp",
+    "Railway station",
+]
+
+# shared by every seeded photo, see seed_placeholder_photos
+PLACEHOLDER_DIR = "missing_person_photos/seed"
+PLACEHOLDER_COUNT = 24
+
+
+class Pools:
+    def __init__(self, seed):
+        fake = Faker("sw")
+        fake.seed_instance(seed)
+        self.first_names = [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(NAME_POOL_SIZE)]
+        self.descriptions = [
+            fake.paragraph(nb_sentences=4) for _ in range(DESCRIPTION_POOL_SIZE)
+        ]
+        self.email_domains = [fake.free_email_domain() for _ in range(20)]
+        self.wards = list(
+            Ward.objects.values_list(
+                "id",
+                "name",
+                "constituency_id",
+                "constituency__name",
+                "constituency__county_id",
+                "constituency__county__name",
+            )
+        )
+        self.statuses = list(STATUS_WEIGHTS)
+        self.status_weights = list(STATUS_WEIGHTS.values())
+        self.phonetic = {}
+
+    def phonetic_key(self, name):
+        # the pools repeat, so most keys have been worked out before
+        key = self.phonetic.get(name)
+        if key is None:
+            key = self.phonetic[name] = phonetic_key(name)
+        return key
+
+
+def seeded_case(rng, pools, placeholders, reported_at):
+    """
+    An unsaved ``(person, contact, photo)``, the photo being None unless
+    there are ``placeholders`` to pick from.
+    """
+    first, last = rng.choice(pools.first_names), rng.choice(pools.last_names)
+    name = f"{first} {last}"
+    (
+        ward_id,
+        ward,
+        constituency_id,
+        constituency,
+        county_id,
+        county,
+    ) = rng.choice(pools.wards)
+    person = MissingPerson(
+        name=name,
+        name_phonetic=pools.phonetic_key(name),
+        gender=rng.choice("MF"),
+        age=min(int(rng.expovariate(1 / 25)), 100),
+        last_seen_location=f"{rng.choice(LANDMARKS)}, {ward.title()}",
+        description=rng.choice(pools.descriptions),
+        county=county,
+        sub_county=constituency,
+        ward=ward,
+        region_county_id=county_id,
+        region_constituency_id=constituency_id,
+        region_ward_id=ward_id,
+        status=rng.choices(pools.statuses, pools.status_weights)[0],
+    )
+    if person.status != Status.MISSING:
+        person.date_found = min(
+            reported_at + timedelta(days=rng.expovariate(1 / 10)), timezone.now()
+        )
+    photo = None
+    if placeholders:
+        file_name, renditions = rng.choice(placeholders)
+        person.photo_count = 1
+        photo = MissingPersonPhoto(
+            photo=file_name,
+            renditions=renditions,
+            is_primary=True,
+            status=PhotoStatus.READY,
+            alternative_text=f"Photo of {name}",
+            # random rather than the placeholders' own, so photo search sees
+            # hashes spread out like real photos'
+            **MissingPersonPhoto.hash_fields(rng.getrandbits(64)),
+        )
+
+    contact_first, contact_last = (
+        rng.choice(pools.first_names),
+        rng.choice(pools.last_names),
+    )
+    contact_name = f"{contact_first} {contact_last}"
+    contact = MissingPersonContact(
+        name=contact_name,
+        name_phonetic=pools.phonetic_key(contact_name),
+        # the format format_phone_number produces
+        phone_number=f"+254 7{rng.randrange(10, 100)} {rng.randrange(10**6):06d}",
+        email=(
+            f"{contact_first}.{contact_last}@{rng.choice(pools.email_domains)}".lower()
+            if rng.random() < 0.5
+            else ""
+        ),
+    )
+    return person, contact, photo
+
+
+def placeholder_image(rng, number):
+    # a flat coloured "photo" with a silhouette, enough to exercise renditions
+    image = Image.new(
+        "RGB", (900, 1200), tuple(rng.randrange(80, 200) for _ in range(3))
+    )
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((300, 220, 600, 560), fill=(235, 225, 210))
+    draw.rounded_rectangle((180, 620, 720, 1200), radius=160, fill=(40, 60, 90))
+    draw.text((40, 40), f"Sample photo {number}", fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def seed_placeholder_photos(rng):
+    """
+    Store ``PLACEHOLDER_COUNT`` generated images and their renditions and
+    return ``(name, renditions)`` for each. Seeded photo rows all point at
+    these files, so deleting one through the site removes it for everyone.
+    """
+    placeholders = []
+    for number in range(1, PLACEHOLDER_COUNT + 1):
+        name = f"{PLACEHOLDER_DIR}/placeholder-{number:02d}.jpg"
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        name = default_storage.save(name, ContentFile(placeholder_image(rng, number)))
+        photo = MissingPersonPhoto(photo=name)
+        placeholders.append((name, generate_renditions(photo)))
+    return placeholders
+
+
+def report_moment(position, count, days):
+    """
+    When the ``position``-th of ``count`` seeded cases was reported, spread
+    evenly over the last ``days`` days with the oldest first, like real ids.
+    A day's cases share one time so backdating is a query per day.
+    """
+    day = timezone.localdate() - timedelta(days=days - 1 - position * days // count)
+    hour = 6 + day.toordinal() * 7 % 16
+    return min(timezone.make_aware(datetime.combine(day, time(hour))), timezone.now())
+
+
+def backdate(persons, moments):
+    # auto_now_add overwrites created_at on insert, so set it afterwards
+    # with one UPDATE per run of ids sharing a moment
+    start = 0
+    while start < len(persons):
+        stop = start + 1
+        while stop < len(persons) and moments[stop] == moments[start]:
+            stop += 1
+        MissingPerson.objects.filter(
+            pk__gte=persons[start].pk, pk__lte=persons[stop - 1].pk
+        ).update(created_at=moments[start], updated_at=moments[start])
+        start = stop
+
+
+@transaction.atomic
+def insert_seed_batch(cases, moments, slugs):
+    persons = [person for person, _, _ in cases]
+    contacts = [contact for _, contact, _ in cases]
+
+    slugs.assign(persons)
+
+    photos = [photo for _, _, photo in cases if photo is not None]
+    if photos:
+        MissingPersonPhoto.objects.bulk_create(photos)
+        for person, _, photo in cases:
+            person.primary_photo_id = photo.pk
+
+    MissingPerson.objects.bulk_create(persons)
+    MissingPersonContact.objects.bulk_create(contacts)
+
+    Contacts = MissingPerson.contacts.through
+    Contacts.objects.bulk_create(
+        Contacts(missingperson_id=person.pk, missingpersoncontact_id=contact.pk)
+        for person, contact, _ in cases
+    )
+    if photos:
+        Photos = MissingPerson.photos.through
+        Photos.objects.bulk_create(
+            Photos(missingperson_id=person.pk, missingpersonphoto_id=photo.pk)
+            for person, _, photo in cases
+        )
+    backdate(persons, moments)
+
+
+def seed_cases(
+    count, photos=False, seed=None, days=3 * 365, batch_size=SEED_BATCH_SIZE
+):
+    """
+    Insert ``count`` made up cases (each with a contact, and a photo if
+    ``photos``) reported over the last ``days`` days, yielding the running
+    total after each batch. The same ``seed`` gives the same cases. Signals
+    are skipped, everything derived from the cases is rebuilt at the end.
+    """
+    from console.rollups import rebuild_rollups
+    from console.stats import refresh_case_statistics
+
+    rng = random.Random(seed)
+    pools = Pools(seed)
+    if not pools.wards:
+        raise ValueError("Load the geography tables first (manage.py load_geography)")
+    placeholders = seed_placeholder_photos(rng) if photos else []
+
+    slugs = SlugAllocator()
+    inserted = 0
+    while inserted < count:
+        size = min(batch_size, count - inserted)
+        moments = [report_moment(inserted + i, count, days) for i in range(size)]
+        cases = [seeded_case(rng, pools, placeholders, moment) for moment in moments]
+        insert_seed_batch(cases, moments, slugs)
+        inserted += size
+        yield inserted
+
+    index_missing_persons()
+    rebuild_rollups()
+    refresh_case_statistics()
+    for index in (
+        person_name_index,
+        person_phonetic_index,
+        contact_name_index,
+        contact_phonetic_index,
+    ):
+        index.clear()
+    invalidate_person_pages([])
@@ -0,0 +1,223 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from django.utils import timezone
+
+from .cache import invalidate_person_pages
+from .fuzzy import (
+    contact_name_index,
+    contact_phonetic_index,
+    person_name_index,
+    person_phonetic_index,
+)
+from .images import FORMATS
+from .jobs import enqueue
+from .models import (
+    MissingPerson,
+    MissingPersonContact,
+    MissingPersonPhoto,
+    PhotoStatus,
+)
+from .search import index_missing_persons, remove_from_index
+
+# sent by the bulk import (core.imports) for each batch of ``persons`` and
+# their ``contacts``, which bulk_create inserts without any post_save
+cases_imported = Signal()
+
+# fields of a missing person's stored row that post_save handlers compare
+# the new values against, added to with remember_previous()
+REMEMBERED_FIELDS = set()
+
+
+def remember_previous(*fields):
+    REMEMBERED_FIELDS.update(fields)
+
+
+@receiver(pre_save, sender=MissingPerson)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    # one query for everyone, None for new rows
+    instance._previous_values = None
+    if raw or instance._state.adding or instance.pk is None or not REMEMBERED_FIELDS:
+        return
+    instance._previous_values = (
+        sender.objects.filter(pk=instance.pk).values(*REMEMBERED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=MissingPerson)
+def update_search_document(sender, instance, raw=False, **kwargs):
+    # fixtures are loaded raw, run `manage.py rebuild_search_index` after them
+    if raw:
+        return
+    index_missing_persons([instance.pk])
+
+
+@receiver(post_delete, sender=MissingPerson)
+def remove_search_document(sender, instance, **kwargs):
+    remove_from_index([instance.pk])
+
+
+@receiver(post_save, sender=MissingPerson)
+@receiver(post_delete, sender=MissingPerson)
+def invalidate_person_cache(sender, instance, **kwargs):
+    invalidate_person_pages([instance.slug])
+
+
+@receiver(post_save, sender=MissingPerson)
+def update_person_ngram_index(sender, instance, **kwargs):
+    person_name_index.update(instance.pk, instance.name)
+    person_phonetic_index.update(instance.pk, instance.name_phonetic)
+
+
+@receiver(post_delete, sender=MissingPerson)
+def remove_person_ngram_index(sender, instance, **kwargs):
+    person_name_index.remove(instance.pk)
+    person_phonetic_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=MissingPersonContact)
+def update_contact_ngram_index(sender, instance, **kwargs):
+    contact_name_index.update(instance.pk, instance.name)
+    contact_phonetic_index.update(instance.pk, instance.name_phonetic)
+
+
+@receiver(post_delete, sender=MissingPersonContact)
+def remove_contact_ngram_index(sender, instance, **kwargs):
+    contact_name_index.remove(instance.pk)
+    contact_phonetic_index.remove(instance.pk)
+
+
+def refresh_photo_summaries(person_ids):
+    persons = list(MissingPerson.objects.filter(pk__in=person_ids))
+    for person in persons:
+        person.refresh_photo_summary()
+    invalidate_person_pages([person.slug for person in persons])
+
+
+@receiver(m2m_changed, sender=MissingPerson.photos.through)
+def sync_photo_summary(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # photo.missingperson_set.clear(), remember who loses the photo
+        instance._photo_person_ids = list(
+            instance.missingperson_set.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        instance.refresh_photo_summary()
+        invalidate_person_pages([instance.slug])
+    elif action == "post_clear":
+        refresh_photo_summaries(getattr(instance, "_photo_person_ids", ()))
+    else:
+        refresh_photo_summaries(pk_set or ())
+
+
+@receiver(post_save, sender=MissingPersonPhoto)
+def sync_primary_photo(sender, instance, created, raw=False, **kwargs):
+    # a new photo isn't attached to anyone yet, m2m_changed covers that
+    if raw or created:
+        return
+    refresh_photo_summaries(instance.missingperson_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=MissingPersonPhoto)
+def remember_photo_owners(sender, instance, **kwargs):
+    instance._photo_person_ids = list(
+        instance.missingperson_set.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=MissingPersonPhoto)
+def sync_deleted_photo(sender, instance, **kwargs):
+    refresh_photo_summaries(getattr(instance, "_photo_person_ids", ()))
+
+
+@receiver(post_save, sender=MissingPersonPhoto)
+def queue_photo_renditions(sender, instance, raw=False, **kwargs):
+    if raw or not instance.photo or instance.renditions:
+        return
+    if instance.status != PhotoStatus.READY:
+        return  # the ingest_photo job generates them itself
+    enqueue("generate_photo_renditions", photo_id=instance.pk)
+
+
+@receiver(post_delete, sender=MissingPersonPhoto)
+def queue_photo_file_cleanup(sender, instance, **kwargs):
+    names = [
+        entry[extension]
+        for entry in instance.renditions.values()
+        for extension in FORMATS
+        if entry.get(extension)
+    ]
+    if instance.photo:
+        names.append(instance.photo.name)
+    if names:
+        enqueue("delete_files", storage_names=names)
+
+
+def touch_contact_owners(person_ids):
+    """
+    Contacts are shown on the detail page, bump their persons' updated_at
+    so cached fragments keyed on it are rebuilt, and drop cached pages.
+    """
+    persons = MissingPerson.objects.filter(pk__in=person_ids)
+    slugs = list(persons.values_list("slug", flat=True))
+    persons.update(updated_at=timezone.now())
+    invalidate_person_pages(slugs)
+
+
+@receiver(post_save, sender=MissingPersonContact)
+def sync_contact_owners(sender, instance, created, raw=False, **kwargs):
+    # a new contact isn't attached to anyone yet, m2m_changed covers that
+    if raw or created:
+        return
+    touch_contact_owners(instance.missingperson_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=MissingPersonContact)
+def remember_contact_owners(sender, instance, **kwargs):
+    instance._contact_person_ids = list(
+        instance.missingperson_set.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=MissingPersonContact)
+def sync_deleted_contact(sender, instance, **kwargs):
+    touch_contact_owners(getattr(instance, "_contact_person_ids", ()))
+
+
+@receiver(m2m_changed, sender=MissingPerson.contacts.through)
+def sync_contact_list(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        instance._contact_person_ids = list(
+            instance.missingperson_set.values_list("pk", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        touch_contact_owners([instance.pk])
+    elif action == "post_clear":
+        touch_contact_owners(getattr(instance, "_contact_person_ids", ()))
+    else:
+        touch_contact_owners(pk_set or ())
+
+
+@receiver(cases_imported)
+def index_imported_cases(sender, persons, contacts, **kwargs):
+    index_missing_persons([person.pk for person in persons])
+    for person in persons:
+        person_name_index.update(person.pk, person.name)
+        person_phonetic_index.update(person.pk, person.name_phonetic)
+    for contact in contacts:
+        contact_name_index.update(contact.pk, contact.name)
+        contact_phonetic_index.update(contact.pk, contact.name_phonetic)
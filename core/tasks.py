@@ -0,0 +1,59 @@
+from .images import generate_renditions, open_photo, perceptual_hash
+from .jobs import task
+from .models import MissingPersonPhoto, PhotoStatus
+
+
+@task("ingest_photo")
+def ingest_photo(photo_id):
+    """
+    Generate the renditions and perceptual hash of a photo submitted with
+    a report and mark it ready. The original is already in storage (see core.uploads).
+    """
+    photo = MissingPersonPhoto.objects.filter(pk=photo_id).first()
+    if photo is None:
+        return  # report was deleted before we got to it
+
+    if not photo.photo or not photo.photo.storage.exists(photo.photo.name):
+        MissingPersonPhoto.objects.filter(pk=photo_id).update(status=PhotoStatus.FAILED)
+        return
+
+    source = open_photo(photo)
+    photo.renditions = generate_renditions(photo, source)
+    for field, value in photo.hash_fields(perceptual_hash(source)).items():
+        setattr(photo, field, value)
+    photo.status = PhotoStatus.READY
+    # saving a ready photo refreshes its owners' primary photo (core.signals)
+    photo.save()
+
+
+def ingest_photo_failed(photo_id):
+    MissingPersonPhoto.objects.filter(pk=photo_id).update(status=PhotoStatus.FAILED)
+
+
+ingest_photo.on_failure = ingest_photo_failed
+
+
+@task("generate_photo_renditions")
+def generate_photo_renditions(photo_id):
+    photo = MissingPersonPhoto.objects.filter(pk=photo_id).first()
+    if photo is None or not photo.photo:
+        return
+    source = open_photo(photo)
+    photo.renditions = generate_renditions(photo, source)
+    hash_fields = photo.hash_fields(perceptual_hash(source))
+    for field, value in hash_fields.items():
+        setattr(photo, field, value)
+    # saved rather than updated so updated_at moves and the owners' cached
+    # pages are dropped (core.signals), without touching fields edited since
+    photo.save(update_fields=["renditions", "updated_at", *hash_fields])
+
+
+@task("delete_files")
+def delete_files(storage_names):
+    """
+    Remove files left behind by a deleted photo from the default storage.
+    """
+    from django.core.files.storage import default_storage
+
+    for name in storage_names:
+        default_storage.delete(name)
@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_photo(
+    photo, rendition="card", sizes="100vw", alt="", css_class="", **attrs
+):
+    """
+    Render ``photo`` as a ``<picture>`` with WebP and JPEG srcsets so the
+    browser downloads the smallest rendition that fits.
+
+    Usage: {% responsive_photo photo "card" sizes="(min-width: 992px) 33vw, 100vw" alt=person.name %}
+    """
+    extra = format_html(
+        "".join(f' {key.replace("_", "-")}="{{}}"' for key in attrs), *attrs.values()
+    )
+    if not photo.renditions:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="lazy"{}>',
+            photo.photo.url,
+            alt,
+            css_class,
+            extra,
+        )
+
+    entry = photo.renditions.get(rendition, {})
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" '
+        'class="{}" loading="lazy" decoding="async"{}></picture>',
+        photo.srcset("webp"),
+        sizes,
+        photo.rendition_url(rendition),
+        photo.srcset("jpeg"),
+        sizes,
+        entry.get("width", ""),
+        entry.get("height", ""),
+        alt,
+        css_class,
+        extra,
+    )
@@ -1,3 +1,643 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections, router, transaction
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from . import imports, jobs, ratelimit, uploads
+from .checks import check_page_cache
+from .fuzzy import person_name_index, person_phonetic_index
+from .images import HASH_BITS, HASH_PARTS, PART_BITS, perceptual_hash, split_hash
+from .middleware import ReplicaRoutingMiddleware
+from .models import (
+    County,
+    Job,
+    JobStatus,
+    MissingPerson,
+    MissingPersonPhoto,
+    PhotoStatus,
+    StagedUpload,
+)
+from .pagination import CursorPaginator
+from .photo_search import MAX_DISTANCE, hamming_distance, lookalike_photos
+from .routers import PIN_COOKIE, REPLICA, read_from_replica
+
+# pages use {% static %}, which needs collectstatic's manifest otherwise
+PAGE_STORAGES = {
+    **settings.STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def create_person(**fields):
+    return MissingPerson.objects.create(
+        **{
+            "name": "Jane Wanjiru",
+            "gender": "F",
+            "age": 30,
+            "last_seen_location": "Nairobi",
+            "description": "Last seen near the market",
+            **fields,
+        }
+    )
+
+
+@override_settings(STORAGES=PAGE_STORAGES)
+class PageTestCase(TestCase):
+    def setUp(self):
+        # cached pages and the in-process name index outlive a test's rollback
+        cache.clear()
+        person_name_index.clear()
+        person_phonetic_index.clear()
+
+
+class FuzzySearchTests(PageTestCase):
+    def search(self, query):
+        return self.client.get(
+            reverse("core:all_missing_persons"), {"q": query, "fuzzy": "1"}
+        )
+
+    def test_finds_misspelled_name(self):
+        create_person(name="Wanjiku Kamau")
+        create_person(name="Otieno Odhiambo")
+        response = self.search("Wanjku Kamau")
+        self.assertContains(response, "Wanjiku Kamau")
+        self.assertNotContains(response, "Otieno Odhiambo")
+
+    def test_punctuation_only_query(self):
+        create_person(name="Wanjiku Kamau")
+        response = self.search("!!!")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Wanjiku Kamau")
+
+
+# the counties the tests add, the migrations load the real ones
+TEST_COUNTIES = {"code__gt": 900}
+
+
+@read_from_replica
+def county_names(request):
+    names = County.objects.filter(**TEST_COUNTIES).values_list("name", flat=True)
+    return HttpResponse(",".join(names.order_by("code")))
+
+
+@read_from_replica
+async def async_county_names(request):
+    names = County.objects.filter(**TEST_COUNTIES).values_list("name", flat=True)
+    return HttpResponse(",".join([name async for name in names.order_by("code")]))
+
+
+def add_county(request):
+    County.objects.create(code=903, name="Added")
+    return HttpResponse()
+
+
+def use_database(alias, database):
+    if alias in settings.DATABASES:
+        connections[alias].close()
+        del connections[alias]
+    if database is None:
+        settings.DATABASES.pop(alias, None)
+    else:
+        settings.DATABASES[alias] = database
+
+
+@skipUnless(connection.vendor == "sqlite", "copies the database with VACUUM INTO")
+@override_settings(REPLICA_LAG_CHECK_INTERVAL=0)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The replica is a second SQLite file copied from the test database, so
+    rows written after the copy are only on the primary, as if the replica
+    hadn't caught up with them yet.
+    """
+
+    # the replica is only added in setUpClass
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        # in place before the test case checks its databases
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.previous_replica = settings.DATABASES.get(REPLICA)
+        cls.replica_path = os.path.join(cls.directory.name, "replica.sqlite3")
+        use_database(REPLICA, cls.replica_settings(cls.replica_path))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        use_database(REPLICA, cls.previous_replica)
+        cls.directory.cleanup()
+
+    @staticmethod
+    def replica_settings(path):
+        return {**settings.DATABASES[DEFAULT_DB_ALIAS], "NAME": path}
+
+    def setUp(self):
+        County.objects.create(code=901, name="Copied")
+        connections[REPLICA].close()
+        if os.path.exists(self.replica_path):
+            os.remove(self.replica_path)
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM INTO %s", [self.replica_path])
+        County.objects.create(code=902, name="Primary only")
+
+        self.factory = RequestFactory()
+
+    def point_replica_at(self, path):
+        use_database(REPLICA, self.replica_settings(path))
+        self.addCleanup(use_database, REPLICA, self.replica_settings(self.replica_path))
+
+    def get(self, view, request):
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_get_reads_from_replica(self):
+        response = self.get(county_names, self.factory.get("/"))
+        self.assertEqual(response.content, b"Copied")
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    async def test_async_get_reads_from_replica(self):
+        response = await self.get(async_county_names, self.factory.get("/"))
+        self.assertEqual(response.content, b"Copied")
+
+    def test_post_reads_from_primary(self):
+        response = self.get(county_names, self.factory.post("/"))
+        self.assertEqual(response.content, b"Copied,Primary only")
+
+    def test_write_pins_visitor_to_primary(self):
+        response = self.get(add_county, self.factory.post("/"))
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.REPLICA_PIN_SECONDS)
+        self.assertTrue(cookie["httponly"])
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = cookie.value
+        response = self.get(county_names, request)
+        self.assertEqual(response.content, b"Copied,Primary only,Added")
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        self.point_replica_at(
+            os.path.join(self.directory.name, "missing", "replica.sqlite3")
+        )
+        with self.assertLogs("core.routers", "WARNING"):
+            response = self.get(county_names, self.factory.get("/"))
+        self.assertEqual(response.content, b"Copied,Primary only")
+
+    def test_migrate_skips_replica(self):
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, "core"))
+        self.assertFalse(router.allow_migrate(REPLICA, "core"))
+
+        self.point_replica_at(os.path.join(self.directory.name, "empty.sqlite3"))
+        call_command("migrate", database=REPLICA, verbosity=0)
+        tables = connections[REPLICA].introspection.table_names()
+        self.assertNotIn(County._meta.db_table, tables)
+
+
+class ConditionalGetTests(PageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.person = create_person(name="Wanjiku Kamau")
+
+    def revalidate(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        return etag
+
+    def test_listing_not_modified(self):
+        self.revalidate(reverse("core:all_missing_persons"))
+
+    def test_listing_changes_after_write_elsewhere(self):
+        url = reverse("core:all_missing_persons")
+        etag = self.revalidate(url)
+        # an update() skips the signals, like a write from another process
+        # whose cache this one can't see
+        MissingPerson.objects.filter(pk=self.person.pk).update(
+            updated_at=timezone.now()
+        )
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_listing_changes_when_case_leaves(self):
+        url = reverse("core:all_missing_persons")
+        create_person(name="Otieno Odhiambo")
+        etag = self.revalidate(url)
+        MissingPerson.objects.filter(pk=self.person.pk).update(status="found_pending")
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_not_modified_until_saved(self):
+        url = reverse("core:missing_person_detail", args=[self.person.slug])
+        etag = self.revalidate(url)
+        self.person.description = "Seen in Thika"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.person.save()
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertContains(response, "Seen in Thika")
+
+
+class PageCacheTests(PageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.person = create_person(name="Wanjiku Kamau")
+        self.url = reverse("core:missing_person_detail", args=[self.person.slug])
+
+    def rename_elsewhere(self):
+        # update() skips the signals, so nothing drops the cached page
+        MissingPerson.objects.filter(pk=self.person.pk).update(name="Akinyi Otieno")
+
+    def test_off_with_per_process_cache(self):
+        self.client.get(self.url)
+        self.rename_elsewhere()
+        self.assertContains(self.client.get(self.url), "Akinyi Otieno")
+        self.assertEqual(check_page_cache(None), [])
+
+    @override_settings(PAGE_CACHE_TIMEOUT=600)
+    def test_per_process_cache_fails_check(self):
+        errors = check_page_cache(None)
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+
+    def test_save_drops_cached_page(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        shared = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory.name,
+            }
+        }
+        with self.settings(CACHES=shared, PAGE_CACHE_TIMEOUT=600):
+            self.assertEqual(check_page_cache(None), [])
+            self.client.get(self.url)
+            self.rename_elsewhere()
+            self.assertContains(self.client.get(self.url), "Wanjiku Kamau")
+
+            self.person.refresh_from_db()
+            self.person.description = "Seen in Thika"
+            with self.captureOnCommitCallbacks(execute=True):
+                self.person.save()
+            self.assertContains(self.client.get(self.url), "Seen in Thika")
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        tasks = {"record": self.record_task, "fail": self.fail_task}
+        patcher = mock.patch.dict(jobs.TASKS, tasks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record_task(self, **payload):
+        self.calls.append(payload)
+
+    def fail_task(self, **payload):
+        raise ValueError("broken")
+
+    def test_claims_due_jobs_in_order(self):
+        later = jobs.enqueue("record", delay=60, value=3)
+        second = jobs.enqueue("record", value=2)
+        first = jobs.enqueue("record", value=1)
+        Job.objects.filter(pk=first.pk).update(
+            run_after=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(jobs.claim_job().pk, first.pk)
+        claimed = jobs.claim_job()
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(jobs.claim_job())
+        self.assertEqual(Job.objects.get(pk=later.pk).status, JobStatus.QUEUED)
+
+    def test_reclaims_stale_running_job(self):
+        job = jobs.enqueue("record")
+        jobs.claim_job()
+        self.assertIsNone(jobs.claim_job())
+        stale = timezone.now() - timedelta(seconds=jobs.STALE_AFTER + 1)
+        Job.objects.filter(pk=job.pk).update(locked_at=stale)
+        self.assertEqual(jobs.claim_job().attempts, 2)
+
+    def test_runs_payload(self):
+        jobs.enqueue("record", value=1)
+        self.assertEqual(jobs.run_pending_jobs(), 1)
+        self.assertEqual(self.calls, [{"value": 1}])
+        self.assertEqual(Job.objects.get().status, JobStatus.DONE)
+
+    def test_retries_with_backoff_then_fails(self):
+        job = jobs.enqueue("fail", max_attempts=2)
+        with self.assertLogs("core.jobs", "WARNING"):
+            jobs.run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertIn("broken", job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("core.jobs", "ERROR"):
+            jobs.run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+
+    def test_prune_keeps_recent_and_failed(self):
+        old = timezone.now() - timedelta(days=10)
+        for status in (JobStatus.DONE, JobStatus.FAILED, JobStatus.QUEUED):
+            Job.objects.create(name="record", status=status)
+        Job.objects.update(updated_at=old)
+        Job.objects.create(name="record", status=JobStatus.DONE)
+
+        self.assertEqual(jobs.prune_jobs(days=7, failed_days=30), 1)
+        self.assertFalse(
+            Job.objects.filter(status=JobStatus.DONE, updated_at=old).exists()
+        )
+        self.assertEqual(Job.objects.count(), 3)
+
+
+def gradient(size, flip=False):
+    image = Image.linear_gradient("L").resize(size)
+    if flip:
+        image = image.transpose(Image.Transpose.ROTATE_90)
+    # some detail so the rows don't all hash alike
+    ImageDraw.Draw(image).ellipse(
+        [size[0] // 4, size[1] // 4, size[0] // 2, size[1] // 2], fill=255
+    )
+    return image
+
+
+def jpeg_copy(image, size, quality):
+    buffer = io.BytesIO()
+    image.resize(size).save(buffer, "JPEG", quality=quality)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+class PerceptualHashTests(TestCase):
+    def test_resized_copy_hashes_close(self):
+        image = gradient((640, 480))
+        value = perceptual_hash(image)
+        copy = perceptual_hash(jpeg_copy(image, (200, 150), quality=40))
+        self.assertLessEqual(hamming_distance(value, copy), 4)
+
+    def test_different_images_hash_apart(self):
+        value = perceptual_hash(gradient((640, 480)))
+        other = perceptual_hash(gradient((640, 480), flip=True))
+        self.assertGreater(hamming_distance(value, other), MAX_DISTANCE)
+
+    def test_split_hash_round_trips(self):
+        value = 0xF00D_CAFE_1234_8001
+        parts = split_hash(value)
+        self.assertEqual(len(parts), HASH_PARTS)
+        joined = 0
+        for part in parts:
+            joined = joined << PART_BITS | part
+        self.assertEqual(joined, value)
+
+
+class LookalikeSearchTests(TestCase):
+    def add_photo(self, value):
+        return MissingPersonPhoto.objects.create(
+            photo="missing_persons/test.jpg",
+            status=PhotoStatus.READY,
+            **MissingPersonPhoto.hash_fields(value),
+        )
+
+    def test_finds_every_hash_within_distance(self):
+        rng = random.Random(25)
+        query = rng.getrandbits(HASH_BITS)
+        expected = {}
+        for distance in range(MAX_DISTANCE + 4):
+            bits = rng.sample(range(HASH_BITS), distance)
+            value = query
+            for bit in bits:
+                value ^= 1 << bit
+            photo = self.add_photo(value)
+            if distance <= MAX_DISTANCE:
+                expected[photo.pk] = distance
+        # the multi-index lookup misses nothing a full scan would find
+        self.assertEqual(lookalike_photos(query), expected)
+
+    def test_skips_photos_not_ready(self):
+        photo = self.add_photo(0)
+        MissingPersonPhoto.objects.filter(pk=photo.pk).update(
+            status=PhotoStatus.PENDING
+        )
+        self.assertEqual(lookalike_photos(0), {})
+
+
+class ClientIpTests(TestCase):
+    def request(self, forwarded=None):
+        headers = {"REMOTE_ADDR": "10.0.0.1"}
+        if forwarded is not None:
+            headers["HTTP_X_FORWARDED_FOR"] = forwarded
+        return RequestFactory().get("/", **headers)
+
+    def test_remote_addr_without_proxies(self):
+        request = self.request("203.0.113.9")
+        self.assertEqual(ratelimit.client_ip(request), "10.0.0.1")
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_forwarded_behind_proxy(self):
+        request = self.request("198.51.100.7, 203.0.113.9")
+        # the first entry came from the client and could say anything
+        self.assertEqual(ratelimit.client_ip(request), "203.0.113.9")
+
+    @override_settings(TRUSTED_PROXY_COUNT=2)
+    def test_forwarded_behind_two_proxies(self):
+        request = self.request("198.51.100.7, 203.0.113.9, 10.0.0.2")
+        self.assertEqual(ratelimit.client_ip(request), "203.0.113.9")
+
+    @override_settings(TRUSTED_PROXY_COUNT=1)
+    def test_missing_header_falls_back(self):
+        self.assertEqual(ratelimit.client_ip(self.request()), "10.0.0.1")
+
+
+@override_settings(PHOTO_SEARCH_RATE_LIMIT=1, TRUSTED_PROXY_COUNT=1)
+class PhotoSearchRateLimitTests(PageTestCase):
+    def search(self, address):
+        return self.client.post(
+            reverse("core:photo_search"), headers={"X-Forwarded-For": address}
+        )
+
+    def test_limits_each_forwarded_address(self):
+        self.assertEqual(self.search("203.0.113.9").status_code, 200)
+        self.assertEqual(self.search("203.0.113.9").status_code, 429)
+        self.assertEqual(self.search("203.0.113.10").status_code, 200)
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        # pairs of cases reported at the same moment, told apart by id
+        now = timezone.now()
+        for i in range(7):
+            person = create_person(name=f"Case {i}")
+            MissingPerson.objects.filter(pk=person.pk).update(
+                created_at=now - timedelta(minutes=i // 2)
+            )
+        self.persons = MissingPerson.objects.all()
+        self.expected = list(self.persons.order_by("-created_at", "-id"))
+        self.paginator = CursorPaginator(self.persons, 3)
+
+    def test_pages_forward_and_back(self):
+        pages = [self.paginator.page()]
+        while pages[-1].has_next:
+            pages.append(self.paginator.page(pages[-1].next_cursor))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([row for page in pages for row in page], self.expected)
+        self.assertFalse(pages[0].has_previous)
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator.page(page.previous_cursor)
+            self.assertEqual(list(page), list(expected))
+        self.assertFalse(page.has_previous)
+
+    def test_values_rows(self):
+        paginator = CursorPaginator(self.persons.values("id", "created_at"), 3)
+        page = paginator.page(paginator.page().next_cursor)
+        self.assertEqual(
+            [row["id"] for row in page], [person.id for person in self.expected[3:6]]
+        )
+
+    def test_tampered_cursor_starts_over(self):
+        cursor = self.paginator.page().next_cursor
+        for bad in (cursor[:-2] + "xx", "garbage", ""):
+            page = self.paginator.page(bad)
+            self.assertEqual(list(page), self.expected[:3])
+
+    def test_cursor_for_other_ordering_starts_over(self):
+        cursor = CursorPaginator(self.persons, 3, ("-id",)).page().next_cursor
+        self.assertEqual(list(self.paginator.page(cursor)), self.expected[:3])
+
+
+def photo_file(name="photo.jpg"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class StagedUploadTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = self.settings(MEDIA_ROOT=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_promote_adopts_files(self):
+        first = uploads.stage_upload(photo_file(), description="At the market")
+        second = uploads.stage_upload(photo_file("side.jpg"))
+        person = create_person()
+        with transaction.atomic():
+            photos = uploads.promote_staged_uploads([first.pk, second.pk], person)
+
+        self.assertEqual(
+            [photo.photo.name for photo in photos],
+            [first.file.name, second.file.name],
+        )
+        self.assertTrue(default_storage.exists(first.file.name))
+        self.assertEqual([photo.is_primary for photo in photos], [True, False])
+        self.assertEqual(photos[0].description, "At the market")
+        self.assertEqual(set(person.photos.all()), set(photos))
+        self.assertFalse(StagedUpload.objects.exists())
+        self.assertEqual(
+            sorted(job.payload["photo_id"] for job in Job.objects.all()),
+            sorted(photo.pk for photo in photos),
+        )
+
+    def test_promote_nothing(self):
+        with transaction.atomic():
+            self.assertEqual(uploads.promote_staged_uploads([0], create_person()), [])
+
+    def test_discard_removes_files(self):
+        upload = uploads.stage_upload(photo_file())
+        self.assertEqual(uploads.discard_staged_uploads([upload.pk]), 1)
+        self.assertFalse(default_storage.exists(upload.file.name))
+        self.assertFalse(StagedUpload.objects.exists())
+
+    def test_sweep_removes_abandoned_uploads(self):
+        old = uploads.stage_upload(photo_file())
+        recent = uploads.stage_upload(photo_file())
+        StagedUpload.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(hours=25)
+        )
+
+        self.assertEqual(uploads.sweep_staged_uploads(max_age=24), 1)
+        self.assertFalse(default_storage.exists(old.file.name))
+        self.assertTrue(default_storage.exists(recent.file.name))
+        self.assertEqual(list(StagedUpload.objects.all()), [recent])
+
+
+IMPORT_CSV = """Name,Gender,Age,Last Seen Location,Description,County,Contact Name,Contact Phone
+Wanjiku Kamau,female,30,Nairobi,Last seen at the market,Nairobi,Mary,0712345678
+Otieno Odhiambo,X,40,Kisumu,Left home,Kisumu,John,0712345678
+Akinyi Otieno,F,25,Kisumu,Went to school,Kisumu,Jane,12
+"""
+
+
+class ImportTests(TestCase):
+    def rows(self, text, name="cases.csv"):
+        return imports.read_rows(io.BytesIO(text.encode()), name)
+
+    def test_reports_bad_rows_by_line(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = imports.import_cases(self.rows(IMPORT_CSV), batch_size=1)
+        self.assertEqual((result.rows, result.created), (3, 1))
+        self.assertEqual([error.row for error in result.errors], [3, 4])
+        self.assertTrue(result.errors[0].messages[0].startswith("gender:"))
+        self.assertTrue(result.errors[1].messages[0].startswith("contact_phone:"))
+
+        person = MissingPerson.objects.get()
+        self.assertEqual((person.name, person.gender), ("Wanjiku Kamau", "F"))
+        self.assertEqual(person.contacts.get().name, "Mary")
+
+    def test_unknown_status(self):
+        records = [(1, {"name": "Wanjiku", "gender": "F", "status": "lost"})]
+        result = imports.import_cases(records)
+        self.assertEqual(result.created, 0)
+        self.assertIn("status: must be one of", result.errors[0].messages[-1])
+
+    def test_dry_run_writes_nothing(self):
+        result = imports.import_cases(self.rows(IMPORT_CSV), dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertFalse(MissingPerson.objects.exists())
+
+    def test_json_rows(self):
+        text = json.dumps([{"Name": "Wanjiku Kamau", "Gender": "F"}, "oops"])
+        rows = list(self.rows(text, "cases.json"))
+        self.assertEqual(rows, [(1, {"name": "Wanjiku Kamau", "gender": "F"}), (2, {})])
+
+    def test_unreadable_files(self):
+        for text, name in (("{}", "cases.json"), ("{", "cases.json"), ("", "a.xlsx")):
+            with self.assertRaises(ValueError):
+                list(self.rows(text, name))
+
+    def test_command_lists_errors(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(IMPORT_CSV)
+            file.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command(
+                "import_cases", file.name, "--dry-run", stdout=stdout, stderr=stderr
+            )
+        self.assertIn("Would import 1 of 3 cases, 2 rows had errors", stdout.getvalue())
+        self.assertIn("Row 3: gender:", stderr.getvalue())
@@ -0,0 +1,134 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .jobs import enqueue_many
+from .models import MissingPersonPhoto, PhotoStatus, StagedUpload
+
+# where the report wizard used to park uploads before StagedUpload existed
+LEGACY_TEMP_DIR = "temp_uploads"
+
+
+def stage_upload(uploaded_file, description="", alternative_text=""):
+    """
+    Store an uploaded photo at its final location. Django streams the
+    upload into storage chunk by chunk (uploads big enough to be spooled to
+    a temporary file are simply moved), so the bytes are written once.
+    """
+    upload = StagedUpload(
+        original_name=uploaded_file.name[:255],
+        description=description,
+        alternative_text=alternative_text,
+    )
+    upload.file.save(uploaded_file.name, uploaded_file, save=False)
+    upload.save()
+    return upload
+
+
+def discard_staged_uploads(upload_ids):
+    """
+    Delete staged uploads and their files, e.g. when the user goes back
+    and picks different photos.
+    """
+    uploads = list(StagedUpload.objects.filter(pk__in=upload_ids))
+    for upload in uploads:
+        upload.file.delete(save=False)
+    StagedUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()
+    return len(uploads)
+
+
+def promote_staged_uploads(upload_ids, missing_person):
+    """
+    Turn staged uploads into pending photos of ``missing_person`` and queue
+    their processing. The photo rows point at the already stored files,
+    nothing is copied. Must run inside the transaction creating the report
+    so the photos, jobs and removal of the staged rows commit together.
+    """
+    # locked so a concurrent sweep can't delete a file we are about to adopt
+    uploads = list(
+        StagedUpload.objects.select_for_update()
+        .filter(pk__in=upload_ids)
+        .order_by("id")
+    )
+    if not uploads:
+        return []
+
+    photos = MissingPersonPhoto.objects.bulk_create(
+        MissingPersonPhoto(
+            photo=upload.file.name,
+            description=upload.description,
+            alternative_text=upload.alternative_text,
+            is_primary=(i == 0),  # First photo is primary
+            status=PhotoStatus.PENDING,
+        )
+        for i, upload in enumerate(uploads)
+    )
+    missing_person.photos.add(*photos)
+    StagedUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()
+    enqueue_many("ingest_photo", [{"photo_id": photo.pk} for photo in photos])
+    return photos
+
+
+def sweep_staged_uploads(max_age=None):
+    """
+    Remove staged uploads older than ``max_age`` hours (defaults to
+    ``STAGED_UPLOAD_MAX_AGE``), left behind by abandoned report wizards,
+    along with anything still lying around in the old ``temp_uploads``
+    directory. Returns the number of files removed.
+    """
+    if max_age is None:
+        max_age = settings.STAGED_UPLOAD_MAX_AGE
+    cutoff = timezone.now() - timedelta(hours=max_age)
+
+    removed = 0
+    stale = StagedUpload.objects.filter(created_at__lt=cutoff)
+    for upload_ids in _batches(stale.values_list("pk", flat=True), 500):
+        with transaction.atomic():
+            # skip rows a report submission is promoting right now
+            uploads = list(
+                StagedUpload.objects.select_for_update(skip_locked=True).filter(
+                    pk__in=upload_ids
+                )
+            )
+            for upload in uploads:
+                upload.file.delete(save=False)
+            StagedUpload.objects.filter(
+                pk__in=[upload.pk for upload in uploads]
+            ).delete()
+        removed += len(uploads)
+
+    return removed + _sweep_legacy_temp_files(cutoff)
+
+
+def _batches(values, size):
+    batch = []
+    for value in values.iterator(chunk_size=size):
+        batch.append(value)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _sweep_legacy_temp_files(cutoff):
+    try:
+        _, files = default_storage.listdir(LEGACY_TEMP_DIR)
+    except (FileNotFoundError, NotImplementedError):
+        return 0
+
+    removed = 0
+    for name in files:
+        path = os.path.join(LEGACY_TEMP_DIR, name)
+        try:
+            modified = default_storage.get_modified_time(path)
+        except (OSError, NotImplementedError):
+            continue
+        if modified < cutoff:
+            default_storage.delete(path)
+            removed += 1
+    return removed
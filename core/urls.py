@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
@@ -7,10 +8,25 @@ from .views import (
     about,
     missing_person_detail,
     favicon_ico,
+    photo_search,
+    location_constituencies,
+    location_counties,
+    location_wards,
     privacy_policy,
     terms_of_service,
 )
 
+if settings.ASYNC_VIEWS:
+    # the public read views, served without holding a thread under ASGI
+    from .async_views import (
+        web_index,
+        all_missing_persons,
+        missing_person_detail,
+        location_constituencies,
+        location_counties,
+        location_wards,
+    )
+
 
 app_name = "core"
 
@@ -19,11 +35,28 @@ urlpatterns = [
     path("favicon.ico", favicon_ico),
     path("report-missing-person/", report_missing, name="report_missing"),
     path("missing-persons/", all_missing_persons, name="all_missing_persons"),
+    path("photo-search/", photo_search, name="photo_search"),
     path(
         "missing-person/<slug:slug>/",
         missing_person_detail,
         name="missing_person_detail",
     ),
+    # <version> is a hash of the location data, see core.geography.location_index
+    path(
+        "locations/<str:version>/counties.json",
+        location_counties,
+        name="location_counties",
+    ),
+    path(
+        "locations/<str:version>/counties/<int:code>/constituencies.json",
+        location_constituencies,
+        name="location_constituencies",
+    ),
+    path(
+        "locations/<str:version>/constituencies/<int:code>/wards.json",
+        location_wards,
+        name="location_wards",
+    ),
     path("about/", about, name="about"),
     path("privacy-policy/", privacy_policy, name="privacy_policy"),
     path("terms-of-service/", terms_of_service, name="terms_of_service"),
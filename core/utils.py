@@ -23,3 +23,54 @@ def format_phone_number(phone_number):
         )
     except phonenumbers.NumberParseException:
         raise ValueError("Invalid phone number format")
+
+
+VOWELS = "aeiou"
+
+# spelling variants that sound the same, applied in order
+PHONETIC_REPLACEMENTS = (
+    ("ph", "f"),
+    ("ck", "k"),
+    ("ch", "k"),
+    ("sh", "s"),
+    ("c", "k"),
+    ("q", "k"),
+    ("x", "ks"),
+    ("z", "s"),
+    ("v", "f"),
+)
+
+
+def phonetic_word(word):
+    """
+    Reduce a single word to a rough phonetic key, tuned for the ways
+    Kenyan names tend to get transliterated (Wanjiru/Wanjiiru,
+    Otieno/Otiyeno, Chepkoech/Chepkoeck).
+    """
+    word = "".join(c for c in word.lower() if c.isalpha())
+    for old, new in PHONETIC_REPLACEMENTS:
+        word = word.replace(old, new)
+
+    key = []
+    for i, c in enumerate(word):
+        prev = word[i - 1] if i > 0 else ""
+        nxt = word[i + 1] if i + 1 < len(word) else ""
+        # glides between vowels are usually just spelling (Otiyeno, Mwaura/Maura)
+        if c in "yw" and prev and prev in VOWELS and nxt and nxt in VOWELS:
+            continue
+        # silent / aspirated h
+        if c == "h" and i > 0:
+            continue
+        # collapse doubled letters
+        if key and key[-1] == c:
+            continue
+        key.append(c)
+    return "".join(key)
+
+
+def phonetic_key(name):
+    """
+    Phonetic key for a full name, one key per word.
+    """
+    words = (phonetic_word(word) for word in name.split())
+    return " ".join(word for word in words if word)
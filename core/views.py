@@ -1,27 +1,28 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_GET, require_http_methods
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest
-from .models import MissingPerson, MissingPersonContact, MissingPersonPhoto
-from django.db.models import Q
-import os
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.cache import patch_cache_control
+from .cache import cache_anonymous_page, listing_page_key, person_page_key
+from .models import (
+    MissingPerson,
+    MissingPersonContact,
+    PhotoStatus,
+)
+from .uploads import discard_staged_uploads, promote_staged_uploads, stage_upload
+from .fuzzy import fuzzy_search_missing_persons
+from .geography import county_names, location_index, normalize_name, resolve_region
+from .pagination import CursorPaginator, approximate_count, get_page_size
+from .photo_search import find_lookalikes, upload_hash
+from . import ratelimit
+from .routers import read_from_replica
+from .search import search_missing_persons
 from django.conf import settings
 from django.contrib import messages
-from django.core.files import File
-
-import uuid
-
-
-def cleanup_temp_files(photo_data):
-    """Clean up temporary uploaded files"""
-    for photo_info in photo_data:
-        temp_path = photo_info.get("temp_path")
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except OSError:
-                pass  # File already deleted or permission error
+from django.contrib.messages import get_messages
+from django.db import transaction
+from django.db.models import Count, Max
+import hashlib
 
 
 def favicon_ico(request):
@@ -30,13 +31,22 @@ def favicon_ico(request):
     return redirect(favicon_path)
 
 
+@read_from_replica
+@cache_anonymous_page(listing_page_key)
 def web_index(request):
-    # 3 latest missing persons
-    latest_missing_persons = MissingPerson.objects.filter(status="missing").order_by(
-        "-created_at"
-    )[:3]
     return render(
-        request, "core/index.html", {"latest_missing_persons": latest_missing_persons}
+        request,
+        "core/index.html",
+        {"latest_missing_persons": latest_missing_persons()},
+    )
+
+
+def latest_missing_persons():
+    # 3 latest missing persons
+    return (
+        MissingPerson.objects.filter(status="missing")
+        .select_related("primary_photo")
+        .order_by("-created_at")[:3]
     )
 
 
@@ -49,9 +59,9 @@ def report_missing(request):
     if request.method == "POST":
         # Handle going back to previous step
         if request.POST.get("action") == "previous_step":
-            # Clean up temporary files if going back from step 3 to 2
+            # Drop the uploaded photos if going back from step 3 to 2
             if current_step == 3 and "photos" in form_data:
-                cleanup_temp_files(form_data["photos"])
+                discard_staged_uploads(form_data["photos"])
                 del form_data["photos"]
                 request.session["form_data"] = form_data
 
@@ -83,6 +93,10 @@ def report_missing(request):
             photos = request.FILES.getlist("photos")
             photo_data = []
 
+            # photos from an earlier pass through this step are replaced
+            if "photos" in form_data:
+                discard_staged_uploads(form_data.pop("photos"))
+
             for i, photo in enumerate(photos):
                 # Validate photo
                 if photo.size > 5 * 1024 * 1024:  # 5MB limit
@@ -98,28 +112,15 @@ def report_missing(request):
                     messages.error(request, f"File {photo.name} is not a valid image.")
                     continue
 
-                # Save photo temporarily
-                temp_dir = os.path.join(settings.MEDIA_ROOT, "temp_uploads")
-                os.makedirs(temp_dir, exist_ok=True)
-
-                file_extension = os.path.splitext(photo.name)[1]
-                temp_filename = f"temp_{uuid.uuid4()}{file_extension}"
-                temp_path = os.path.join(temp_dir, temp_filename)
-
-                # Save the file temporarily
-                with open(temp_path, "wb+") as destination:
-                    for chunk in photo.chunks():
-                        destination.write(chunk)
-
-                photo_info = {
-                    "temp_path": temp_path,
-                    "original_name": photo.name,
-                    "content_type": photo.content_type,
-                    "size": photo.size,
-                    "description": request.POST.get(f"photo_description_{i}", ""),
-                    "alt_text": request.POST.get(f"photo_alt_text_{i}", ""),
-                }
-                photo_data.append(photo_info)
+                # Store the photo where it will live once the report is
+                # submitted, abandoned uploads are removed by the
+                # sweep_staged_uploads command
+                upload = stage_upload(
+                    photo,
+                    description=request.POST.get(f"photo_description_{i}", ""),
+                    alternative_text=request.POST.get(f"photo_alt_text_{i}", ""),
+                )
+                photo_data.append(upload.pk)
 
             form_data["photos"] = photo_data
             current_step = 3
@@ -169,54 +170,31 @@ def report_missing(request):
                     request.session["report_step"] = current_step
                     return redirect("core:report_missing")
 
-                # Create missing person
-                missing_person = MissingPerson.objects.create(
-                    name=form_data.get("name"),
-                    gender=form_data.get("gender"),
-                    age=int(form_data.get("age")) if form_data.get("age") else None,
-                    last_seen_location=form_data.get("last_seen_location"),
-                    county=form_data.get("county", ""),
-                    sub_county=form_data.get("sub_county", ""),
-                    ward=form_data.get("ward", ""),
-                    description=form_data.get("description"),
-                    status="missing",
-                )
-
-                # Create contacts
-                for contact_data in contacts_data:
-                    contact = MissingPersonContact.objects.create(**contact_data)
-                    missing_person.contacts.add(contact)
-
-                # Create photos
-                if "photos" in form_data:
-
-                    for i, photo_info in enumerate(form_data["photos"]):
-                        # Read the temporary file and create a Django File object
-                        temp_path = photo_info["temp_path"]
-
-                        if os.path.exists(temp_path):
-                            with open(temp_path, "rb") as temp_file:
-                                django_file = File(temp_file)
-                                django_file.name = photo_info["original_name"]
-
-                                photo = MissingPersonPhoto.objects.create(
-                                    description=photo_info["description"],
-                                    alternative_text=photo_info["alt_text"],
-                                    is_primary=(i == 0),  # First photo is primary
-                                )
-
-                                # Save the file to the photo field
-                                photo.photo.save(
-                                    photo_info["original_name"], django_file, save=True
-                                )
+                # the report and its photo jobs are committed together, so a
+                # worker never sees a job for a report that was rolled back
+                with transaction.atomic():
+                    # Create missing person
+                    missing_person = MissingPerson.objects.create(
+                        name=form_data.get("name"),
+                        gender=form_data.get("gender"),
+                        age=int(form_data.get("age")) if form_data.get("age") else None,
+                        last_seen_location=form_data.get("last_seen_location"),
+                        county=form_data.get("county", ""),
+                        sub_county=form_data.get("sub_county", ""),
+                        ward=form_data.get("ward", ""),
+                        description=form_data.get("description"),
+                        status="missing",
+                    )
 
-                                missing_person.photos.add(photo)
+                    # Create contacts
+                    for contact_data in contacts_data:
+                        contact = MissingPersonContact.objects.create(**contact_data)
+                        missing_person.contacts.add(contact)
 
-                            # Clean up temporary file
-                            try:
-                                os.remove(temp_path)
-                            except OSError:
-                                pass  # File already deleted or doesn't exist
+                    # Attach the staged photos, renditions are generated by the
+                    # ingest_photo job so the request doesn't grow with the
+                    # number of photos
+                    promote_staged_uploads(form_data.get("photos", []), missing_person)
 
                 # Clear session data
                 request.session.pop("report_step", None)
@@ -234,10 +212,10 @@ def report_missing(request):
                 return redirect("core:report_missing")
 
             except Exception as e:
-                # Handle errors and cleanup temp files
+                # Handle errors and cleanup uploaded photos
 
                 if "photos" in form_data:
-                    cleanup_temp_files(form_data["photos"])
+                    discard_staged_uploads(form_data.pop("photos"))
 
                 messages.error(request, f"Error creating report: {str(e)}")
                 current_step = 3
@@ -248,39 +226,94 @@ def report_missing(request):
 
         return redirect("core:report_missing")
 
+    # counties are rendered into the page, the dropdowns below them are
+    # fetched from the location endpoints as the user picks
+    locations = location_index()
     return render(
         request,
         "core/report.html",
-        {"current_step": current_step, "form_data": form_data},
+        {
+            "current_step": current_step,
+            "form_data": form_data,
+            "counties": locations["county_rows"],
+            "locations_version": locations["version"],
+        },
     )
 
 
-def all_missing_persons(request):
-    page = request.GET.get("page", 1)
-    items_per_page = request.GET.get("page_items", 12)
-
-    # search and filter parameters
-    search_query = request.GET.get("q", "").strip()
-    gender_filter = request.GET.get("gender", "")
-    age_min = request.GET.get("age_min", "")
-    age_max = request.GET.get("age_max", "")
+def _location_response(request, index, version, body):
+    if version != index["version"]:
+        # page rendered before the geography was reloaded
+        current = request.path.replace(f"/{version}/", f"/{index['version']}/", 1)
+        return redirect(current)
+    if body is None:
+        raise Http404("Unknown location")
+    response = HttpResponse(body, content_type="application/json")
+    # the URL changes with the content, so it can be cached for good
+    patch_cache_control(response, public=True, max_age=365 * 24 * 3600, immutable=True)
+    return response
+
+
+@require_GET
+def location_counties(request, version):
+    index = location_index()
+    return _location_response(request, index, version, index["counties"])
+
+
+@require_GET
+def location_constituencies(request, version, code):
+    index = location_index()
+    body = index["constituencies"].get(code)
+    return _location_response(request, index, version, body)
+
+
+@require_GET
+def location_wards(request, version, code):
+    index = location_index()
+    body = index["wards"].get(code)
+    return _location_response(request, index, version, body)
+
+
+def filter_missing_persons(params):
+    """
+    The listing queryset for the search/filter ``params`` (request.GET) and
+    the ordering to paginate it with.
+    """
+    search_query = params.get("q", "").strip()
+    fuzzy = params.get("fuzzy") == "1"
+    county_filter = params.get("county", "")
+    sub_county_filter = params.get("sub_county", "")
+    gender_filter = params.get("gender", "")
+    age_min = params.get("age_min", "")
+    age_max = params.get("age_max", "")
 
     #  all missing persons
-    all_missing_persons = MissingPerson.objects.filter(status="missing").order_by(
-        "-created_at"
-    )
+    all_missing_persons = MissingPerson.objects.filter(status="missing")
 
-    # Apply search filter
-    if search_query:
+    # newest first, keyed on (created_at, id) so pages never shift
+    ordering = ("-created_at", "-id")
 
-        all_missing_persons = all_missing_persons.filter(
-            Q(name__icontains=search_query)
-            | Q(last_seen_location__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(county__icontains=search_query)
-            | Q(sub_county__icontains=search_query)
-            | Q(ward__icontains=search_query)
-        )
+    # Apply search filter, best matches first
+    # fuzzy mode matches names that look or sound alike instead of full text
+    if search_query:
+        search = fuzzy_search_missing_persons if fuzzy else search_missing_persons
+        all_missing_persons = search(all_missing_persons, search_query)
+        ordering = ("-search_rank", "-created_at", "-id")
+
+    # region filter, names are resolved in memory so this is a plain
+    # indexed foreign key lookup
+    if county_filter:
+        region = resolve_region(county_filter, sub_county_filter)
+        if region.county_id is None:
+            all_missing_persons = all_missing_persons.none()
+        elif region.constituency_id is not None:
+            all_missing_persons = all_missing_persons.filter(
+                region_constituency_id=region.constituency_id
+            )
+        else:
+            all_missing_persons = all_missing_persons.filter(
+                region_county_id=region.county_id
+            )
 
     # gender filter
     if gender_filter:
@@ -301,33 +334,155 @@ def all_missing_persons(request):
         except ValueError:
             pass  # Invalid age_max, ignore
 
-    # prefetch related data
-    all_missing_persons = all_missing_persons.prefetch_related("photos", "contacts")
+    return all_missing_persons, ordering
 
-    paginator = Paginator(all_missing_persons, items_per_page)  # 12 persons per page
-    missing_persons = paginator.get_page(page)
 
+def _page_etag(request, *parts):
+    # pages show the account menu and flash messages, so those are part
+    # of the validator too; no validator at all while messages are pending
+    if get_messages(request):
+        return None
+    parts = (*parts, request.user.pk or "")
+    return hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def missing_persons_etag(request):
+    # MAX/COUNT over the filtered rows, from the database so writes by other
+    # processes (the job worker, imports) count too: an edit bumps the max,
+    # a person leaving the set (found, deleted) changes the count
+    queryset, _ = filter_missing_persons(request.GET)
+    summary = queryset.order_by().aggregate(
+        last_modified=Max("updated_at"), total=Count("id")
+    )
+    return _page_etag(
+        request,
+        request.get_full_path(),
+        summary["last_modified"] and summary["last_modified"].isoformat(),
+        summary["total"],
+    )
+
+
+def missing_person_last_modified(request, slug):
+    if get_messages(request):
+        return None
+    # condition() asks for the ETag and Last-Modified separately, share the query
+    if not hasattr(request, "_missing_person_updated_at"):
+        request._missing_person_updated_at = (
+            MissingPerson.objects.filter(slug=slug)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+    return request._missing_person_updated_at
+
+
+def missing_person_etag(request, slug):
+    last_modified = missing_person_last_modified(request, slug)
+    if last_modified is None:
+        return None
+    return _page_etag(request, slug, last_modified.isoformat())
+
+
+# conditional GET is checked before the page cache, a repeat visit costs
+# one indexed query and a 304
+@read_from_replica
+@condition(etag_func=missing_persons_etag)
+@cache_anonymous_page(listing_page_key)
+def all_missing_persons(request):
+    paginator = missing_persons_paginator(request.GET)
+    missing_persons = paginator.page(request.GET.get("cursor"))
+    return render_missing_persons(
+        request, missing_persons, approximate_count(paginator.queryset)
+    )
+
+
+def missing_persons_paginator(params):
+    all_missing_persons, ordering = filter_missing_persons(params)
+    # cards only need the primary photo, joined in the same query
+    all_missing_persons = all_missing_persons.select_related("primary_photo")
+    return CursorPaginator(
+        all_missing_persons, get_page_size(params.get("page_items")), ordering
+    )
+
+
+def render_missing_persons(request, missing_persons, approximate_total):
     return render(
         request,
         "core/missing_persons.html",
         {
             "missing_persons": missing_persons,
-            "current_page": page,
-            "search_query": search_query,
-            "gender_filter": gender_filter,
-            "age_min": age_min,
-            "age_max": age_max,
+            "approximate_total": approximate_total,
+            "search_query": request.GET.get("q", "").strip(),
+            "fuzzy": request.GET.get("fuzzy") == "1",
+            "counties": county_names(),
+            "county_filter": normalize_name(request.GET.get("county", "")),
+            "gender_filter": request.GET.get("gender", ""),
+            "age_min": request.GET.get("age_min", ""),
+            "age_max": request.GET.get("age_max", ""),
         },
     )
 
 
+@read_from_replica
+@condition(
+    etag_func=missing_person_etag, last_modified_func=missing_person_last_modified
+)
+@cache_anonymous_page(person_page_key)
 def missing_person_detail(request, slug):
-    missing_person = get_object_or_404(
-        MissingPerson.objects.prefetch_related("photos", "contacts"), slug=slug
+    missing_person = get_object_or_404(MissingPerson, slug=slug)
+    return render_missing_person(request, missing_person)
+
+
+def render_missing_person(request, missing_person):
+    # left lazy, the template only evaluates them when its cached fragment
+    # is stale; photos still being processed by the job queue aren't shown
+    return render(
+        request,
+        "core/missing_person_detail.html",
+        {
+            "missing_person": missing_person,
+            "photos": missing_person.photos.filter(status=PhotoStatus.READY),
+            "contacts": missing_person.contacts.all(),
+        },
     )
 
+
+@require_http_methods(["GET", "POST"])
+def photo_search(request):
+    """
+    Someone who found a person uploads a photo of them and sees the open
+    cases with a lookalike photo. The upload is hashed, never stored.
+    """
+    matches = None
+    status = 200
+    if request.method == "POST":
+        photo = request.FILES.get("photo")
+        value = None
+        allowed, _, reset = ratelimit.hit_rate_limit(
+            f"photo_search:rate:{ratelimit.client_ip(request)}",
+            settings.PHOTO_SEARCH_RATE_LIMIT,
+            60,  # PHOTO_SEARCH_RATE_LIMIT is per minute
+        )
+        if not allowed:
+            messages.error(
+                request,
+                f"Too many searches, please try again in {reset} seconds.",
+            )
+            status = 429
+        elif photo is None:
+            messages.error(request, "Please choose a photo to search with.")
+        elif photo.size > 5 * 1024 * 1024:  # same limit as reports
+            messages.error(request, "Please keep photos under 5MB.")
+        elif not photo.content_type.startswith("image/"):
+            messages.error(request, f"File {photo.name} is not a valid image.")
+        else:
+            value = upload_hash(photo)
+            if value is None:
+                messages.error(request, f"File {photo.name} is not a valid image.")
+        if value is not None:
+            matches = find_lookalikes(value)
+
     return render(
-        request, "core/missing_person_detail.html", {"missing_person": missing_person}
+        request, "core/photo_search.html", {"matches": matches}, status=status
     )
 
 
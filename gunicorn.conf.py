@@ -0,0 +1,20 @@
+# gunicorn picks this file up from the working directory, worker count and
+# the rest of the options can still be given on the command line. Both
+# `gunicorn knmpdb.wsgi` and the ASGI mode,
+# `gunicorn knmpdb.asgi:application -k uvicorn_worker.UvicornWorker`, use it
+
+
+def post_worker_init(worker):
+    # runs in each worker once the app is loaded, so with --preload the
+    # connections aren't opened in the master and shared across forks
+    from django.conf import settings
+
+    if not settings.DB_PREWARM:
+        return
+    from core.database import prewarm_connections
+
+    try:
+        prewarm_connections()
+    except Exception as e:
+        # the worker can still serve, it connects on the first request
+        worker.log.warning("Couldn't prewarm database connections: %s", e)
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'knmpdb.settings')
+# the async public views, and no persistent connections since every
+# request runs its queries in a new thread (set DB_POOL=true instead)
+os.environ.setdefault('ASYNC_VIEWS', 'true')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -36,9 +36,11 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # internal apps
     "core",
     "console",
+    "api",
     # third party apps
     "django_extensions",
     "django_bootstrap5",
@@ -50,7 +52,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise, async capable
+    "core.middleware.StaticFilesMiddleware",
+    # early, so session and user lookups are counted too
+    "console.middleware.RequestProfilingMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -92,7 +98,8 @@ ROOT_URLCONF = "knmpdb.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, timing renders for the request profiling
+        "BACKEND": "console.profiling.ProfiledDjangoTemplates",
         "DIRS": ["templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -108,9 +115,182 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "knmpdb.wsgi.application"
+ASGI_APPLICATION = "knmpdb.asgi.application"
+
+# route the public read views to their async versions (core.async_views),
+# on by default under ASGI; under WSGI they'd each need an event loop
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+
+
+# database connections, either
+#   persistent: each worker thread keeps its connection for DB_CONN_MAX_AGE
+#               seconds (0 closes it after every request, "none" never)
+#   pooled:     DB_POOL=true, a psycopg pool of DB_POOL_MIN_SIZE to
+#               DB_POOL_MAX_SIZE connections per process, requests wait up
+#               to DB_POOL_TIMEOUT seconds for one (PostgreSQL only)
+# DB_CONN_HEALTH_CHECKS pings a reused connection before a request trusts
+# it, and DB_PREWARM opens connections as a gunicorn worker starts (see
+# gunicorn.conf.py) rather than during its first requests. Under ASGI each
+# request queries from a thread of its own, so persistent connections are
+# never reused: knmpdb/asgi.py defaults DB_CONN_MAX_AGE to 0, use DB_POOL
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+DB_CONN_MAX_AGE = os.getenv("DB_CONN_MAX_AGE", "60")
+DB_CONN_MAX_AGE = None if DB_CONN_MAX_AGE.lower() == "none" else int(DB_CONN_MAX_AGE)
+DB_PREWARM = os.getenv("DB_PREWARM", "true").lower() == "true"
+
+# minimum word similarity (0 - 1) for a fuzzy name match (core.fuzzy), the
+# same on SQLite and on PostgreSQL, where it's pg_trgm's threshold for %>
+FUZZY_SIMILARITY_THRESHOLD = float(os.getenv("FUZZY_SIMILARITY_THRESHOLD", 0.5))
+
+
+def database_config(url):
+    config = dj_database_url.parse(
+        url,
+        # pooled connections go back to the pool after each request instead
+        conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+        conn_health_checks=(
+            os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
+    )
+    if config["ENGINE"] == "django.db.backends.postgresql":
+        # set as the connection starts, so it costs no extra round trip
+        options = config.setdefault("OPTIONS", {})
+        threshold = f"-c pg_trgm.word_similarity_threshold={FUZZY_SIMILARITY_THRESHOLD}"
+        options["options"] = f"{options.get('options', '')} {threshold}".strip()
+    if DB_POOL and config["ENGINE"] == "django.db.backends.postgresql":
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            # drop connections after a while so the server can rebalance them
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+        }
+    return config
+
+
+DATABASES = {"default": database_config(os.getenv("POSTGRES_URL"))}
+
+# read replica (core.routers): with POSTGRES_REPLICA_URL set the public pages
+# and console statistics read from it. A visitor who writes reads from the
+# primary for REPLICA_PIN_SECONDS afterwards, and the replica is skipped
+# while it is more than REPLICA_MAX_LAG seconds behind (checked every
+# REPLICA_LAG_CHECK_INTERVAL seconds per process) or unreachable. The check
+# runs inside a request, so it gives up connecting after
+# REPLICA_CONNECT_TIMEOUT seconds (2 at least, libpq's minimum)
+REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", 2))
+if os.getenv("POSTGRES_REPLICA_URL"):
+    DATABASES["replica"] = database_config(os.getenv("POSTGRES_REPLICA_URL"))
+    if DATABASES["replica"]["ENGINE"] == "django.db.backends.postgresql":
+        replica_options = DATABASES["replica"].setdefault("OPTIONS", {})
+        replica_options["connect_timeout"] = REPLICA_CONNECT_TIMEOUT
+        if "pool" in replica_options:
+            # don't queue for a pooled connection longer than for a new one
+            replica_options["pool"]["timeout"] = REPLICA_CONNECT_TIMEOUT
+    # tests run against the primary alone
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 15))
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", 5))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", 5))
+
+# background jobs (core.jobs), processed by `python manage.py run_jobs`
+# set JOBS_RUN_INLINE=true to run them in-process right after the request commits
+JOBS_RUN_INLINE = os.getenv("JOBS_RUN_INLINE", "false").lower() == "true"
+JOBS_RETRY_BACKOFF = int(os.getenv("JOBS_RETRY_BACKOFF", 30))
+# days finished jobs are kept before `python manage.py prune_jobs` deletes
+# them, failed ones longer so there's time to look into them
+JOBS_RETENTION = int(os.getenv("JOBS_RETENTION", 7))
+JOBS_FAILED_RETENTION = int(os.getenv("JOBS_FAILED_RETENTION", 30))
+
+# photos uploaded in the report wizard but never submitted are removed by
+# `python manage.py sweep_staged_uploads` once they are this many hours old
+STAGED_UPLOAD_MAX_AGE = int(os.getenv("STAGED_UPLOAD_MAX_AGE", 24))
+
+# the console dashboard's figures come from the snapshot taken by
+# `python manage.py refresh_case_statistics` (run it from cron every few
+# minutes), once that is older than this many minutes they are computed live
+CASE_STATISTICS_MAX_AGE = int(os.getenv("CASE_STATISTICS_MAX_AGE", 60))
+
+# photo searches (core.photo_search) allowed per visitor IP address per minute
+PHOTO_SEARCH_RATE_LIMIT = int(os.getenv("PHOTO_SEARCH_RATE_LIMIT", 10))
+# reverse proxies (load balancer, nginx...) in front of the app, each adding
+# the address it got the request from to X-Forwarded-For. Visitor IP
+# addresses (core.ratelimit.client_ip) are read from that header instead of
+# being the nearest proxy's. Leave at 0 when gunicorn faces the internet,
+# otherwise anyone could pick their own address
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+
+# cache, pick a backend with CACHE_URL:
+#   locmem://                 per process (default)
+#   file:///var/tmp/knmpdb    shared by the workers on one machine
+#   db://knmpdb_cache         a table in the database, create it with
+#                             `python manage.py createcachetable`
+#   redis://localhost:6379/0  anything speaking the Redis protocol
+CACHE_URL = os.getenv("CACHE_URL", "locmem://")
+if CACHE_URL.startswith("redis"):
+    CACHE_BACKEND = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_URL,
+    }
+elif CACHE_URL.startswith("file://"):
+    CACHE_BACKEND = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_URL.removeprefix("file://"),
+    }
+elif CACHE_URL.startswith("db://"):
+    CACHE_BACKEND = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": CACHE_URL.removeprefix("db://") or "knmpdb_cache",
+    }
+else:
+    CACHE_BACKEND = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+CACHES = {"default": CACHE_BACKEND}
+
+# seconds anonymous visitors can be served a cached public page, saves and
+# deletes drop the affected pages straight away (see core.cache). Those drops
+# have to reach every web worker, including ones made by `run_jobs` and the
+# management commands, so the page cache needs a shared CACHE_URL and is off
+# (0) with the per process default
+PAGE_CACHE_TIMEOUT = int(
+    os.getenv(
+        "PAGE_CACHE_TIMEOUT",
+        0 if CACHE_BACKEND["BACKEND"].endswith("LocMemCache") else 600,
+    )
+)
 
-
-DATABASES = {"default": dj_database_url.parse(os.getenv("POSTGRES_URL"))}
+# partner API change feed (api.feed): days of history kept by
+# `python manage.py prune_changes`, the longest a client can long-poll for
+# (a waiting request holds a sync worker, so keep it well under gunicorn's
+# 30 second timeout unless serving ASGI)
+CHANGE_FEED_RETENTION = int(os.getenv("CHANGE_FEED_RETENTION", 90))
+CHANGE_FEED_MAX_WAIT = int(os.getenv("CHANGE_FEED_MAX_WAIT", 25 if ASYNC_VIEWS else 5))
+
+# request profiling (console.profiling): the share of requests measured (0
+# turns it off), whether measured responses get a Server-Timing header, how
+# often each process saves its totals (seconds) and how many days are kept
+REQUEST_PROFILING_RATE = float(os.getenv("REQUEST_PROFILING_RATE", 0.02))
+REQUEST_PROFILING_SERVER_TIMING = (
+    os.getenv("REQUEST_PROFILING_SERVER_TIMING", "false").lower() == "true"
+)
+REQUEST_PROFILING_FLUSH_INTERVAL = int(
+    os.getenv("REQUEST_PROFILING_FLUSH_INTERVAL", 60)
+)
+REQUEST_PROFILING_RETENTION = int(os.getenv("REQUEST_PROFILING_RETENTION", 14))
+# profiled statements slower than this (ms) are logged, and so are views
+# running more queries than their budget (by URL name, None for no limit)
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", 200))
+DEFAULT_QUERY_BUDGET = int(os.getenv("DEFAULT_QUERY_BUDGET", 20))
+QUERY_BUDGETS = {
+    "core:web_index": 4,
+    "core:all_missing_persons": 7,
+    "core:missing_person_detail": 6,
+    "console:dashboard": 6,
+    "console:cases_data": 6,
+    "console:analytics": 10,
+}
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -7,6 +7,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("core.urls")),
     path("console/", include("console.urls")),
+    path("api/v1/", include("api.urls")),
     path("accounts/", include("allauth.urls")),
 ]
 